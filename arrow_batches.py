@@ -0,0 +1,211 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from adala.utils.internal_data import InternalDataFrame
+
+
+class ArrowBatch:
+    """
+    A batch of records held as a pyarrow Table plus a row index.
+
+    Columns are read as whole arrays; slicing and appending output columns
+    share the existing column buffers instead of copying them, so a batch can
+    pass through rendering, labeling and writing without ever becoming a
+    pandas frame. Convert with `from_pandas` / `to_pandas` at the user API
+    boundary only.
+
+    It mimics the few DataFrame members the runtime uses on batches
+    (``len``, ``columns``, ``index``, ``iloc``).
+    """
+
+    __slots__ = ("table", "index", "_values")
+
+    def __init__(self, table: Any, index: Optional[Sequence[Any]] = None):
+        self.table = table
+        self.index = range(table.num_rows) if index is None else index
+        if len(self.index) != table.num_rows:
+            raise ValueError(f"Index has {len(self.index)} entries for {table.num_rows} rows")
+        # Python lists of columns already materialized for per-record access
+        self._values: Dict[str, List[Any]] = {}
+
+    @classmethod
+    def from_pandas(cls, frame: pd.DataFrame, index: Optional[Sequence[Any]] = None) -> "ArrowBatch":
+        import pyarrow as pa
+
+        return cls(pa.Table.from_pandas(frame, preserve_index=False), frame.index if index is None else index)
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]], index: Optional[Sequence[Any]] = None) -> "ArrowBatch":
+        """
+        Build a batch from per-record output dicts; a key missing from a record becomes null.
+        """
+        import pyarrow as pa
+
+        names: Dict[str, None] = {}
+        for record in records:
+            names.update(dict.fromkeys(record))
+        if not names:
+            # A table without columns still has to carry the row count
+            return cls(pa.table({"_": [None] * len(records)}).select([]), index)
+        return cls(pa.table({name: [record.get(name) for record in records] for name in names}), index)
+
+    def to_pandas(self) -> InternalDataFrame:
+        frame = InternalDataFrame(self.table.to_pandas())
+        frame.index = pd.Index(self.index)
+        return frame
+
+    def __len__(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def columns(self) -> List[str]:
+        return self.table.column_names
+
+    @property
+    def iloc(self) -> "_PositionalIndexer":
+        return _PositionalIndexer(self)
+
+    def column(self, name: str) -> List[Any]:
+        """
+        Get one column as a Python list, converted once and reused by every record view.
+        """
+        values = self._values.get(name)
+        if values is None:
+            values = self._values[name] = self.table.column(name).to_pylist()
+        return values
+
+    def string_column(self, name: str) -> np.ndarray:
+        """
+        Get one column as an object array of str, the way pandas' ``astype(str)`` renders it.
+        """
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        column = self.table.column(name)
+        if pa.types.is_string(column.type) or pa.types.is_large_string(column.type):
+            if column.null_count:
+                column = pc.fill_null(column, "None")
+            return column.to_numpy()
+        return np.array([str(value) for value in self.column(name)], dtype=object)
+
+    def take(self, positions: Sequence[int]) -> "ArrowBatch":
+        import pyarrow as pa
+
+        return ArrowBatch(self.table.take(pa.array(positions, type=pa.int64())), _take_index(self.index, positions))
+
+    def slice(self, start: int, stop: int) -> "ArrowBatch":
+        start, stop, _ = slice(start, stop).indices(len(self))
+        return ArrowBatch(self.table.slice(start, max(0, stop - start)), self.index[start:stop])
+
+    def append_columns(self, other: "ArrowBatch") -> "ArrowBatch":
+        """
+        Return this batch with `other`'s columns added (replacing same-named ones); no existing column is copied.
+        """
+        if len(other) != len(self):
+            raise ValueError(f"Cannot append {len(other)} rows of columns to a batch of {len(self)} rows")
+        table = self.table
+        for name in other.columns:
+            column = other.table.column(name)
+            if name in table.column_names:
+                table = table.set_column(table.column_names.index(name), name, column)
+            else:
+                table = table.append_column(name, column)
+        return ArrowBatch(table, self.index)
+
+
+class _PositionalIndexer:
+    __slots__ = ("_batch",)
+
+    def __init__(self, batch: ArrowBatch):
+        self._batch = batch
+
+    def __getitem__(self, key) -> ArrowBatch:
+        if isinstance(key, slice):
+            if key.step not in (None, 1):
+                return self._batch.take(range(len(self._batch))[key])
+            return self._batch.slice(key.start or 0, len(self._batch) if key.stop is None else key.stop)
+        return self._batch.take(list(key))
+
+
+def _take_index(index: Sequence[Any], positions: Sequence[int]) -> Sequence[Any]:
+    if hasattr(index, "take"):
+        return index.take(list(positions))
+    return [index[position] for position in positions]
+
+
+class _FrameColumns:
+    """
+    Column access over a pandas frame with the same interface as ArrowBatch.
+    """
+
+    __slots__ = ("columns", "_frame", "_values")
+
+    def __init__(self, frame: pd.DataFrame):
+        self._frame = frame
+        self.columns = list(frame.columns)
+        self._values: Dict[str, List[Any]] = {}
+
+    def column(self, name: str) -> List[Any]:
+        values = self._values.get(name)
+        if values is None:
+            values = self._values[name] = self._frame[name].tolist()
+        return values
+
+
+class ColumnRecord(Mapping):
+    """
+    Read-only view of one row of a batch.
+
+    Replaces ``iterrows()``: no per-row Series or dict is built, and a
+    column is converted to Python values only when some record reads it.
+    """
+
+    __slots__ = ("_source", "_position")
+
+    def __init__(self, source: Any, position: int):
+        self._source = source
+        self._position = position
+
+    def __getitem__(self, name: str) -> Any:
+        if name not in self._source.columns:
+            raise KeyError(name)
+        return self._source.column(name)[self._position]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._source.columns)
+
+    def __len__(self) -> int:
+        return len(self._source.columns)
+
+    def __repr__(self) -> str:
+        return f"ColumnRecord({dict(self)!r})"
+
+
+def batch_records(batch: Any) -> List[ColumnRecord]:
+    """
+    Get a record view for every row of a pandas frame or ArrowBatch.
+    """
+    source = batch if isinstance(batch, ArrowBatch) else _FrameColumns(batch)
+    return [ColumnRecord(source, position) for position in range(len(batch))]
+
+
+def string_column(batch: Any, name: str) -> np.ndarray:
+    """
+    Get a column of a pandas frame or ArrowBatch as an object array of str.
+    """
+    if isinstance(batch, ArrowBatch):
+        return batch.string_column(name)
+    # str() per value, as row-wise formatting does; pandas' string dtype would keep missing values as NaN
+    return batch[name].to_numpy(dtype=object).astype(str).astype(object)
+
+
+def outputs_like(batch: Any, outputs: List[Dict[str, Any]]) -> Any:
+    """
+    Build the output batch for `batch`'s rows, in the same representation as `batch`.
+    """
+    if isinstance(batch, ArrowBatch):
+        return ArrowBatch.from_records(outputs, batch.index)
+    return InternalDataFrame(outputs, index=batch.index)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Offline bulk labeling jobs in the OpenAI Batch API file format.
+
+A job has three steps that can run at different times and on different machines:
+
+1. `compile_job` renders a skill over a dataset into a JSONL file of complete
+   chat requests, one per row, keyed by ``custom_id``.
+2. `run_job` sends every request that does not have a successful result yet,
+   on a worker pool, appending one result line per request as it completes.
+   Re-running it retries only failed or missing ids.
+3. `merge_results` parses the results and joins them back onto the dataset.
+
+Usage (step 2 only; compiling and merging need the skill):
+    python batch_jobs.py job.jsonl results.jsonl --model llama3:8b --workers 64
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+import pandas as pd
+
+from adala.utils.internal_data import InternalDataFrame
+
+logger = logging.getLogger(__name__)
+
+CHAT_COMPLETIONS_URL = "/v1/chat/completions"
+
+
+def _custom_id(row_id: Any) -> str:
+    return row_id if isinstance(row_id, str) else json.dumps(row_id, default=str)
+
+
+def _read_jsonl(path: str) -> Iterator[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning(f"Skipping corrupt line {line_number} in {path}")
+
+
+def _extra_fields(skill: Any) -> Dict[str, Any]:
+    get_extra_fields = getattr(skill, "_get_extra_fields", None)
+    return get_extra_fields() if get_extra_fields is not None else {}
+
+
+def compile_job(
+    skill: Any,
+    data: InternalDataFrame,
+    runtime: Any,
+    path: str,
+    id_column: Optional[str] = None,
+    chunk_size: int = 10000,
+) -> int:
+    """
+    Render `skill` over `data` into a JSONL request file for `runtime`; returns the number of requests.
+
+    Requests are rendered exactly as `runtime.batch_to_batch` would send them
+    (prompt layout, label decoding options, sampling parameters). Rows are
+    identified by `id_column` if given, otherwise by the frame index.
+    """
+    ids = list(data[id_column]) if id_column else list(data.index)
+    if len(set(map(_custom_id, ids))) != len(ids):
+        raise ValueError("Row ids must be unique to be used as custom_id")
+    extra_fields = _extra_fields(skill)
+    written = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for start in range(0, len(data), chunk_size):
+            chunk = data.iloc[start:start + chunk_size]
+            bodies = runtime.build_requests(
+                chunk, skill.input_template, skill.instructions, skill.output_template,
+                extra_fields, skill.field_schema, skill.instructions_first
+            )
+            for row_id, body in zip(ids[start:start + chunk_size], bodies):
+                request = {
+                    "custom_id": _custom_id(row_id),
+                    "method": "POST",
+                    "url": CHAT_COMPLETIONS_URL,
+                    "body": body,
+                }
+                f.write(json.dumps(request, ensure_ascii=False) + "\n")
+                written += 1
+    logger.info(f"Compiled {written} requests -> {path}")
+    return written
+
+
+def load_results(path: str) -> Dict[str, Dict[str, Any]]:
+    """
+    Get the latest result line for every custom_id; a later retry replaces an earlier failure.
+    """
+    results = {}
+    for result in _read_jsonl(path):
+        custom_id = result.get("custom_id")
+        previous = results.get(custom_id)
+        # Never let a failed retry shadow a success that is already on disk
+        if previous is None or previous.get("error") or not result.get("error"):
+            results[custom_id] = result
+    return results
+
+
+def failed_ids(path: str) -> List[str]:
+    """
+    Get the custom_ids whose latest result is an error.
+    """
+    return [custom_id for custom_id, result in load_results(path).items() if result.get("error")]
+
+
+class _ResultWriter:
+    """
+    Thread-safe appender for result lines.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write(self, result: Dict[str, Any]) -> None:
+        line = json.dumps(result, ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+def _execute(runtime: Any, request: Dict[str, Any]) -> Dict[str, Any]:
+    body = request["body"]
+    try:
+        # Same cached, traced path as live labeling
+        choice = runtime.send_request(body)
+    except Exception as e:
+        return {
+            "custom_id": request["custom_id"],
+            "response": None,
+            "error": {"type": type(e).__name__, "message": str(e)},
+        }
+    return {
+        "custom_id": request["custom_id"],
+        "response": {
+            "status_code": 200,
+            "body": {"model": body.get("model"), "choices": [choice]},
+        },
+        "error": None,
+    }
+
+
+def run_job(
+    runtime: Any,
+    requests_path: str,
+    results_path: str,
+    max_workers: int = 32,
+    ids: Optional[Iterable[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Execute a request file, appending a result line per request to `results_path`.
+
+    Requests that already have a successful result are skipped, so an
+    interrupted or partially failed job is resumed by running it again;
+    `ids` restricts the run to those custom_ids (e.g. ``failed_ids(results_path)``).
+    Requests are streamed from disk with at most ``2 * max_workers`` in flight.
+    """
+    runtime.init_runtime()
+
+    done: Set[str] = {custom_id for custom_id, result in load_results(results_path).items() if not result.get("error")}
+    selected = set(ids) if ids is not None else None
+    stats = {"requests": 0, "skipped": 0, "succeeded": 0, "failed": 0}
+    start = time.perf_counter()
+
+    writer = _ResultWriter(results_path)
+    pending = set()
+
+    def _collect(futures) -> None:
+        for future in futures:
+            result = future.result()
+            writer.write(result)
+            stats["failed" if result["error"] else "succeeded"] += 1
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for request in _read_jsonl(requests_path):
+                stats["requests"] += 1
+                custom_id = request["custom_id"]
+                if custom_id in done or (selected is not None and custom_id not in selected):
+                    stats["skipped"] += 1
+                    continue
+                if len(pending) >= 2 * max_workers:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    _collect(finished)
+                pending.add(executor.submit(_execute, runtime, request))
+            _collect(wait(pending)[0])
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - start
+    sent = stats["succeeded"] + stats["failed"]
+    stats["seconds"] = round(elapsed, 3)
+    stats["requests_per_second"] = round(sent / elapsed, 2) if elapsed else 0.0
+    logger.info(f"Job {requests_path}: {stats}")
+    return stats
+
+
+def merge_results(
+    data: InternalDataFrame,
+    results_path: str,
+    skill: Any,
+    runtime: Any,
+    id_column: Optional[str] = None,
+) -> InternalDataFrame:
+    """
+    Parse a job's results with `runtime`'s label decoding and join them onto `data`.
+
+    Rows without a successful result get empty outputs; `failed_ids` lists them for a retry.
+    """
+    results = load_results(results_path)
+    ids = data[id_column] if id_column else data.index
+    output_field_name = runtime.output_field_name(skill.output_template, _extra_fields(skill))
+    outputs = []
+    for row_id in ids:
+        result = results.get(_custom_id(row_id))
+        if result is None or result.get("error"):
+            outputs.append({})
+            continue
+        choice = result["response"]["body"]["choices"][0]
+        outputs.append(runtime.parse_response(choice, output_field_name, skill.field_schema))
+    return InternalDataFrame(pd.concat([data, InternalDataFrame(outputs, index=data.index)], axis=1))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("requests", help="JSONL request file written by compile_job")
+    parser.add_argument("results", help="JSONL results file; appended to, so runs can be resumed")
+    parser.add_argument("--model", required=True)
+    parser.add_argument("--api-key", default=os.getenv("OPENAI_API_KEY", "ollama"))
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--only-failed", action="store_true", help="retry only ids whose last result is an error")
+    args = parser.parse_args()
+
+    from langsmith_runtime import LangSmithOpenAIChatRuntime
+
+    logging.basicConfig(level=logging.INFO)
+    runtime = LangSmithOpenAIChatRuntime(model=args.model, api_key=args.api_key)
+    ids = failed_ids(args.results) if args.only_failed else None
+    print(json.dumps(run_job(runtime, args.requests, args.results, args.workers, ids), indent=2))
+
+
+if __name__ == "__main__":
+    main()
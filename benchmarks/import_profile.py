@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Import-time profile for the runtime module and quickstart entry points.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter for each
+module, and reports the wall-clock cold start plus the slowest imports by
+cumulative time, so regressions in startup cost are easy to spot.
+
+Usage:
+    python benchmarks/import_profile.py --modules langsmith_runtime --top 15
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """
+    Parse `-X importtime` lines: "import time: self [us] | cumulative | imported package".
+    """
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        head, cumulative_us, name = line.split("|", 2)
+        self_us = head.split(":", 1)[1]
+        entries.append({
+            "module": name.strip(),
+            "self_ms": int(self_us) / 1000,
+            "cumulative_ms": int(cumulative_us) / 1000,
+            # Nesting depth is encoded as extra leading spaces in the module column
+            "top_level": not name.startswith("  "),
+        })
+    return entries
+
+
+def profile_module(module: str, top: int) -> Dict[str, Any]:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, env=env, cwd=ROOT,
+    )
+    wall_ms = (time.perf_counter() - start) * 1000
+    entries = _parse_importtime(proc.stderr)
+    slowest = sorted(entries, key=lambda e: e["cumulative_ms"], reverse=True)[:top]
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "error": proc.stderr.strip().splitlines()[-1] if proc.returncode else None,
+        "wall_ms": round(wall_ms, 1),
+        "modules_imported": len(entries),
+        "top_level_ms": round(sum(e["cumulative_ms"] for e in entries if e["top_level"]), 1),
+        "slowest": slowest,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--modules", default="langsmith_runtime", help="comma-separated modules to import")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    reports = [profile_module(module, args.top) for module in args.modules.split(",") if module]
+    if args.json:
+        print(json.dumps(reports, indent=2))
+        return
+    for report in reports:
+        status = "ok" if report["ok"] else f"FAILED: {report['error']}"
+        print(f"{report['module']}: {report['wall_ms']} ms wall, {report['modules_imported']} modules ({status})")
+        for entry in report["slowest"]:
+            print(f"  {entry['cumulative_ms']:9.1f} ms  {entry['self_ms']:8.1f} ms self  {entry['module']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Local OpenAI-compatible stub server for benchmarks.
+
+Serves /v1/models and /v1/chat/completions with configurable latency, jitter,
+error rate and token throughput. Classification prompts are answered with one
+of the configured labels (chosen deterministically from the prompt), packed
+prompts with a JSON object per slot, and anything else with a fixed
+instruction-style sentence, so Agent.learn can run end to end.
+
+Usage:
+    python benchmarks/mock_openai_server.py --port 8399 --latency 0.05 --jitter 0.02
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+_PACKED_INPUTS = "You will receive numbered inputs"
+
+DEFAULT_LABELS = ["Positive", "Negative", "Neutral"]
+IMPROVED_INSTRUCTIONS = "Label the text as Positive, Negative or Neutral based on the overall sentiment."
+
+
+class MockServerConfig:
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        tokens_per_second: float = 0.0,
+        labels: Optional[List[str]] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.tokens_per_second = tokens_per_second
+        self.labels = labels or DEFAULT_LABELS
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+
+def _pick_label(text: str, labels: List[str]) -> str:
+    digest = hashlib.md5(text.encode("utf-8")).digest()
+    return labels[digest[0] % len(labels)]
+
+
+def _completion_text(messages: List[dict], labels: List[str]) -> str:
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    if _PACKED_INPUTS in prompt:
+        user = messages[-1].get("content", "")
+        slots = re.split(r"^\[\d+\]\n", user, flags=re.MULTILINE)[1:]
+        return json.dumps({str(i): _pick_label(slot, labels) for i, slot in enumerate(slots, start=1)})
+    if any(label.lower() in prompt.lower() for label in labels):
+        return _pick_label(messages[-1].get("content", prompt), labels)
+    return IMPROVED_INSTRUCTIONS
+
+
+class MockOpenAIHandler(BaseHTTPRequestHandler):
+    config: MockServerConfig = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json(200, {"object": "list", "data": [{"id": "mock", "object": "model"}]})
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json(404, {"error": {"message": "not found"}})
+            return
+
+        config = self.config
+        with config.lock:
+            config.requests += 1
+            fail = config.random.random() < config.error_rate
+            delay = max(0.0, config.latency + config.random.uniform(-config.jitter, config.jitter))
+            if fail:
+                config.errors += 1
+
+        text = _completion_text(body.get("messages", []), config.labels)
+        completion_tokens = max(1, len(text) // 4)
+        if config.tokens_per_second > 0:
+            delay += completion_tokens / config.tokens_per_second
+        time.sleep(delay)
+
+        if fail:
+            self._send_json(503, {"error": {"message": "mock overload", "type": "server_error"}})
+            return
+
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        self._send_json(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "mock"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockOpenAIServer:
+    """
+    Run the stub server on a background thread; usable as a context manager.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, **config):
+        self.config = MockServerConfig(**config)
+        handler = type("ConfiguredMockOpenAIHandler", (MockOpenAIHandler,), {"config": self.config})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-openai-server", daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "MockOpenAIServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "MockOpenAIServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8399)
+    parser.add_argument("--latency", type=float, default=0.05, help="base seconds per request")
+    parser.add_argument("--jitter", type=float, default=0.0, help="uniform +/- seconds added to latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 503")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="simulated decode speed, 0 = instant")
+    parser.add_argument("--labels", default=",".join(DEFAULT_LABELS))
+    args = parser.parse_args()
+
+    server = MockOpenAIServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        tokens_per_second=args.tokens_per_second,
+        labels=args.labels.split(","),
+    )
+    print(f"Mock OpenAI server listening on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
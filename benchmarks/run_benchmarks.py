@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Benchmark LangSmithOpenAIChatRuntime against a local mock OpenAI-compatible server.
+
+Drives ClassificationSkill.apply / aapply, Agent.run and Agent.learn through the
+real HTTP path at several batch sizes and concurrency levels, and reports
+records/sec, p50/p95/p99 request latency and peak RSS as JSON. Each scenario
+runs in a fresh process, so its peak RSS is not inflated by earlier ones.
+
+Usage:
+    python benchmarks/run_benchmarks.py --batch-sizes 10,100 --concurrency 1,8,32 --output bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+# Make the repo-root modules importable when run as a script
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd  # noqa: E402
+from adala.agents import Agent  # noqa: E402
+from adala.environments import StaticEnvironment  # noqa: E402
+from adala.skills import ClassificationSkill  # noqa: E402
+
+from concurrency_control import percentile  # noqa: E402
+from langsmith_runtime import AsyncRuntime, LangSmithOpenAIChatRuntime  # noqa: E402
+from mock_openai_server import MockOpenAIServer  # noqa: E402
+
+TEXTS = [
+    "All three broke within two months of use.",
+    "The device worked for a long time, can't say anything bad.",
+    "Just a random line of text.",
+    "Not loud enough and doesn't turn on like it should.",
+    "I don't know what to say.",
+    "Manager was rude, but the mic shows a very flat frequency response.",
+]
+
+TRAIN = [
+    ["It was the negative first impressions, and then it started working.", "Positive"],
+    ["Not loud enough and doesn't turn on like it should.", "Negative"],
+    ["I don't know what to say.", "Neutral"],
+    ["Manager was rude, but the most important that mic shows very flat frequency response.", "Positive"],
+    ["The phone doesn't seem to accept anything except CBR mp3s.", "Negative"],
+    ["I tried it before, I bought this device for my son.", "Neutral"],
+]
+
+
+def _percentiles(samples: List[float]) -> Dict[str, Any]:
+    if not samples:
+        return {"p50": None, "p95": None, "p99": None}
+    return {f"p{q}": round(percentile(samples, q), 6) for q in (50, 95, 99)}
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+class BenchmarkRuntime(LangSmithOpenAIChatRuntime):
+    """
+    Runtime that records the client-side latency of every request reaching the server.
+    """
+
+    def _send(self, messages, options=None):
+        start = time.perf_counter()
+        try:
+            return super()._send(messages, options)
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+
+    async def _aexecute_traced(self, messages, options=None):
+        start = time.perf_counter()
+        try:
+            return await super()._aexecute_traced(messages, options)
+        finally:
+            self._latencies.append(time.perf_counter() - start)
+
+
+def _make_runtime(concurrency: int) -> BenchmarkRuntime:
+    runtime = BenchmarkRuntime(
+        model="mock",
+        api_key="mock",
+        max_concurrent_requests=concurrency,
+        # A pinned AIMD window turns the sync path into a fixed-size thread pool
+        adaptive_concurrency=concurrency > 1,
+        min_concurrent_requests=concurrency,
+    )
+    runtime._latencies = []
+    return runtime
+
+
+def _make_skill() -> ClassificationSkill:
+    return ClassificationSkill(
+        name="sentiment",
+        instructions="Label text as positive, negative or neutral.",
+        labels={"sentiment": ["Positive", "Negative", "Neutral"]},
+        input_template="Text: {text}",
+        output_template="Sentiment: {sentiment}",
+    )
+
+
+def _make_batch(size: int) -> pd.DataFrame:
+    # Suffix keeps prompts distinct so coalescing and caching do not skew results
+    return pd.DataFrame({"text": [f"{TEXTS[i % len(TEXTS)]} #{i}" for i in range(size)]})
+
+
+def _make_agent(runtime) -> Agent:
+    return Agent(
+        environment=StaticEnvironment(df=pd.DataFrame(TRAIN, columns=["text", "sentiment"])),
+        skills=_make_skill(),
+        runtimes={"default": runtime},
+        teacher_runtimes={"default": runtime},
+        default_runtime="default",
+        default_teacher_runtime="default",
+    )
+
+
+def _scenario(name: str, fn, records: int, runtime, batch_size: int, concurrency: int) -> Dict[str, Any]:
+    runtime._latencies.clear()
+    rss_before = _peak_rss_mb()
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    peak_rss = _peak_rss_mb()
+    return {
+        "scenario": name,
+        "batch_size": batch_size,
+        "concurrency": concurrency,
+        "records": records,
+        "requests": len(runtime._latencies),
+        "seconds": round(elapsed, 4),
+        "records_per_sec": round(records / elapsed, 2) if elapsed else None,
+        "latency": _percentiles(list(runtime._latencies)),
+        "peak_rss_mb": peak_rss,
+        # Growth over the process's peak after imports and setup
+        "rss_growth_mb": round(peak_rss - rss_before, 1),
+    }
+
+
+def _run_scenario(name: str, batch_size: int, concurrency: int, learning_iterations: int) -> Dict[str, Any]:
+    """
+    Run one scenario in the current process; `run_benchmarks` gives each one a fresh process.
+    """
+    runtime = _make_runtime(concurrency)
+    if name == "agent.learn":
+        agent = _make_agent(runtime)
+        return _scenario(
+            name,
+            lambda: agent.learn(learning_iterations=learning_iterations, accuracy_threshold=1.0),
+            len(TRAIN) * learning_iterations, runtime, len(TRAIN), concurrency
+        )
+    batch = _make_batch(batch_size)
+    skill = _make_skill()
+    if name == "skill.apply":
+        fn = lambda: skill.apply(batch, runtime)  # noqa: E731
+    elif name == "skill.aapply":
+        async_runtime = runtime.as_async()
+        fn = lambda: asyncio.run(skill.aapply(batch, async_runtime))  # noqa: E731
+    else:
+        agent = _make_agent(runtime)
+        fn = lambda: agent.run(batch)  # noqa: E731
+    return _scenario(name, fn, batch_size, runtime, batch_size, concurrency)
+
+
+def run_benchmarks(batch_sizes: List[int], concurrency_levels: List[int], learning_iterations: int) -> List[Dict[str, Any]]:
+    # ru_maxrss is a lifetime maximum, so sharing a process would report the largest scenario so far
+    context = multiprocessing.get_context("spawn")
+    # skill.aapply needs an adala version with AsyncRuntime
+    names = ["skill.apply", "skill.aapply", "agent.run"] if AsyncRuntime is not None else ["skill.apply", "agent.run"]
+    results = []
+    for concurrency in concurrency_levels:
+        runs = [
+            (name, batch_size, concurrency, learning_iterations)
+            for batch_size in batch_sizes
+            for name in names
+        ]
+        runs.append(("agent.learn", len(TRAIN), concurrency, learning_iterations))
+        for run in runs:
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results.append(pool.submit(_run_scenario, *run).result())
+    return results
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-sizes", type=_int_list, default=[10, 100])
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32])
+    parser.add_argument("--learning-iterations", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--tokens-per-second", type=float, default=0.0)
+    parser.add_argument("--output", help="write JSON here instead of stdout")
+    args = parser.parse_args()
+
+    server_config = {
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "tokens_per_second": args.tokens_per_second,
+        "seed": 0,
+    }
+    with MockOpenAIServer(**server_config) as server:
+        # The runtime reads its endpoint from the environment; keep tracing off
+        os.environ["OPENAI_BASE_URL"] = server.base_url
+        os.environ.pop("LANGSMITH_API_KEY", None)
+        results = run_benchmarks(args.batch_sizes, args.concurrency, args.learning_iterations)
+        server_stats = {"requests": server.config.requests, "errors": server.config.errors}
+
+    report = {
+        "python": platform.python_version(),
+        "server": dict(server_config, **server_stats),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,399 @@
+import asyncio
+import contextvars
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from concurrency_control import is_overload_error, percentile
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying besides overload: request timeout and conflicts, plus any 5xx
+RETRYABLE_STATUS_CODES = {408, 409}
+
+
+class CircuitOpenError(RuntimeError):
+    """
+    Raised without sending anything while an endpoint's circuit breaker is open.
+    """
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised when a call's overall deadline runs out across attempts.
+    """
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Tell whether a failed request may succeed if sent again.
+    """
+    if isinstance(error, (CircuitOpenError, DeadlineExceeded)):
+        return False
+    if is_overload_error(error):
+        return True
+    status_code = _status_code(error)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES or status_code >= 500
+    # openai.APIConnectionError (and its APITimeoutError), httpx.TransportError, socket errors and timeouts
+    return isinstance(error, (ConnectionError, TimeoutError)) or any(
+        "Connection" in cls.__name__ or "Timeout" in cls.__name__ for cls in type(error).__mro__
+    )
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    return status_code
+
+
+@dataclass(frozen=True)
+class CallPolicy:
+    """
+    Retry, deadline, hedging and circuit-breaker settings for one runtime's requests.
+    """
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+    # Overall budget for one call across attempts and backoff; None means no deadline
+    deadline: Optional[float] = None
+    hedge: bool = False
+    # Fire the duplicate after this many seconds; None uses the observed p95 latency
+    hedge_after: Optional[float] = None
+    hedge_min_samples: int = 20
+    breaker_failures: int = 5
+    breaker_reset: float = 30.0
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Exponential backoff with full jitter before retry number `attempt`.
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker for one endpoint.
+
+    After ``failure_threshold`` retryable failures in a row the circuit opens
+    and calls fail fast for ``reset_timeout`` seconds; then a single probe is
+    let through (half-open) and its outcome closes or re-opens the circuit.
+    Requests should run under `guard`, which records an outcome however the
+    request ends, so a failed or cancelled probe never wedges the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._probing = False
+        self._stats = {"opened": 0, "rejected": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state()
+
+    def _state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> bool:
+        """
+        Admit a call or raise CircuitOpenError; returns True when the call is the half-open probe.
+        """
+        with self._lock:
+            state = self._state()
+            if state == "closed":
+                return False
+            if state == "half_open" and not self._probing:
+                self._probing = True
+                return True
+            self._stats["rejected"] += 1
+        raise CircuitOpenError("circuit breaker is open for this endpoint")
+
+    @contextmanager
+    def guard(self):
+        """
+        Run one request under the breaker; usable from sync and async code.
+
+        Retryable failures count against the endpoint; any other HTTP error
+        (e.g. a 400) shows it answering and counts as a success. A request
+        ending without an answer either way, such as a cancelled one, only
+        gives up the probe slot so the next call can probe again.
+        """
+        probe = self.before_call()
+        try:
+            yield
+        except BaseException as error:
+            if is_retryable(error):
+                self.record_failure()
+            elif _status_code(error) is not None:
+                self.record_success()
+            elif probe:
+                self.release_probe()
+            raise
+        self.record_success()
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def release_probe(self) -> None:
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._probing or self._failures >= self.failure_threshold:
+                if self._opened_at is None or self._probing:
+                    self._stats["opened"] += 1
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, state=self._state(), consecutive_failures=self._failures)
+
+
+_breakers_lock = threading.Lock()
+_breakers: Dict[Tuple[str, int, float], CircuitBreaker] = {}
+
+
+def get_circuit_breaker(base_url: str, failure_threshold: int = 5, reset_timeout: float = 30.0) -> CircuitBreaker:
+    """
+    Get the breaker shared by every runtime calling `base_url` with these settings.
+    """
+    key = (base_url, failure_threshold, reset_timeout)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(failure_threshold, reset_timeout)
+        return breaker
+
+
+class PolicyExecutor:
+    """
+    Run request attempts under a CallPolicy, for blocking and asyncio callers.
+
+    An attempt is a callable taking the per-attempt timeout in seconds (None
+    when there is no deadline). Retryable failures are retried with jittered
+    backoff while attempts and deadline allow; with hedging on, a duplicate
+    attempt is started once the first has been out longer than the hedge delay
+    and whichever succeeds first wins. Blocking hedged calls run their attempts
+    on a pool of `hedge_workers` threads, which should cover twice the number
+    of concurrent callers so that no attempt waits for a thread.
+
+    `breaker`, if given, guards every attempt; callers spreading attempts over
+    several endpoints pass None and guard each request with its endpoint's own
+    breaker instead.
+
+    `on_event`, if given, is called with the name of every counted event
+    (``retries``, ``hedges``, ``hedge_wins``, ``deadline_exceeded``) so they
+    can be mirrored into the runtime's metrics.
+    """
+
+    def __init__(
+        self,
+        policy: CallPolicy,
+        breaker: Optional[CircuitBreaker] = None,
+        sample_size: int = 200,
+        on_event: Optional[Callable[[str], None]] = None,
+        hedge_workers: int = 64,
+    ):
+        self.policy = policy
+        self.breaker = breaker
+        self.on_event = on_event
+        self.hedge_workers = hedge_workers
+        self._hedge_pool: Optional[ThreadPoolExecutor] = None
+        self._latencies: Deque[float] = deque(maxlen=sample_size)
+        self._lock = threading.Lock()
+        self._stats = {"calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0, "deadline_exceeded": 0}
+
+    def hedge_delay(self) -> Optional[float]:
+        if not self.policy.hedge:
+            return None
+        if self.policy.hedge_after is not None:
+            return self.policy.hedge_after
+        with self._lock:
+            if len(self._latencies) < self.policy.hedge_min_samples:
+                return None
+            return percentile(self._latencies, 95)
+
+    def call(self, attempt: Callable[[Optional[float]], Any]) -> Any:
+        self._incr("calls")
+        deadline = self._deadline()
+        for number in range(1, self.policy.max_attempts + 1):
+            timeout = self._remaining(deadline)
+            start = time.monotonic()
+            try:
+                result = self._hedged(attempt, timeout)
+            except Exception as e:
+                if not self._should_retry(e, number, deadline):
+                    raise
+                self._sleep(self.policy.backoff(number), deadline)
+                continue
+            self._succeeded(time.monotonic() - start)
+            return result
+
+    async def acall(self, attempt: Callable[[Optional[float]], Awaitable[Any]]) -> Any:
+        self._incr("calls")
+        deadline = self._deadline()
+        for number in range(1, self.policy.max_attempts + 1):
+            timeout = self._remaining(deadline)
+            start = time.monotonic()
+            try:
+                if timeout is None:
+                    result = await self._ahedged(attempt, timeout)
+                else:
+                    result = await asyncio.wait_for(self._ahedged(attempt, timeout), timeout)
+            except Exception as e:
+                if not self._should_retry(e, number, deadline):
+                    raise
+                await asyncio.sleep(self._capped(self.policy.backoff(number), deadline))
+                continue
+            self._succeeded(time.monotonic() - start)
+            return result
+
+    def _guarded(self, attempt: Callable[[Optional[float]], Any], timeout: Optional[float]) -> Any:
+        with self.breaker.guard() if self.breaker is not None else nullcontext():
+            return attempt(timeout)
+
+    async def _aguarded(self, attempt: Callable[[Optional[float]], Awaitable[Any]], timeout: Optional[float]) -> Any:
+        with self.breaker.guard() if self.breaker is not None else nullcontext():
+            return await attempt(timeout)
+
+    def _get_hedge_pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._hedge_pool is None:
+                self._hedge_pool = ThreadPoolExecutor(max_workers=self.hedge_workers, thread_name_prefix="hedged-request")
+            return self._hedge_pool
+
+    def _hedged(self, attempt: Callable[[Optional[float]], Any], timeout: Optional[float]) -> Any:
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._guarded(attempt, timeout)
+        pool = self._get_hedge_pool()
+        started = threading.Event()
+
+        def _primary(timeout: Optional[float]) -> Any:
+            started.set()
+            return self._guarded(attempt, timeout)
+
+        # Each attempt runs in a copy of the caller's context (current trace run, request timing)
+        primary = pool.submit(contextvars.copy_context().run, _primary, timeout)
+        # The hedge delay is measured from when the request starts, not from when it was queued
+        started.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        self._incr("hedges")
+        hedge = pool.submit(contextvars.copy_context().run, self._guarded, attempt, self._shrink(timeout, delay))
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self._incr("hedge_wins")
+                    return future.result()
+                error = future.exception()
+        raise error
+
+    async def _ahedged(self, attempt: Callable[[Optional[float]], Awaitable[Any]], timeout: Optional[float]) -> Any:
+        delay = self.hedge_delay()
+        primary = asyncio.ensure_future(self._aguarded(attempt, timeout))
+        if delay is None:
+            return await primary
+        pending = {primary}
+        try:
+            done, _ = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+            self._incr("hedges")
+            hedge = asyncio.ensure_future(self._aguarded(attempt, self._shrink(timeout, delay)))
+            pending.add(hedge)
+            error = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self._incr("hedge_wins")
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            # The losing request (or both, if the caller was cancelled) is abandoned
+            for task in pending:
+                task.cancel()
+
+    def _should_retry(self, error: Exception, number: int, deadline: Optional[float]) -> bool:
+        retryable = is_retryable(error) or isinstance(error, asyncio.TimeoutError)
+        if not retryable or number >= self.policy.max_attempts:
+            return False
+        if deadline is not None and time.monotonic() >= deadline:
+            self._incr("deadline_exceeded")
+            return False
+        self._incr("retries")
+        logger.debug(f"Retrying request after attempt {number} failed: {error!r}")
+        return True
+
+    def _succeeded(self, latency: float) -> None:
+        with self._lock:
+            self._latencies.append(latency)
+
+    def _deadline(self) -> Optional[float]:
+        return None if self.policy.deadline is None else time.monotonic() + self.policy.deadline
+
+    def _remaining(self, deadline: Optional[float]) -> Optional[float]:
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            self._incr("deadline_exceeded")
+            raise DeadlineExceeded(f"request deadline of {self.policy.deadline}s exceeded")
+        return remaining
+
+    def _capped(self, delay: float, deadline: Optional[float]) -> float:
+        if deadline is None:
+            return delay
+        return max(0.0, min(delay, deadline - time.monotonic()))
+
+    def _sleep(self, delay: float, deadline: Optional[float]) -> None:
+        time.sleep(self._capped(delay, deadline))
+
+    @staticmethod
+    def _shrink(timeout: Optional[float], elapsed: float) -> Optional[float]:
+        return None if timeout is None else max(0.001, timeout - elapsed)
+
+    def _incr(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+        if self.on_event is not None and name != "calls":
+            self.on_event(name)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["p95_latency"] = percentile(self._latencies, 95) if self._latencies else None
+        stats["hedge_delay"] = self.hedge_delay()
+        stats["breaker"] = self.breaker.stats() if self.breaker is not None else None
+        return stats
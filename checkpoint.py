@@ -0,0 +1,227 @@
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from adala.utils.internal_data import InternalDataFrame
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointLog:
+    """
+    Append-only JSONL progress log for long labeling and learning jobs.
+
+    Each line is either a completed row (``{"type": "row", "id": ..., "output": {...}}``)
+    or a snapshot of skill instructions after a learning iteration. Lines are
+    flushed and fsync'd as they are written, so a crash loses at most the chunk
+    that was in flight; a truncated trailing line is ignored on reload.
+    """
+
+    def __init__(self, path: str, fsync: bool = True):
+        self.path = path
+        self.fsync = fsync
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping corrupt checkpoint line {line_number} in {self.path}")
+
+    def completed_rows(self) -> Dict[Any, Dict[str, Any]]:
+        """
+        Get the outputs of every completed row, keyed by row id.
+        """
+        return {entry["id"]: entry["output"] for entry in self.entries() if entry.get("type") == "row"}
+
+    def latest_skills(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the most recent skill snapshot, or None if learning never checkpointed.
+        """
+        latest = None
+        for entry in self.entries():
+            if entry.get("type") == "skills":
+                latest = entry
+        return latest
+
+    def record_rows(self, ids: List[Any], outputs: List[Dict[str, Any]]) -> None:
+        """
+        Append one line per completed row.
+        """
+        lines = [
+            json.dumps({"type": "row", "id": row_id, "output": output}, ensure_ascii=False, default=str)
+            for row_id, output in zip(ids, outputs)
+        ]
+        self._append(lines)
+
+    def record_skills(
+        self,
+        iteration: int,
+        instructions: Dict[str, str],
+        accuracy: Optional[Dict[str, float]] = None,
+        converged: bool = False,
+    ) -> None:
+        """
+        Append a snapshot of each skill's instructions after a learning iteration, with its measured accuracy.
+        """
+        entry = {
+            "type": "skills",
+            "iteration": iteration,
+            "instructions": instructions,
+            "accuracy": accuracy,
+            "converged": converged,
+            "timestamp": time.time(),
+        }
+        self._append([json.dumps(entry, ensure_ascii=False)])
+
+    def _append(self, lines) -> None:
+        if not lines:
+            return
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+
+def run_with_checkpoint(
+    agent: Any,
+    input: InternalDataFrame,
+    checkpoint_path: str,
+    id_column: Optional[str] = None,
+    chunk_size: int = 100,
+    runtime: Optional[str] = None,
+) -> InternalDataFrame:
+    """
+    Resumable `agent.run`: rows already in the checkpoint log are skipped, the rest
+    are labeled in chunks that are logged as soon as they complete.
+
+    Rows are identified by `id_column` if given, otherwise by the frame index,
+    which therefore has to be stable between restarts.
+    """
+    log = CheckpointLog(checkpoint_path)
+    completed = log.completed_rows()
+
+    ids = input[id_column] if id_column else input.index
+    # JSON round-trips ids, so compare in their serialized form
+    id_keys = [json.loads(json.dumps(row_id, default=str)) for row_id in ids]
+    pending = [position for position, key in enumerate(id_keys) if key not in completed]
+    if completed:
+        logger.info(f"Resuming from {checkpoint_path}: {len(input) - len(pending)} rows done, {len(pending)} pending")
+
+    for start in range(0, len(pending), chunk_size):
+        positions = pending[start:start + chunk_size]
+        chunk = input.iloc[positions]
+        predictions = agent.run(chunk, runtime=runtime)
+        output_columns = [c for c in predictions.columns if c not in input.columns]
+        # Round-trip through JSON so resumed and fresh outputs look the same
+        outputs = json.loads(predictions[output_columns].to_json(orient="records", force_ascii=False))
+        chunk_ids = [id_keys[position] for position in positions]
+        log.record_rows(chunk_ids, outputs)
+        completed.update(zip(chunk_ids, outputs))
+
+    outputs = InternalDataFrame([completed[key] for key in id_keys], index=input.index)
+    return InternalDataFrame(pd.concat([input, outputs], axis=1))
+
+
+def _skills(agent: Any) -> Dict[str, Any]:
+    return dict(agent.skills.skills)
+
+
+@contextmanager
+def _capture_feedback(environment: Any) -> Iterator[List[Any]]:
+    """
+    Collect the feedback objects the environment hands to `agent.learn`, without changing them.
+    """
+    feedbacks: List[Any] = []
+    get_feedback = environment.get_feedback
+
+    def _recording(*args, **kwargs):
+        feedback = get_feedback(*args, **kwargs)
+        feedbacks.append(feedback)
+        return feedback
+
+    # Shadow the method on this instance only; object.__setattr__ bypasses pydantic's field checks
+    object.__setattr__(environment, "get_feedback", _recording)
+    try:
+        yield feedbacks
+    finally:
+        environment.__dict__.pop("get_feedback", None)
+
+
+def learn_with_checkpoint(
+    agent: Any,
+    checkpoint_path: str,
+    learning_iterations: int = 3,
+    accuracy_threshold: float = 0.9,
+    **learn_kwargs,
+) -> Any:
+    """
+    Resumable `agent.learn`: improved instructions are checkpointed after every
+    iteration and restored on restart, so finished iterations are not repeated.
+
+    Every iteration's accuracy (measured by `agent.learn` itself, before it
+    improves the instructions) is logged. Once every skill output reaches
+    `accuracy_threshold`, the instructions that achieved it are kept, the
+    snapshot is marked converged and no further iteration is run, now or on restart.
+    """
+    log = CheckpointLog(checkpoint_path)
+    snapshot = log.latest_skills()
+    done = 0
+    if snapshot is not None:
+        _set_instructions(agent, snapshot["instructions"])
+        done = snapshot["iteration"]
+        logger.info(f"Restored skill instructions from iteration {done} of {checkpoint_path}")
+        if snapshot.get("converged"):
+            logger.info(f"Accuracy threshold already reached at iteration {done}, nothing to learn")
+            return agent
+
+    for iteration in range(done + 1, learning_iterations + 1):
+        before = {name: skill.instructions for name, skill in _skills(agent).items()}
+        with _capture_feedback(agent.environment) as feedbacks:
+            agent.learn(learning_iterations=1, accuracy_threshold=accuracy_threshold, **learn_kwargs)
+        accuracy = _accuracy(feedbacks[-1]) if feedbacks else None
+        converged = bool(accuracy) and all(value >= accuracy_threshold for value in accuracy.values())
+        if converged:
+            # The measured accuracy belongs to the instructions the iteration started with
+            _set_instructions(agent, before)
+        log.record_skills(
+            iteration,
+            {name: skill.instructions for name, skill in _skills(agent).items()},
+            accuracy=accuracy,
+            converged=converged,
+        )
+        if converged:
+            logger.info(f"Accuracy threshold {accuracy_threshold} reached at iteration {iteration}: {accuracy}")
+            break
+    return agent
+
+
+def _set_instructions(agent: Any, instructions: Dict[str, str]) -> None:
+    for name, text in instructions.items():
+        skill = _skills(agent).get(name)
+        if skill is not None:
+            skill.instructions = text
+
+
+def _accuracy(feedback: Any) -> Dict[str, float]:
+    # Skill outputs without any ground truth have NaN accuracy and do not count
+    return {
+        output: float(value)
+        for output, value in feedback.get_accuracy().items()
+        if value == value
+    }
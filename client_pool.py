@@ -0,0 +1,126 @@
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSettings:
+    """
+    Connection pool and timeout settings for a shared OpenAI client.
+    """
+
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    keepalive_expiry: float = 30.0
+    timeout: float = 60.0
+    connect_timeout: float = 5.0
+    http2: bool = True
+    # Retries done inside the OpenAI SDK; runtimes with their own retry policy set this to 0
+    max_retries: int = 2
+
+
+_lock = threading.Lock()
+_sync_clients: Dict[Tuple, object] = {}
+# Async clients are tied to the event loop that created their connections
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, object]]" = weakref.WeakKeyDictionary()
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def _httpx_options(settings: PoolSettings) -> dict:
+    import httpx
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=settings.max_connections,
+            max_keepalive_connections=settings.max_keepalive_connections,
+            keepalive_expiry=settings.keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(settings.timeout, connect=settings.connect_timeout),
+        "http2": settings.http2 and _http2_available(),
+    }
+
+
+def get_openai_client(base_url: str, api_key: str, settings: PoolSettings = PoolSettings()):
+    """
+    Get the process-wide OpenAI client for a base URL / API key, creating it on first use.
+
+    Clients are keyed by process id as well, so pandarallel workers never reuse
+    sockets inherited from the parent across a fork.
+    """
+    key = (os.getpid(), base_url, api_key, settings)
+    with _lock:
+        client = _sync_clients.get(key)
+        if client is None:
+            import httpx
+            from openai import OpenAI
+
+            from runtime_metrics import on_request, on_response
+
+            client = OpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=settings.max_retries,
+                http_client=httpx.Client(
+                    event_hooks={"request": [on_request], "response": [on_response]},
+                    **_httpx_options(settings),
+                ),
+            )
+            _sync_clients[key] = client
+            logger.debug(f"Created shared OpenAI client for {base_url}")
+        return client
+
+
+def get_async_openai_client(base_url: str, api_key: str, settings: PoolSettings = PoolSettings()):
+    """
+    Get the AsyncOpenAI client shared by all runtimes on the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    key = (base_url, api_key, settings)
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(key)
+        if client is None:
+            import httpx
+            from openai import AsyncOpenAI
+
+            from runtime_metrics import aon_request, aon_response
+
+            client = AsyncOpenAI(
+                api_key=api_key,
+                base_url=base_url,
+                max_retries=settings.max_retries,
+                http_client=httpx.AsyncClient(
+                    event_hooks={"request": [aon_request], "response": [aon_response]},
+                    **_httpx_options(settings),
+                ),
+            )
+            clients[key] = client
+            logger.debug(f"Created shared AsyncOpenAI client for {base_url}")
+        return client
+
+
+def close_clients() -> None:
+    """
+    Close and forget every shared synchronous client in this process.
+    """
+    with _lock:
+        clients = list(_sync_clients.values())
+        _sync_clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception as e:
+            logger.warning(f"Failed to close OpenAI client: {e}")
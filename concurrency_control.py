@@ -0,0 +1,210 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Deque, Dict, Optional
+
+# HTTP statuses that mean the inference server is saturated rather than the request being bad
+OVERLOAD_STATUS_CODES = {429, 502, 503, 504}
+
+
+def is_overload_error(error: BaseException) -> bool:
+    """
+    Tell whether an exception signals server overload (rate limit, unavailable or timeout).
+    """
+    status_code = getattr(error, "status_code", None)
+    if status_code is None:
+        status_code = getattr(getattr(error, "response", None), "status_code", None)
+    if status_code in OVERLOAD_STATUS_CODES:
+        return True
+    return isinstance(error, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in type(error).__name__
+
+
+def percentile(samples, q: float) -> float:
+    """
+    Nearest-rank percentile of a non-empty sample.
+    """
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, math.ceil(q / 100.0 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class _AsyncWaiter:
+    __slots__ = ("loop", "future", "granted")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop):
+        self.loop = loop
+        self.future = loop.create_future()
+        self.granted = False
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD limiter for in-flight requests against one inference server.
+
+    Every time a full window of requests succeeds the limit grows by
+    ``increase``; it is multiplied by ``backoff`` on overload errors
+    (429/503/timeouts) or when the p95 latency of recent calls exceeds
+    ``latency_tolerance`` times the best p95 seen so far. The limit is shared by
+    threads and event loops, so it can sit under both execution paths.
+    """
+
+    def __init__(
+        self,
+        initial_limit: float = 4,
+        min_limit: int = 1,
+        max_limit: int = 64,
+        increase: float = 1.0,
+        backoff: float = 0.5,
+        latency_tolerance: float = 2.0,
+        sample_size: int = 100,
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self._window = float(min(max(initial_limit, self.min_limit), self.max_limit))
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._async_waiters: Deque[_AsyncWaiter] = deque()
+
+        self._latencies: Deque[float] = deque(maxlen=sample_size)
+        self._baseline_p95: Optional[float] = None
+        self._completed_in_round = 0
+        self._last_decrease = 0.0
+        self._stats = {"successes": 0, "overloads": 0, "increases": 0, "decreases": 0}
+
+    @property
+    def limit(self) -> int:
+        """Current number of requests allowed in flight."""
+        return int(self._window)
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold one in-flight slot for a blocking call and feed its outcome back into the controller.
+        """
+        with self._cond:
+            while self._in_flight >= self.limit:
+                self._cond.wait()
+            self._in_flight += 1
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self._release(overload=is_overload_error(e))
+            raise
+        self._release(latency=time.monotonic() - start)
+
+    @asynccontextmanager
+    async def aslot(self):
+        """
+        Asynchronous counterpart of `slot`.
+        """
+        await self._acquire_async()
+        start = time.monotonic()
+        try:
+            yield
+        except BaseException as e:
+            self._release(overload=is_overload_error(e))
+            raise
+        self._release(latency=time.monotonic() - start)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the current window, in-flight count and latency figures.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                "window": round(self._window, 2),
+                "limit": self.limit,
+                "in_flight": self._in_flight,
+                "waiting": len(self._async_waiters),
+                "baseline_p95": self._baseline_p95,
+                "recent_p95": percentile(self._latencies, 95) if self._latencies else None,
+            })
+        return stats
+
+    async def _acquire_async(self) -> None:
+        with self._lock:
+            if self._in_flight < self.limit and not self._async_waiters:
+                self._in_flight += 1
+                return
+            waiter = _AsyncWaiter(asyncio.get_running_loop())
+            self._async_waiters.append(waiter)
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                if waiter.granted:
+                    # The slot was handed over while we were being cancelled
+                    self._in_flight -= 1
+                    self._wake_locked()
+                else:
+                    self._async_waiters.remove(waiter)
+            raise
+
+    def _release(self, latency: Optional[float] = None, overload: bool = False) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            if overload:
+                self._on_overload_locked()
+            elif latency is not None:
+                self._on_success_locked(latency)
+            self._wake_locked()
+
+    def _on_success_locked(self, latency: float) -> None:
+        self._stats["successes"] += 1
+        self._latencies.append(latency)
+        self._completed_in_round += 1
+        if self._completed_in_round < max(1, self.limit):
+            return
+        # One full window has completed: decide whether to grow or back off
+        self._completed_in_round = 0
+        p95 = percentile(self._latencies, 95)
+        if self._baseline_p95 is None or p95 < self._baseline_p95:
+            self._baseline_p95 = p95
+        if p95 > self._baseline_p95 * self.latency_tolerance:
+            self._decrease_locked()
+            # Let the baseline follow a server whose latency has genuinely shifted
+            self._baseline_p95 = (self._baseline_p95 + p95) / 2
+        elif self._window < self.max_limit:
+            self._window = min(self.max_limit, self._window + self.increase)
+            self._stats["increases"] += 1
+
+    def _on_overload_locked(self) -> None:
+        self._stats["overloads"] += 1
+        self._decrease_locked()
+
+    def _decrease_locked(self) -> None:
+        now = time.monotonic()
+        # Collapse a burst of failures from the same window into a single decrease
+        cooldown = self._baseline_p95 or 0.0
+        if now - self._last_decrease < cooldown:
+            return
+        self._last_decrease = now
+        self._completed_in_round = 0
+        self._window = max(self.min_limit, self._window * self.backoff)
+        self._stats["decreases"] += 1
+
+    def _wake_locked(self) -> None:
+        while self._async_waiters and self._in_flight < self.limit:
+            waiter = self._async_waiters.popleft()
+            if waiter.future.done():
+                continue
+            waiter.granted = True
+            self._in_flight += 1
+            waiter.loop.call_soon_threadsafe(_grant, waiter.future)
+        if self._in_flight < self.limit:
+            self._cond.notify_all()
+
+
+def _grant(future: "asyncio.Future[Any]") -> None:
+    if not future.done():
+        future.set_result(None)
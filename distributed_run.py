@@ -0,0 +1,534 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from adala.utils.internal_data import InternalDataFrame
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Lease:
+    """
+    A worker's time-limited claim on one shard: rows ``start:stop`` of the input.
+    """
+
+    shard_id: str
+    start: int
+    stop: int
+    worker_id: str
+    token: str
+    expires: float
+
+
+class LeaseQueue:
+    """
+    Work queue that hands out input shards under expiring leases.
+
+    A shard is leased to one worker at a time; if the worker does not complete
+    or renew it before the lease expires (crash, network partition), the next
+    `acquire` re-issues it. A shard that fails `max_attempts` times is parked
+    as failed instead of being retried forever. The first completion of a
+    shard wins, so a late result from an expired lease is ignored.
+
+    Subclasses implement the storage; `SQLiteLeaseQueue` works for processes
+    sharing a filesystem, `RedisLeaseQueue` for workers on several hosts.
+    """
+
+    max_attempts: int = 3
+
+    def add_shards(self, total_rows: int, shard_size: int) -> int:
+        """
+        Split ``range(total_rows)`` into shards, unless shards were already planned; returns the shard count.
+        """
+        raise NotImplementedError
+
+    def acquire(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        """
+        Lease the next pending or expired shard, or return None when nothing is left to lease.
+        """
+        raise NotImplementedError
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        """
+        Extend a lease that is still held; False means the shard was re-issued to someone else.
+        """
+        raise NotImplementedError
+
+    def complete(self, lease: Lease, outputs: List[Dict[str, Any]], seconds: float) -> bool:
+        """
+        Store a shard's outputs; False if another worker completed it first.
+        """
+        raise NotImplementedError
+
+    def fail(self, lease: Lease, error: str) -> None:
+        """
+        Give a shard back after an error, parking it once it ran out of attempts.
+        """
+        raise NotImplementedError
+
+    def results(self) -> List[Dict[str, Any]]:
+        """
+        Get every completed shard as ``{"start", "stop", "outputs", "worker_id", "seconds"}``.
+        """
+        raise NotImplementedError
+
+    def progress(self) -> Dict[str, int]:
+        """
+        Count shards by state: pending, leased, done, failed.
+        """
+        raise NotImplementedError
+
+    def worker_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get per-worker shards, rows, busy seconds and rows per second over completed shards.
+        """
+        stats: Dict[str, Dict[str, Any]] = {}
+        for result in self.results():
+            worker = stats.setdefault(result["worker_id"], {"shards": 0, "rows": 0, "seconds": 0.0})
+            worker["shards"] += 1
+            worker["rows"] += result["stop"] - result["start"]
+            worker["seconds"] += result["seconds"]
+        for worker in stats.values():
+            worker["rows_per_second"] = worker["rows"] / worker["seconds"] if worker["seconds"] else 0.0
+        return stats
+
+
+def _plan(total_rows: int, shard_size: int) -> List[Dict[str, Any]]:
+    return [
+        {"shard_id": f"{start}-{min(start + shard_size, total_rows)}", "start": start, "stop": min(start + shard_size, total_rows)}
+        for start in range(0, total_rows, shard_size)
+    ]
+
+
+class SQLiteLeaseQueue(LeaseQueue):
+    """
+    LeaseQueue in a SQLite file; leases are taken inside ``BEGIN IMMEDIATE``
+    transactions, so concurrent workers never lease the same shard twice.
+
+    Like ResponseCache, the connection is reopened after a fork; a pickled
+    queue (e.g. sent to a spawned worker process) opens its own.
+    """
+
+    def __init__(self, path: str, max_attempts: int = 3):
+        self.path = path
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"path": self.path, "max_attempts": self.max_attempts}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    def add_shards(self, total_rows: int, shard_size: int) -> int:
+        with self._transaction() as conn:
+            (existing,) = conn.execute("SELECT COUNT(*) FROM shards").fetchone()
+            if existing:
+                return existing
+            conn.executemany(
+                "INSERT INTO shards (id, start, stop, state, attempts) VALUES (?, ?, ?, 'pending', 0)",
+                [(shard["shard_id"], shard["start"], shard["stop"]) for shard in _plan(total_rows, shard_size)],
+            )
+            (count,) = conn.execute("SELECT COUNT(*) FROM shards").fetchone()
+            return count
+
+    def acquire(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE shards SET state = 'failed', error = 'lease expired on the last attempt' "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, self.max_attempts),
+            )
+            row = conn.execute(
+                "SELECT id, start, stop FROM shards "
+                "WHERE state = 'pending' OR (state = 'leased' AND lease_expires < ?) "
+                "ORDER BY start LIMIT 1",
+                (now,),
+            ).fetchone()
+            if row is None:
+                return None
+            lease = Lease(row[0], row[1], row[2], worker_id, uuid.uuid4().hex, now + lease_seconds)
+            conn.execute(
+                "UPDATE shards SET state = 'leased', worker = ?, lease_token = ?, lease_expires = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (worker_id, lease.token, lease.expires, lease.shard_id),
+            )
+            return lease
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET lease_expires = ? WHERE id = ? AND state = 'leased' AND lease_token = ?",
+                (time.time() + lease_seconds, lease.shard_id, lease.token),
+            )
+            return cursor.rowcount == 1
+
+    def complete(self, lease: Lease, outputs: List[Dict[str, Any]], seconds: float) -> bool:
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET state = 'done', worker = ?, outputs = ?, seconds = ?, error = NULL "
+                "WHERE id = ? AND state != 'done'",
+                (lease.worker_id, json.dumps(outputs, ensure_ascii=False, default=str), seconds, lease.shard_id),
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, lease: Lease, error: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE shards SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, error = ? "
+                "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+                (self.max_attempts, error, lease.shard_id, lease.token),
+            )
+
+    def results(self) -> List[Dict[str, Any]]:
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT start, stop, outputs, worker, seconds FROM shards WHERE state = 'done' ORDER BY start"
+            ).fetchall()
+        return [
+            {"start": start, "stop": stop, "outputs": json.loads(outputs), "worker_id": worker, "seconds": seconds}
+            for start, stop, outputs, worker, seconds in rows
+        ]
+
+    def progress(self) -> Dict[str, int]:
+        now = time.time()
+        with self._transaction() as conn:
+            rows = conn.execute(
+                "SELECT CASE WHEN state = 'leased' AND lease_expires < ? THEN 'pending' ELSE state END, COUNT(*) "
+                "FROM shards GROUP BY 1",
+                (now,),
+            ).fetchall()
+        return dict({"pending": 0, "leased": 0, "done": 0, "failed": 0}, **dict(rows))
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS shards ("
+                "id TEXT PRIMARY KEY, start INTEGER NOT NULL, stop INTEGER NOT NULL, state TEXT NOT NULL, "
+                "worker TEXT, lease_token TEXT, lease_expires REAL, attempts INTEGER NOT NULL, "
+                "outputs TEXT, seconds REAL, error TEXT)"
+            )
+            self._conn_pid = os.getpid()
+        return self._conn
+
+
+# Each script runs atomically in Redis, so a worker dying between steps can never lose or duplicate a shard.
+# add_shards -- KEYS: planned, shards, pending; ARGV: shard count, then shard id / JSON pairs
+_PLAN_SCRIPT = """
+if not redis.call('SET', KEYS[1], ARGV[1], 'NX') then
+    return tonumber(redis.call('GET', KEYS[1]))
+end
+for i = 2, #ARGV, 2 do
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    redis.call('RPUSH', KEYS[3], ARGV[i])
+end
+return tonumber(ARGV[1])
+"""
+
+# acquire -- KEYS: pending, leases, tokens, attempts, failed, results, shards; ARGV: now, expires, token, max_attempts
+_ACQUIRE_SCRIPT = """
+for _, id in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], 0, ARGV[1])) do
+    redis.call('ZREM', KEYS[2], id)
+    redis.call('RPUSH', KEYS[1], id)
+end
+while true do
+    local id = redis.call('LPOP', KEYS[1])
+    if not id then
+        return false
+    end
+    if redis.call('HEXISTS', KEYS[6], id) == 0 then
+        if redis.call('HINCRBY', KEYS[4], id, 1) > tonumber(ARGV[4]) then
+            redis.call('HSET', KEYS[5], id, 'lease attempts exhausted')
+        else
+            redis.call('HSET', KEYS[3], id, ARGV[3])
+            redis.call('ZADD', KEYS[2], ARGV[2], id)
+            return {id, redis.call('HGET', KEYS[7], id)}
+        end
+    end
+end
+"""
+
+# renew -- KEYS: tokens, leases; ARGV: shard id, token, expires
+_RENEW_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] or not redis.call('ZSCORE', KEYS[2], ARGV[1]) then
+    return 0
+end
+redis.call('ZADD', KEYS[2], 'XX', ARGV[3], ARGV[1])
+return 1
+"""
+
+# fail -- KEYS: tokens, leases, attempts, failed, pending; ARGV: shard id, token, error, max_attempts
+_FAIL_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) ~= ARGV[2] or redis.call('ZREM', KEYS[2], ARGV[1]) == 0 then
+    return 0
+end
+if tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '0') >= tonumber(ARGV[4]) then
+    redis.call('HSET', KEYS[4], ARGV[1], ARGV[3])
+else
+    redis.call('RPUSH', KEYS[5], ARGV[1])
+end
+return 1
+"""
+
+# complete -- KEYS: results, leases; ARGV: shard id, result JSON
+_COMPLETE_SCRIPT = """
+local stored = redis.call('HSETNX', KEYS[1], ARGV[1], ARGV[2])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return stored
+"""
+
+
+def _text(value: Any) -> Any:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class RedisLeaseQueue(LeaseQueue):
+    """
+    LeaseQueue in Redis, for workers spread over several hosts.
+
+    `client` is a ``redis.Redis`` (or any client with the same commands and
+    Lua scripting). Pending shards are a list, leases a sorted set scored by
+    expiry; every state change is a Lua script, so it happens atomically and an
+    expired lease goes back to the pending list exactly once. Queues created
+    with `from_url` can be pickled, which `run_distributed` needs to hand them
+    to its worker processes.
+    """
+
+    def __init__(self, client: Any, name: str = "adala-run", max_attempts: int = 3):
+        self.client = client
+        self.name = name
+        self.max_attempts = max_attempts
+        self.url: Optional[str] = None
+        self._plan = client.register_script(_PLAN_SCRIPT)
+        self._acquire = client.register_script(_ACQUIRE_SCRIPT)
+        self._renew = client.register_script(_RENEW_SCRIPT)
+        self._fail = client.register_script(_FAIL_SCRIPT)
+        self._complete = client.register_script(_COMPLETE_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str, name: str = "adala-run", max_attempts: int = 3) -> "RedisLeaseQueue":
+        """
+        Create a queue on ``redis.Redis.from_url(url)``; unlike a queue built on a client, it can be pickled.
+        """
+        import redis
+
+        queue = cls(redis.Redis.from_url(url), name=name, max_attempts=max_attempts)
+        queue.url = url
+        return queue
+
+    def __getstate__(self) -> Dict[str, Any]:
+        if self.url is None:
+            raise TypeError("RedisLeaseQueue built on a client cannot be pickled; create it with RedisLeaseQueue.from_url")
+        return {"url": self.url, "name": self.name, "max_attempts": self.max_attempts}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        queue = self.from_url(**state)
+        self.__dict__.update(queue.__dict__)
+
+    def _key(self, suffix: str) -> str:
+        return f"{self.name}:{suffix}"
+
+    def add_shards(self, total_rows: int, shard_size: int) -> int:
+        shards = _plan(total_rows, shard_size)
+        args = [len(shards)]
+        for shard in shards:
+            args += [shard["shard_id"], json.dumps(shard)]
+        # Only the first planner wins, so every host can call this safely
+        return int(self._plan(keys=[self._key("planned"), self._key("shards"), self._key("pending")], args=args))
+
+    def acquire(self, worker_id: str, lease_seconds: float) -> Optional[Lease]:
+        now = time.time()
+        token = uuid.uuid4().hex
+        leased = self._acquire(
+            keys=[self._key(name) for name in ("pending", "leases", "tokens", "attempts", "failed", "results", "shards")],
+            args=[now, now + lease_seconds, token, self.max_attempts],
+        )
+        if not leased:
+            return None
+        shard_id, shard = _text(leased[0]), json.loads(leased[1])
+        return Lease(shard_id, shard["start"], shard["stop"], worker_id, token, now + lease_seconds)
+
+    def renew(self, lease: Lease, lease_seconds: float) -> bool:
+        return bool(self._renew(
+            keys=[self._key("tokens"), self._key("leases")],
+            args=[lease.shard_id, lease.token, time.time() + lease_seconds],
+        ))
+
+    def complete(self, lease: Lease, outputs: List[Dict[str, Any]], seconds: float) -> bool:
+        result = json.dumps({"outputs": outputs, "worker_id": lease.worker_id, "seconds": seconds}, default=str)
+        return bool(self._complete(keys=[self._key("results"), self._key("leases")], args=[lease.shard_id, result]))
+
+    def fail(self, lease: Lease, error: str) -> None:
+        self._fail(
+            keys=[self._key(name) for name in ("tokens", "leases", "attempts", "failed", "pending")],
+            args=[lease.shard_id, lease.token, error, self.max_attempts],
+        )
+
+    def results(self) -> List[Dict[str, Any]]:
+        shards = {_text(key): json.loads(value) for key, value in self.client.hgetall(self._key("shards")).items()}
+        results = []
+        for shard_id, value in self.client.hgetall(self._key("results")).items():
+            shard = shards[_text(shard_id)]
+            results.append(dict(json.loads(value), start=shard["start"], stop=shard["stop"]))
+        return sorted(results, key=lambda result: result["start"])
+
+    def progress(self) -> Dict[str, int]:
+        total = int(self.client.hlen(self._key("shards")))
+        done = int(self.client.hlen(self._key("results")))
+        failed = int(self.client.hlen(self._key("failed")))
+        leased = int(self.client.zcount(self._key("leases"), time.time(), "+inf"))
+        return {"pending": max(0, total - done - failed - leased), "leased": leased, "done": done, "failed": failed}
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+def _output_records(predictions: InternalDataFrame, input_columns) -> List[Dict[str, Any]]:
+    output_columns = [c for c in predictions.columns if c not in input_columns]
+    # Round-trip through JSON so outputs look the same whichever backend stored them
+    return json.loads(predictions[output_columns].to_json(orient="records", force_ascii=False))
+
+
+def run_worker(
+    agent: Any,
+    input: InternalDataFrame,
+    queue: LeaseQueue,
+    worker_id: Optional[str] = None,
+    runtime: Optional[str] = None,
+    lease_seconds: float = 300.0,
+) -> Dict[str, Any]:
+    """
+    Lease shards of `input` and label them with `agent.run` until none are left.
+
+    Every worker must load the same `input` in the same order; shards are row
+    ranges. The lease is renewed in the background at a third of its length
+    while a shard is being labeled. Returns this worker's shard/row counts.
+    """
+    worker_id = worker_id or default_worker_id()
+    stats = {"worker_id": worker_id, "shards": 0, "rows": 0, "failed": 0, "seconds": 0.0}
+    while True:
+        lease = queue.acquire(worker_id, lease_seconds)
+        if lease is None:
+            break
+        stop_renewing = threading.Event()
+
+        def _renew(lease=lease, stop_renewing=stop_renewing):
+            while not stop_renewing.wait(lease_seconds / 3):
+                if not queue.renew(lease, lease_seconds):
+                    logger.warning(f"Lost the lease on shard {lease.shard_id}; it was re-issued")
+                    return
+
+        renewer = threading.Thread(target=_renew, daemon=True)
+        renewer.start()
+        start = time.perf_counter()
+        try:
+            predictions = agent.run(input.iloc[lease.start:lease.stop], runtime=runtime)
+            outputs = _output_records(predictions, input.columns)
+        except Exception as e:
+            logger.error(f"Worker {worker_id} failed on shard {lease.shard_id}: {e}")
+            queue.fail(lease, repr(e))
+            stats["failed"] += 1
+            continue
+        finally:
+            stop_renewing.set()
+            renewer.join()
+        seconds = time.perf_counter() - start
+        if queue.complete(lease, outputs, seconds):
+            stats["shards"] += 1
+            stats["rows"] += lease.stop - lease.start
+            stats["seconds"] += seconds
+        logger.info(f"Worker {worker_id} finished shard {lease.shard_id} in {seconds:.2f}s")
+    stats["rows_per_second"] = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return stats
+
+
+def collect_results(input: InternalDataFrame, queue: LeaseQueue) -> InternalDataFrame:
+    """
+    Merge every completed shard's outputs back onto `input`; rows of unfinished shards get empty outputs.
+    """
+    outputs: List[Dict[str, Any]] = [{} for _ in range(len(input))]
+    for result in queue.results():
+        outputs[result["start"]:result["stop"]] = result["outputs"]
+    return InternalDataFrame(pd.concat([input, InternalDataFrame(outputs, index=input.index)], axis=1))
+
+
+def _worker_process(agent_factory, input, queue, runtime, lease_seconds, worker_number):
+    worker_id = f"{default_worker_id()}-{worker_number}"
+    # The agent and its runtimes (clients, locks, background threads) are built fresh in this process
+    run_worker(agent_factory(), input, queue, worker_id=worker_id, runtime=runtime, lease_seconds=lease_seconds)
+
+
+def run_distributed(
+    agent_factory: Callable[[], Any],
+    input: InternalDataFrame,
+    queue: LeaseQueue,
+    workers: int = 4,
+    shard_size: int = 1000,
+    runtime: Optional[str] = None,
+    lease_seconds: float = 300.0,
+) -> InternalDataFrame:
+    """
+    `agent.run` sharded over `workers` local processes; other hosts can join by
+    calling `run_worker` on the same queue and input.
+
+    Workers are spawned, not forked, so no lock or connection held by one of
+    this process's threads leaks into them: each calls `agent_factory` to
+    build its own agent, and receives pickled copies of `input` and `queue`.
+    `agent_factory` must therefore be picklable (a module-level function or a
+    ``functools.partial`` of one), and the calling script needs an
+    ``if __name__ == "__main__":`` guard.
+
+    Shards left over from an interrupted run of the same queue are resumed,
+    not re-planned. Per-worker throughput is available afterwards from
+    ``queue.worker_stats()``.
+    """
+    import multiprocessing
+
+    context = multiprocessing.get_context("spawn")
+    shards = queue.add_shards(len(input), shard_size)
+    logger.info(f"Labeling {len(input)} rows in {shards} shards with {workers} local workers")
+    processes = [
+        context.Process(target=_worker_process, args=(agent_factory, input, queue, runtime, lease_seconds, number))
+        for number in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    progress = queue.progress()
+    if progress["failed"] or progress["pending"] or progress["leased"]:
+        logger.warning(f"Distributed run finished with unlabeled shards: {progress}")
+    return collect_results(input, queue)
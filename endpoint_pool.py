@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional
+
+from call_policy import is_retryable
+
+logger = logging.getLogger(__name__)
+
+
+class Endpoint:
+    """
+    Load and health state of one OpenAI-compatible server in an EndpointPool.
+    """
+
+    __slots__ = ("url", "outstanding", "latency", "failures", "ejected_until", "stats")
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        # Exponentially weighted moving average of successful request latency, None until measured
+        self.latency: Optional[float] = None
+        self.failures = 0
+        self.ejected_until: Optional[float] = None
+        self.stats = {"requests": 0, "errors": 0, "ejections": 0, "sticky": 0}
+
+    def available(self, now: float) -> bool:
+        return self.ejected_until is None or now >= self.ejected_until
+
+
+class EndpointPool:
+    """
+    Client-side load balancer over several OpenAI-compatible endpoints.
+
+    Requests go to the endpoint with the fewest outstanding requests
+    (``least_outstanding``) or the lowest expected wait, outstanding requests
+    times average latency (``latency``). With ``sticky`` routing, requests
+    sharing an affinity key (the prompt prefix) prefer the same endpoint by
+    rendezvous hashing, so its KV cache keeps the prefix warm; they only spill
+    over when that endpoint has ``sticky_slack`` more requests in flight than
+    the least loaded one.
+
+    ``eject_after`` consecutive retryable failures take an endpoint out of
+    rotation for ``eject_seconds``; afterwards it is readmitted, immediately
+    if a health check sees it answer. When every endpoint is ejected, the one
+    due back first is used rather than failing outright. Callers can also
+    `skip` endpoints for a request, e.g. those whose circuit breaker is open.
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        strategy: str = "least_outstanding",
+        sticky: bool = True,
+        sticky_slack: int = 4,
+        eject_after: int = 3,
+        eject_seconds: float = 30.0,
+        latency_alpha: float = 0.2,
+    ):
+        if not urls:
+            raise ValueError("EndpointPool needs at least one URL")
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Unknown endpoint selection strategy: {strategy}")
+        self.endpoints = [Endpoint(url.rstrip("/")) for url in dict.fromkeys(urls)]
+        self.strategy = strategy
+        self.sticky = sticky
+        self.sticky_slack = sticky_slack
+        self.eject_after = max(1, eject_after)
+        self.eject_seconds = eject_seconds
+        self.latency_alpha = latency_alpha
+        self._lock = threading.Lock()
+        self._health_thread: Optional[threading.Thread] = None
+        self._stop_health = threading.Event()
+
+    def _cost(self, endpoint: Endpoint) -> float:
+        if self.strategy == "latency":
+            known = [e.latency for e in self.endpoints if e.latency is not None]
+            # Unmeasured endpoints are assumed as fast as the best one so they get tried
+            latency = endpoint.latency if endpoint.latency is not None else min(known, default=1.0)
+            return (endpoint.outstanding + 1) * latency
+        return endpoint.outstanding
+
+    def _preferred(self, candidates: List[Endpoint], affinity_key: str) -> Endpoint:
+        def score(endpoint: Endpoint) -> bytes:
+            return hashlib.blake2b(f"{endpoint.url}\0{affinity_key}".encode("utf-8"), digest_size=8).digest()
+        return max(candidates, key=score)
+
+    def acquire(self, affinity_key: Optional[str] = None, skip: Optional[Callable[[str], bool]] = None) -> Endpoint:
+        """
+        Pick an endpoint and count a request as outstanding on it; pair with `release`.
+        
+        Endpoints whose URL `skip` returns True for are only used when nothing else is available.
+        """
+        with self._lock:
+            now = time.monotonic()
+            candidates = [
+                endpoint for endpoint in self.endpoints
+                if endpoint.available(now) and (skip is None or not skip(endpoint.url))
+            ]
+            if not candidates:
+                candidates = [endpoint for endpoint in self.endpoints if endpoint.available(now)]
+            if not candidates:
+                candidates = [min(self.endpoints, key=lambda endpoint: endpoint.ejected_until)]
+            lowest = min(self._cost(endpoint) for endpoint in candidates)
+            chosen = None
+            if self.sticky and affinity_key is not None and len(candidates) > 1:
+                preferred = self._preferred(candidates, affinity_key)
+                least = min(endpoint.outstanding for endpoint in candidates)
+                if preferred.outstanding - least <= self.sticky_slack:
+                    chosen = preferred
+                    chosen.stats["sticky"] += 1
+            if chosen is None:
+                chosen = random.choice([endpoint for endpoint in candidates if self._cost(endpoint) == lowest])
+            chosen.outstanding += 1
+            chosen.stats["requests"] += 1
+            return chosen
+
+    def release(self, endpoint: Endpoint, latency: Optional[float] = None, error: Optional[BaseException] = None) -> None:
+        """
+        Finish a request on `endpoint`, updating its latency average or failure count.
+        """
+        with self._lock:
+            endpoint.outstanding -= 1
+            if error is None:
+                endpoint.failures = 0
+                endpoint.ejected_until = None
+                if latency is not None:
+                    if endpoint.latency is None:
+                        endpoint.latency = latency
+                    else:
+                        endpoint.latency += self.latency_alpha * (latency - endpoint.latency)
+                return
+            endpoint.stats["errors"] += 1
+            # Bad requests say nothing about the endpoint's health
+            if not is_retryable(error):
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self.eject_after:
+                self._eject(endpoint)
+
+    def _eject(self, endpoint: Endpoint) -> None:
+        if endpoint.ejected_until is None or endpoint.ejected_until <= time.monotonic():
+            endpoint.stats["ejections"] += 1
+            logger.warning(f"Ejecting endpoint {endpoint.url} for {self.eject_seconds}s")
+        endpoint.ejected_until = time.monotonic() + self.eject_seconds
+
+    @contextmanager
+    def track(self, affinity_key: Optional[str] = None, skip: Optional[Callable[[str], bool]] = None):
+        """
+        Hold an endpoint for the duration of one request; usable from sync and async code.
+        """
+        endpoint = self.acquire(affinity_key, skip)
+        start = time.perf_counter()
+        try:
+            yield endpoint
+        except BaseException as e:
+            self.release(endpoint, error=e)
+            raise
+        self.release(endpoint, latency=time.perf_counter() - start)
+
+    def check_health(self, timeout: float = 2.0) -> Dict[str, bool]:
+        """
+        Probe every endpoint's ``/models``; ejects endpoints that do not answer and readmits those that do.
+        """
+        import httpx
+
+        healthy = {}
+        for endpoint in self.endpoints:
+            try:
+                ok = httpx.get(f"{endpoint.url}/models", timeout=timeout).status_code < 500
+            except httpx.HTTPError:
+                ok = False
+            with self._lock:
+                if ok:
+                    if endpoint.ejected_until is not None:
+                        logger.info(f"Readmitting endpoint {endpoint.url}")
+                    endpoint.failures = 0
+                    endpoint.ejected_until = None
+                else:
+                    self._eject(endpoint)
+            healthy[endpoint.url] = ok
+        return healthy
+
+    def start_health_checks(self, interval: float = 10.0, timeout: float = 2.0) -> None:
+        """
+        Run `check_health` every `interval` seconds on a daemon thread.
+        """
+        if self._health_thread is not None:
+            return
+
+        def _loop():
+            while not self._stop_health.wait(interval):
+                try:
+                    self.check_health(timeout)
+                except Exception as e:
+                    logger.warning(f"Endpoint health check failed: {e}")
+
+        self._health_thread = threading.Thread(target=_loop, name="endpoint-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self) -> None:
+        self._stop_health.set()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Stop the health checks and wait for their thread to exit; the pool itself stays usable.
+        """
+        self.stop_health_checks()
+        thread, self._health_thread = self._health_thread, None
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self) -> List[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                dict(
+                    endpoint.stats,
+                    url=endpoint.url,
+                    outstanding=endpoint.outstanding,
+                    latency=endpoint.latency,
+                    healthy=endpoint.available(now),
+                )
+                for endpoint in self.endpoints
+            ]
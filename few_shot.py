@@ -0,0 +1,174 @@
+import re
+import threading
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def _hashed_terms(text: str, dim: int) -> Dict[int, float]:
+    """
+    Hashed unigram + bigram counts of a lower-cased text, log-scaled (sublinear TF).
+    """
+    tokens = _TOKEN.findall(text.lower())
+    counts: Dict[int, float] = {}
+    for term in tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]:
+        bucket = zlib.crc32(term.encode("utf-8")) % dim
+        counts[bucket] = counts.get(bucket, 0.0) + 1.0
+    return {bucket: 1.0 + np.log(count) for bucket, count in counts.items()}
+
+
+class ExampleIndex:
+    """
+    In-memory nearest-neighbour index over labeled examples, for dynamic few-shot prompts.
+
+    Examples are embedded with hashed TF-IDF vectors (a fixed number of
+    buckets, so adding examples never changes the dimension) or with a custom
+    ``embed`` function mapping a list of texts to a 2-D array. Search is CPU
+    brute force: one matrix product against all examples, which stays well
+    under a millisecond per record for tens of thousands of examples.
+
+    `add` appends to the index in place; IDF weights are kept from document
+    frequencies and re-applied lazily, so nothing is rebuilt as ground truth
+    arrives. Adding an example that is already indexed (same text and label)
+    is a no-op.
+    """
+
+    def __init__(
+        self,
+        label_field: str,
+        text_fields: Optional[Sequence[str]] = None,
+        dim: int = 1024,
+        embed: Optional[Callable[[List[str]], np.ndarray]] = None,
+    ):
+        self.label_field = label_field
+        self.text_fields = list(text_fields) if text_fields is not None else None
+        self.dim = dim
+        self.embed = embed
+        self.examples: List[Dict[str, Any]] = []
+        self._texts: List[str] = []
+        # Examples per text, to size the over-fetch in `search`; (text, label) pairs already indexed
+        self._text_counts: Dict[str, int] = {}
+        self._keys: Set[Tuple[str, str]] = set()
+        self._vectors = np.zeros((0, dim), dtype=np.float32)
+        self._size = 0
+        self._document_frequency = np.zeros(dim, dtype=np.float32)
+        # Rows weighted by the current IDF and L2-normalized; None when stale
+        self._weighted: Optional[np.ndarray] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def text_of(self, record: Dict[str, Any]) -> str:
+        """
+        The text a record is indexed and searched by: its text fields, one per line.
+        """
+        fields = self.text_fields
+        if fields is None:
+            fields = [name for name in record if name != self.label_field]
+        return "\n".join(str(record[name]) for name in fields if name in record)
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        if self.embed is not None:
+            return np.asarray(self.embed(texts), dtype=np.float32)
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for bucket, weight in _hashed_terms(text, self.dim).items():
+                vectors[row, bucket] = weight
+        return vectors
+
+    def add(self, records: List[Dict[str, Any]]) -> int:
+        """
+        Add labeled records (text fields plus `label_field`); records without a label,
+        or already indexed with the same label, are skipped.
+        """
+        fresh: Dict[Tuple[str, str], Dict[str, Any]] = {}
+        for record in records:
+            if record.get(self.label_field) in (None, ""):
+                continue
+            key = (self.text_of(record), str(record[self.label_field]))
+            if key not in self._keys:
+                fresh.setdefault(key, dict(record))
+        if not fresh:
+            return 0
+        keys = list(fresh)
+        vectors = self._encode([text for text, _ in keys])
+        with self._lock:
+            # Another thread may have added some of the same examples meanwhile
+            new = [row for row, key in enumerate(keys) if key not in self._keys]
+            keys, vectors = [keys[row] for row in new], vectors[new]
+            if not keys:
+                return 0
+            records = [fresh[key] for key in keys]
+            texts = [text for text, _ in keys]
+            if self._vectors.shape[1] != vectors.shape[1]:
+                if self._size:
+                    raise ValueError(f"Embedding size changed from {self._vectors.shape[1]} to {vectors.shape[1]}")
+                self._vectors = np.zeros((0, vectors.shape[1]), dtype=np.float32)
+                self._document_frequency = np.zeros(vectors.shape[1], dtype=np.float32)
+            needed = self._size + len(records)
+            if needed > len(self._vectors):
+                # Amortized growth, like a list, so incremental adds stay cheap
+                grown = np.zeros((max(needed, 2 * len(self._vectors)), self._vectors.shape[1]), dtype=np.float32)
+                grown[:self._size] = self._vectors[:self._size]
+                self._vectors = grown
+            self._vectors[self._size:needed] = vectors
+            self._size = needed
+            self._document_frequency += (vectors > 0).sum(axis=0)
+            self.examples.extend(records)
+            self._texts.extend(texts)
+            self._keys.update(keys)
+            for text in texts:
+                self._text_counts[text] = self._text_counts.get(text, 0) + 1
+            self._weighted = None
+        return len(records)
+
+    def _idf(self) -> np.ndarray:
+        if self.embed is not None:
+            return np.ones(self._vectors.shape[1], dtype=np.float32)
+        return np.log((1.0 + self._size) / (1.0 + self._document_frequency)) + 1.0
+
+    def _weighted_vectors(self, idf: np.ndarray) -> np.ndarray:
+        if self._weighted is None:
+            weighted = self._vectors[:self._size] * idf
+            norms = np.linalg.norm(weighted, axis=1, keepdims=True)
+            self._weighted = weighted / np.maximum(norms, 1e-12)
+        return self._weighted
+
+    def search(self, texts: List[str], k: int) -> List[List[int]]:
+        """
+        Get the positions of the `k` most similar examples for every text, most similar first.
+
+        An example whose text is identical to the query is never returned, so a
+        training row is not shown its own answer.
+        """
+        if not texts or k <= 0:
+            return [[] for _ in texts]
+        queries = self._encode(texts)
+        with self._lock:
+            if not self._size:
+                return [[] for _ in texts]
+            idf = self._idf()
+            examples = self._weighted_vectors(idf)
+            own_texts = self._texts
+            # Over-fetch by the examples that will be dropped for sharing the query's text
+            takes = [min(k + self._text_counts.get(text, 0), len(examples)) for text in texts]
+        queries = queries * idf
+        queries /= np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = queries @ examples.T
+        neighbours = []
+        for row, (text, take) in enumerate(zip(texts, takes)):
+            candidates = np.argpartition(-scores[row], take - 1)[:take]
+            ranked = candidates[np.argsort(-scores[row, candidates], kind="stable")]
+            neighbours.append([int(i) for i in ranked if own_texts[i] != text][:k])
+        return neighbours
+
+    def nearest(self, records: List[Dict[str, Any]], k: int) -> List[List[Dict[str, Any]]]:
+        """
+        Get the `k` most similar labeled examples for every record.
+        """
+        positions = self.search([self.text_of(record) for record in records], k)
+        return [[self.examples[i] for i in row] for row in positions]
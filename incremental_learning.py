@@ -0,0 +1,147 @@
+import logging
+import random
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from adala.utils.internal_data import InternalDataFrame
+
+from response_cache import stable_hash
+
+logger = logging.getLogger(__name__)
+
+
+def _instructions_version(agent: Any) -> str:
+    return stable_hash({name: skill.instructions for name, skill in agent.skills.skills.items()})[:12]
+
+
+def _rows_to_requery(
+    predictions: InternalDataFrame,
+    feedback: Any,
+    output_columns: List[str],
+    audit_fraction: float,
+    rng: random.Random,
+    min_confidence: Optional[float] = None,
+):
+    """
+    Pick the rows to label again: wrong, unparsed or low-confidence ones, plus an audit sample of the rest.
+    """
+    match = feedback.match.reindex(predictions.index)
+    wrong = match.eq(False).any(axis=1)
+    # Off-enum or unparseable outputs come back as None; treat them as low confidence
+    unsure = predictions[output_columns].isna().any(axis=1)
+    if min_confidence is not None:
+        # Outputs decoded with logprobs carry a `<field>_score` column
+        for name in output_columns:
+            score_column = f"{name}_score"
+            if score_column in predictions.columns:
+                unsure |= pd.to_numeric(predictions[score_column], errors="coerce").lt(min_confidence)
+    stale = wrong | unsure
+    stable = list(predictions.index[~stale])
+    audit = rng.sample(stable, min(len(stable), round(len(stable) * audit_fraction))) if stable else []
+    return list(predictions.index[stale]), audit
+
+
+def _index_ground_truth(agent: Any, runtime: Any, inputs: InternalDataFrame) -> None:
+    """
+    Index the training rows' ground truth as few-shot examples of every skill output it covers.
+
+    Examples are matched to records by the input columns; the index never
+    shows a row its own answer, and rows indexed by an earlier run are skipped.
+    """
+    ground_truth = getattr(agent.environment, "ground_truth_columns", None) or {}
+    outputs = list(agent.skills.get_skill_outputs())
+    label_columns = {output: ground_truth.get(output, output) for output in outputs}
+    excluded = set(outputs) | set(label_columns.values())
+    text_fields = [name for name in inputs.columns if name not in excluded]
+    for output, label_column in label_columns.items():
+        if label_column in inputs.columns:
+            runtime.add_few_shot_examples(inputs, output, text_fields, label_column)
+
+
+def learn_incremental(
+    agent: Any,
+    learning_iterations: int = 3,
+    accuracy_threshold: float = 0.9,
+    audit_fraction: float = 0.1,
+    regression_tolerance: float = 0.05,
+    seed: int = 0,
+    min_confidence: Optional[float] = 0.5,
+    runtime: Optional[str] = None,
+    teacher_runtime: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    `agent.learn` that only re-labels the training rows an instruction change can affect.
+
+    The first iteration labels the whole training frame. After each improvement
+    only rows that were wrong, unparsed or scored below `min_confidence` (when
+    the runtime emits ``<field>_score`` columns, see `label_decoding="logprobs"`)
+    are re-queried, plus a seeded audit sample of the rows that were right; if
+    more than `regression_tolerance` of the audited rows flip to wrong, the
+    next iteration re-labels everything.
+    Learning stops as soon as every skill output reaches `accuracy_threshold`.
+    With a runtime that selects few-shot examples (`few_shot_k`), the training
+    rows' ground truth is indexed first, so each row is labeled with its
+    nearest labeled neighbours.
+
+    Returns one stats dict per iteration (rows re-queried, audited, accuracy).
+    """
+    runtime = agent.get_runtime(runtime=runtime)
+    teacher_runtime = agent.get_teacher_runtime(runtime=teacher_runtime)
+    rng = random.Random(seed)
+
+    inputs = agent.environment.get_data_batch(batch_size=None)
+    if getattr(runtime, "few_shot_k", 0):
+        _index_ground_truth(agent, runtime, inputs)
+    predictions = None
+    versions = pd.Series(None, index=inputs.index, dtype=object)
+    requery = list(inputs.index)
+    audit: List[Any] = []
+    history = []
+
+    for iteration in range(1, learning_iterations + 1):
+        rows = requery + audit
+        if rows:
+            fresh = agent.skills.apply(inputs.loc[rows], runtime=runtime)
+            if predictions is None:
+                predictions = fresh
+            else:
+                predictions = InternalDataFrame(pd.concat([predictions.drop(index=rows), fresh]).loc[inputs.index])
+            versions.loc[rows] = _instructions_version(agent)
+        output_columns = [c for c in predictions.columns if c not in inputs.columns]
+
+        feedback = agent.environment.get_feedback(agent.skills, predictions)
+        accuracy = feedback.get_accuracy()
+
+        regressed = 0
+        if audit:
+            # Audited rows were right under older instructions; count the ones that broke
+            regressed = int(feedback.match.reindex(audit).eq(False).any(axis=1).sum())
+        stats = {
+            "iteration": iteration,
+            "requeried": len(requery),
+            "audited": len(audit),
+            "regressed": regressed,
+            "accuracy": {name: float(value) for name, value in accuracy.items()},
+            # Rows whose prediction still comes from older instructions
+            "stale_rows": int((versions != _instructions_version(agent)).sum()),
+        }
+        history.append(stats)
+        logger.info(f"Incremental learning iteration {iteration}: {stats}")
+
+        if (accuracy >= accuracy_threshold).all():
+            logger.info(f"Accuracy threshold {accuracy_threshold} reached after {iteration} iterations")
+            break
+        train_skill_name, train_skill_output, _ = agent.select_skill_to_train(feedback, accuracy_threshold)
+        if not train_skill_name:
+            break
+        agent.skills[train_skill_name].improve(predictions, train_skill_output, feedback, runtime=teacher_runtime)
+
+        if audit and regressed > regression_tolerance * len(audit):
+            logger.info(f"{regressed}/{len(audit)} audited rows regressed; re-labeling all rows next iteration")
+            requery, audit = list(inputs.index), []
+        else:
+            requery, audit = _rows_to_requery(
+                predictions, feedback, output_columns, audit_fraction, rng, min_confidence
+            )
+    return history
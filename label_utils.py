@@ -0,0 +1,79 @@
+import math
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+def label_enum(field_schema: Optional[Dict], field_name: str) -> Optional[List[str]]:
+    """
+    Get the allowed labels for a field from a skill's field_schema, if it defines any.
+    """
+    schema = (field_schema or {}).get(field_name)
+    if not schema:
+        return None
+    if schema.get("type") == "array":
+        return schema.get("items", {}).get("enum")
+    return schema.get("enum")
+
+
+def match_label(text: Optional[str], labels: List[str]) -> Optional[str]:
+    """
+    Snap a free-text completion to one of the labels; None if no label is mentioned.
+    """
+    if text is None:
+        return None
+    normalized = text.strip().strip(".\"'").lower()
+    for label in labels:
+        if normalized == label.lower():
+            return label
+    for label in labels:
+        if label.lower() in normalized:
+            return label
+    return None
+
+
+def label_token_budget(labels: List[str]) -> int:
+    """
+    Upper bound on the tokens needed to emit any label: byte-level BPE never
+    uses more tokens than UTF-8 bytes, plus one for a leading space.
+    """
+    return max(len(label.encode("utf-8")) for label in labels) + 1
+
+
+def label_response_format(field_name: str, labels: List[str]) -> Dict[str, Any]:
+    """
+    OpenAI-style JSON-schema response format that only admits `{field_name: <label>}`.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": field_name,
+            "strict": True,
+            "schema": {
+                "type": "object",
+                "properties": {field_name: {"type": "string", "enum": labels}},
+                "required": [field_name],
+                "additionalProperties": False,
+            },
+        },
+    }
+
+
+def label_probabilities(top_logprobs: Iterable[Tuple[str, float]], labels: List[str]) -> Dict[str, float]:
+    """
+    Turn the first generated token's top logprobs into a distribution over labels.
+
+    Each candidate token counts towards every label it is a prefix of (split evenly
+    when several labels share it); the result is normalized over the labels, or
+    empty if no candidate token starts any label.
+    """
+    probabilities = {label: 0.0 for label in labels}
+    for token, logprob in top_logprobs:
+        piece = token.strip().strip("\"'").lower()
+        if not piece:
+            continue
+        candidates = [label for label in labels if label.lower().startswith(piece)]
+        for label in candidates:
+            probabilities[label] += math.exp(logprob) / len(candidates)
+    total = sum(probabilities.values())
+    if not total:
+        return {}
+    return {label: p / total for label, p in probabilities.items()}
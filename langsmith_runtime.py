@@ -1,24 +1,77 @@
 import os
+import asyncio
+import importlib.util
+import json
 import logging
+import threading
 import time
-from typing import List, Dict, Any, Optional
-from dotenv import load_dotenv
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, List, Dict, Any, Literal, Optional
 
 from adala.runtimes import OpenAIChatRuntime
+from adala.utils.internal_data import InternalDataFrame
+from pydantic import Field
 
-# Load environment variables
-load_dotenv()
+try:
+    from adala.runtimes.base import AsyncRuntime
+except ImportError:
+    # adala releases before AsyncRuntime: the native asyncio methods still work, `as_async` does not
+    AsyncRuntime = None
+
+from call_policy import CallPolicy, CircuitBreaker, PolicyExecutor, get_circuit_breaker
+from client_pool import PoolSettings, get_async_openai_client, get_openai_client
+from concurrency_control import AdaptiveConcurrencyLimiter
+from label_utils import (
+    label_enum,
+    label_probabilities,
+    label_response_format,
+    label_token_budget,
+    match_label,
+)
+from prompt_packing import build_packed_messages, parse_packed_response
+from prompt_templates import compile_template
+from request_coalescing import SingleFlight, group_duplicates
+from response_cache import ResponseCache, stable_hash
+from trace_exporter import BackgroundTraceExporter, get_trace_exporter
+from trace_sampling import TraceSampler
+
+if TYPE_CHECKING:
+    # Imported where used, so runtimes that never enable these features do not load them
+    from endpoint_pool import EndpointPool
+    from few_shot import ExampleIndex
+    from runtime_metrics import RuntimeMetrics
+    from semantic_cache import NearDuplicateCache
 
 logger = logging.getLogger(__name__)
 
-# Try to import LangSmith, but don't fail if not available
-try:
-    from langsmith import Client
-    from langsmith.run_helpers import traceable
-    LANGSMITH_AVAILABLE = True
-except ImportError:
-    LANGSMITH_AVAILABLE = False
-    logger.warning("LangSmith not available. Install with: pip install langsmith")
+# LangSmith is optional and only imported when the first traced run is exported
+LANGSMITH_AVAILABLE = importlib.util.find_spec("langsmith") is not None
+
+_env_loaded = False
+# Guards creation of a runtime's lazily-built shared state; reentrant because factories read other lazy properties
+_lazy_lock = threading.RLock()
+
+
+def _load_env() -> None:
+    """
+    Load environment variables from .env once, on first runtime construction.
+    """
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _env_loaded = True
+
+# Sentinel distinguishing cache misses from cached None results
+_MISSING = object()
+
+# Run currently open in this thread / task, used to parent nested runs
+_current_run: ContextVar[Optional[Dict[str, Any]]] = ContextVar("_current_run", default=None)
 
 
 class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
@@ -29,7 +82,85 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
     of all LLM calls, inputs, outputs, and metadata for better observability.
     """
     
+    # Upper bound on in-flight requests for the asyncio path (abatch_to_batch)
+    max_concurrent_requests: int = Field(default=64, ge=1)
+    
+    # AIMD control of in-flight requests between min_ and max_concurrent_requests
+    adaptive_concurrency: bool = False
+    min_concurrent_requests: int = Field(default=2, ge=1)
+    latency_tolerance: float = Field(default=2.0, gt=1.0)
+    
+    # Send one request per distinct rendered prompt, within and across concurrent batches
+    coalesce_requests: bool = False
+    
+    # Move the instructions after the first record field into the user message, even mid-sentence,
+    # so the part before it can be a shared system prefix (see _prompt_layout)
+    split_instructions: bool = False
+    
+    # Records per request for label-enum skills; 1 disables prompt packing (always off with logprobs decoding)
+    pack_size: int = Field(default=1, ge=1)
+    
+    # How single-label enum outputs are decoded: free text, first-token logprobs, or a JSON-schema constrained answer
+    label_decoding: Literal["text", "logprobs", "json_schema"] = "text"
+    label_top_logprobs: int = Field(default=20, ge=1, le=20)
+    
+    # Nearest labeled examples (see add_few_shot_examples) sent before each record as chat turns; 0 disables
+    few_shot_k: int = Field(default=0, ge=0)
+    
+    # Content-addressed response cache; in-memory only unless cache_path is set
+    cache_enabled: bool = False
+    cache_path: Optional[str] = None
+    cache_ttl: Optional[float] = None
+    cache_max_entries: int = 100000
+    cache_memory_entries: int = 4096
+    
+    # Reuse the label of a near-identical earlier record (MinHash similarity of normalized inputs) for label-enum skills
+    semantic_cache: bool = False
+    semantic_cache_threshold: float = Field(default=0.9, gt=0.0, le=1.0)
+    semantic_cache_max_entries: int = Field(default=50000, ge=1)
+    
+    # HTTP connection pool shared by every runtime with the same base URL and API key
+    http_max_connections: int = 100
+    http_max_keepalive_connections: int = 20
+    http_keepalive_expiry: float = 30.0
+    http_timeout: float = 60.0
+    http_connect_timeout: float = 5.0
+    http2: bool = True
+    
+    # Several OpenAI-compatible servers behind one runtime; empty means OPENAI_BASE_URLS / OPENAI_BASE_URL
+    base_urls: List[str] = Field(default_factory=list)
+    endpoint_strategy: Literal["least_outstanding", "latency"] = "least_outstanding"
+    # Requests sharing a system prompt prefer the same server, for KV prefix-cache hits
+    sticky_routing: bool = True
+    endpoint_eject_after: int = Field(default=3, ge=1)
+    endpoint_eject_seconds: float = Field(default=30.0, gt=0.0)
+    endpoint_health_interval: Optional[float] = Field(default=10.0, gt=0.0)
+    
+    # Retries with jittered exponential backoff and an overall per-call deadline (seconds)
+    retry_max_attempts: int = Field(default=3, ge=1)
+    retry_base_delay: float = Field(default=0.5, ge=0.0)
+    retry_max_delay: float = Field(default=8.0, ge=0.0)
+    request_deadline: Optional[float] = Field(default=None, gt=0.0)
+    
+    # Send a duplicate request when the first is slower than hedge_after (observed p95 when unset)
+    hedge_requests: bool = False
+    hedge_after: Optional[float] = Field(default=None, gt=0.0)
+    
+    # Fail fast for circuit_breaker_reset seconds after this many consecutive failures on an endpoint
+    circuit_breaker_failures: int = Field(default=5, ge=1)
+    circuit_breaker_reset: float = Field(default=30.0, gt=0.0)
+    
+    # Head sampling of traces; per-skill rates are keyed by the skill's output field
+    trace_sample_rate: float = Field(default=1.0, ge=0.0, le=1.0)
+    trace_skill_sample_rates: Dict[str, float] = Field(default_factory=dict)
+    
+    # Tail rules: traces dropped by head sampling are still kept when one of their runs hits these
+    trace_keep_errors: bool = True
+    trace_slow_threshold: Optional[float] = None
+    trace_keep_label_mismatches: bool = True
+    
     def __init__(self, **kwargs):
+        _load_env()
         # Call parent constructor first
         super().__init__(**kwargs)
         
@@ -37,35 +168,61 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
         self._setup_langsmith()
     
     def _setup_langsmith(self):
-        """Setup LangSmith client and configuration."""
-        try:
-            # Initialize LangSmith attributes
-            self._tracing_enabled = False
-            self._langsmith_client = None
-            self._project_name = "adala-agent"
-            
-            if not LANGSMITH_AVAILABLE:
-                logger.warning("LangSmith not available. Tracing will be disabled.")
-                return
-            
-            api_key = os.getenv("LANGSMITH_API_KEY")
-            if not api_key:
-                logger.warning("LANGSMITH_API_KEY not found. Tracing will be disabled.")
-                return
-            
-            self._langsmith_client = Client(
-                api_url=os.getenv("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com"),
-                api_key=api_key
-            )
-            
-            self._project_name = os.getenv("LANGSMITH_PROJECT", "adala-agent")
-            self._tracing_enabled = True
-            
-            logger.info(f"✅ LangSmith tracing enabled for project: {self._project_name}")
-            
-        except Exception as e:
-            logger.error(f"Failed to setup LangSmith: {e}")
-            self._tracing_enabled = False
+        """
+        Setup LangSmith configuration. The client and exporter are created on the first traced run.
+        """
+        # Initialize LangSmith attributes
+        self._tracing_enabled = False
+        self._langsmith_client = None
+        self._trace_exporter = None
+        self._project_name = "adala-agent"
+        
+        if not LANGSMITH_AVAILABLE:
+            logger.warning("LangSmith not available. Install with: pip install langsmith")
+            return
+        
+        if not os.getenv("LANGSMITH_API_KEY"):
+            logger.warning("LANGSMITH_API_KEY not found. Tracing will be disabled.")
+            return
+        
+        self._project_name = os.getenv("LANGSMITH_PROJECT", "adala-agent")
+        self._tracing_enabled = True
+        logger.info(f"✅ LangSmith tracing enabled for project: {self._project_name}")
+    
+    def _lazy(self, name: str, factory):
+        """
+        Get the attribute `name`, creating it with `factory` on first use.
+        
+        Creation is double-checked under a lock, so threads that race for a
+        shared object (limiter, cache, metrics...) all get the same instance.
+        """
+        value = getattr(self, name, None)
+        if value is None:
+            with _lazy_lock:
+                value = getattr(self, name, None)
+                if value is None:
+                    value = factory()
+                    setattr(self, name, value)
+        return value
+    
+    @property
+    def trace_exporter(self) -> Optional[BackgroundTraceExporter]:
+        """Get the exporter shared by every runtime tracing to the same LangSmith endpoint, created on first use."""
+        if self._trace_exporter is None and self.tracing_enabled:
+            try:
+                self._trace_exporter = get_trace_exporter(
+                    api_url=os.getenv("LANGSMITH_ENDPOINT", "https://api.smith.langchain.com"),
+                    api_key=os.getenv("LANGSMITH_API_KEY"),
+                    batch_size=int(os.getenv("LANGSMITH_EXPORT_BATCH_SIZE", "100")),
+                    flush_interval=float(os.getenv("LANGSMITH_EXPORT_FLUSH_INTERVAL", "1.0")),
+                    max_queue_size=int(os.getenv("LANGSMITH_EXPORT_QUEUE_SIZE", "10000")),
+                    spill_path=os.getenv("LANGSMITH_EXPORT_SPILL_PATH") or None,
+                )
+                self._langsmith_client = self._trace_exporter.client
+            except Exception as e:
+                logger.error(f"Failed to setup LangSmith: {e}")
+                self._tracing_enabled = False
+        return self._trace_exporter
     
     @property
     def tracing_enabled(self) -> bool:
@@ -77,6 +234,175 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
         """Get project name."""
         return getattr(self, '_project_name', 'adala-agent')
     
+    @property
+    def trace_sampler(self) -> TraceSampler:
+        """Get the head/tail sampler deciding which finished runs are exported."""
+        return self._lazy('_trace_sampler', lambda: TraceSampler(
+            sample_rate=self.trace_sample_rate,
+            skill_rates=self.trace_skill_sample_rates,
+            keep_errors=self.trace_keep_errors,
+            slow_threshold=self.trace_slow_threshold,
+            keep_label_mismatches=self.trace_keep_label_mismatches,
+        ))
+    
+    @property
+    def response_cache(self) -> Optional[ResponseCache]:
+        """Get the response cache, created on first use; None when caching is disabled."""
+        if not self.cache_enabled:
+            return None
+        return self._lazy('_response_cache', lambda: ResponseCache(
+            path=self.cache_path,
+            ttl=self.cache_ttl,
+            max_entries=self.cache_max_entries,
+            memory_entries=self.cache_memory_entries,
+        ))
+    
+    @property
+    def near_duplicate_cache(self) -> Optional["NearDuplicateCache"]:
+        """Get the approximate label cache, created on first use; None when semantic caching is off."""
+        if not self.semantic_cache:
+            return None
+        from semantic_cache import NearDuplicateCache
+        
+        return self._lazy('_near_duplicate_cache', lambda: NearDuplicateCache(
+            threshold=self.semantic_cache_threshold,
+            max_entries=self.semantic_cache_max_entries,
+        ))
+    
+    @property
+    def concurrency_limiter(self) -> Optional[AdaptiveConcurrencyLimiter]:
+        """Get the AIMD in-flight request limiter; None when adaptive concurrency is off."""
+        if not self.adaptive_concurrency:
+            return None
+        return self._lazy('_concurrency_limiter', lambda: AdaptiveConcurrencyLimiter(
+            initial_limit=self.min_concurrent_requests,
+            min_limit=self.min_concurrent_requests,
+            max_limit=self.max_concurrent_requests,
+            latency_tolerance=self.latency_tolerance,
+        ))
+    
+    @property
+    def single_flight(self) -> SingleFlight:
+        """Get the registry that collapses identical in-flight requests."""
+        return self._lazy('_single_flight', SingleFlight)
+    
+    @property
+    def metrics(self) -> "RuntimeMetrics":
+        """Get hot-path latency, token and retry metrics; always collected."""
+        def _create() -> "RuntimeMetrics":
+            from runtime_metrics import RuntimeMetrics
+            return RuntimeMetrics(labels={"model": self.openai_model})
+        
+        return self._lazy('_metrics', _create)
+    
+    @property
+    def endpoint_urls(self) -> List[str]:
+        """Get every OpenAI-compatible endpoint this runtime talks to."""
+        urls = self.base_urls or [url.strip() for url in os.getenv("OPENAI_BASE_URLS", "").split(",") if url.strip()]
+        return urls or [os.getenv("OPENAI_BASE_URL", "http://localhost:11434/v1")]
+    
+    @property
+    def base_url(self) -> str:
+        """Get the OpenAI-compatible endpoint this runtime talks to (the first one of a pool)."""
+        return self.endpoint_urls[0]
+    
+    @property
+    def endpoint_pool(self) -> Optional["EndpointPool"]:
+        """Get the load balancer over `endpoint_urls`; None with a single endpoint."""
+        urls = self.endpoint_urls
+        if len(urls) < 2:
+            return None
+        
+        def _create() -> "EndpointPool":
+            from endpoint_pool import EndpointPool
+            
+            pool = EndpointPool(
+                urls,
+                strategy=self.endpoint_strategy,
+                sticky=self.sticky_routing,
+                eject_after=self.endpoint_eject_after,
+                eject_seconds=self.endpoint_eject_seconds,
+            )
+            if self.endpoint_health_interval is not None:
+                pool.start_health_checks(self.endpoint_health_interval)
+            return pool
+        
+        return self._lazy('_endpoint_pool', _create)
+    
+    @property
+    def pool_settings(self) -> PoolSettings:
+        """Get the HTTP connection pool settings for the shared client."""
+        return PoolSettings(
+            max_connections=self.http_max_connections,
+            max_keepalive_connections=self.http_max_keepalive_connections,
+            keepalive_expiry=self.http_keepalive_expiry,
+            timeout=self.http_timeout,
+            connect_timeout=self.http_connect_timeout,
+            http2=self.http2,
+            # Retries are owned by call_policy, so the SDK must not retry underneath it
+            max_retries=0,
+        )
+    
+    @property
+    def call_policy(self) -> PolicyExecutor:
+        """Get the retry / hedging / deadline executor; circuit breakers are per endpoint (see _circuit_breaker)."""
+        def _create() -> PolicyExecutor:
+            policy = CallPolicy(
+                max_attempts=self.retry_max_attempts,
+                base_delay=self.retry_base_delay,
+                max_delay=self.retry_max_delay,
+                deadline=self.request_deadline,
+                hedge=self.hedge_requests,
+                hedge_after=self.hedge_after,
+                breaker_failures=self.circuit_breaker_failures,
+                breaker_reset=self.circuit_breaker_reset,
+            )
+            # Retries and hedges are counted here now that the SDK no longer retries underneath.
+            # A hedged call holds up to two threads; size the pool so no attempt queues behind others
+            return PolicyExecutor(
+                policy, on_event=self.metrics.incr, hedge_workers=2 * self.max_concurrent_requests
+            )
+        
+        return self._lazy('_call_policy', _create)
+    
+    def _circuit_breaker(self, url: str) -> CircuitBreaker:
+        """Get the breaker of one endpoint, shared by every runtime calling it with the same settings."""
+        return get_circuit_breaker(url, self.circuit_breaker_failures, self.circuit_breaker_reset)
+    
+    def _circuit_open(self, url: str) -> bool:
+        return self._circuit_breaker(url).state == "open"
+    
+    def _breaker_stats(self) -> Dict[str, Any]:
+        pool = self.endpoint_pool
+        urls = [endpoint.url for endpoint in pool.endpoints] if pool is not None else [self.base_url]
+        return {url: self._circuit_breaker(url).stats() for url in urls}
+    
+    def _cache_key(
+        self,
+        messages: List[Dict[str, Any]],
+        output_field_name: Optional[str] = None,
+        field_schema: Optional[Dict] = None,
+    ) -> str:
+        """
+        Stable content hash of everything that determines a response.
+        
+        Raw completions (`execute`) and parsed records are cached under different
+        kinds, and records are keyed by the output field they are parsed into.
+        """
+        payload = {
+            "kind": "text" if output_field_name is None else "record",
+            "output_field_name": output_field_name,
+            "model": self.openai_model,
+            "messages": messages,
+            "field_schema": field_schema,
+            "max_tokens": self.max_tokens,
+            "temperature": getattr(self, 'temperature', None),
+            "seed": getattr(self, 'seed', None),
+        }
+        if field_schema is not None and self.label_decoding != "text":
+            payload["label_decoding"] = self.label_decoding
+        return stable_hash(payload)
+    
     def init_runtime(self) -> "Runtime":
         """
         Initialize runtime with LangSmith support.
@@ -85,11 +411,11 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
         # Skip model availability check for Ollama compatibility
         if hasattr(self, '_client') and self._client is None:
             try:
-                # Only try to initialize client if we have the necessary imports
-                from openai import OpenAI
-                self._client = OpenAI(
+                # Runtimes pointing at the same server share one pooled client
+                self._client = get_openai_client(
+                    base_url=self.base_url,
                     api_key=self.openai_api_key,
-                    base_url=os.getenv("OPENAI_BASE_URL", "http://localhost:11434/v1")
+                    settings=self.pool_settings,
                 )
             except Exception as e:
                 logger.warning(f"Could not initialize OpenAI client: {e}")
@@ -98,10 +424,100 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
     
     def execute(self, messages: List[Dict[str, Any]]) -> str:
         """
-        Execute OpenAI request with LangSmith tracing.
+        Execute OpenAI request with LangSmith tracing, served from the response cache when possible.
+        """
+        cache = self.response_cache
+        if cache is not None:
+            key = self._cache_key(messages)
+            cached = cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                return cached
+        
+        completion_text = self._execute_traced(messages).message.content
+        
+        # Empty completions are not cached, so the next call asks again
+        if cache is not None and completion_text:
+            cache.set(key, completion_text)
+        return completion_text
+    
+    def output_field_name(self, output_template: str, extra_fields: Optional[Dict[str, str]] = None) -> str:
+        """
+        Get the single output field a skill's `output_template` produces.
+        """
+        output_fields = compile_template(output_template).bind(extra_fields or {}).fields
+        if len(output_fields) > 1:
+            raise NotImplementedError(f"{self.__class__.__name__} does not support multiple output fields")
+        return output_fields[0]
+    
+    def build_requests(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = True,
+    ) -> List[Dict[str, Any]]:
+        """
+        Render one complete chat completion request body per row, exactly as `batch_to_batch` sends it
+        (prompt layout, label decoding options, sampling parameters).
+        """
+        rendered = self._build_batch_messages(
+            batch, input_template, instructions_template, output_template, extra_fields, instructions_first
+        )
+        return [
+            self._completion_params(messages, self._label_options(output_field_name, field_schema))
+            for messages, output_field_name in rendered
+        ]
+    
+    def send_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Send a request body from `build_requests` and return its first choice as a dict.
+        
+        The request takes the same path as live labeling: answered from the
+        response cache when possible, coalesced with identical requests in
+        flight, traced, and sent under the call policy.
+        """
+        options = dict(request)
+        messages = options.pop("messages")
+        cache = self.response_cache
+        key = None
+        if cache is not None or self.coalesce_requests:
+            key = stable_hash({"request": request})
+        if cache is not None:
+            cached = cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                return dict(cached)
+        
+        def _compute():
+            choice = self._execute_traced(messages, options).model_dump(exclude_none=True)
+            if cache is not None and choice.get("message", {}).get("content") is not None:
+                cache.set(key, choice)
+            return choice
+        
+        if not self.coalesce_requests:
+            return _compute()
+        choice, shared = self.single_flight.do(key, _compute)
+        return dict(choice) if shared else choice
+    
+    def parse_response(self, choice: Any, output_field_name: str, field_schema: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Map a completion choice (or its dict form, as returned by `send_request`) onto the output field,
+        with the runtime's label decoding.
+        """
+        if isinstance(choice, dict):
+            from openai.types.chat.chat_completion import Choice
+            
+            choice = Choice.model_validate(choice)
+        return self._parse_choice(choice, output_field_name, field_schema)
+    
+    def _execute_traced(self, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Send a chat completion request, tracing it when LangSmith is enabled. Returns the first choice.
         """
         if not self.tracing_enabled:
-            return OpenAIChatRuntime.execute(self, messages)
+            return self._send(messages, options)
         
         # Extract input text for tracing
         input_text = self._extract_input_text(messages)
@@ -110,39 +526,34 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
         timestamp = int(time.time())
         run_name = f"adala-{self.openai_model}-{timestamp}"
         
+        run = self._start_run(
+            name=run_name,
+            run_type="llm",
+            inputs={"messages": messages},
+            tags=["adala", "sentiment-analysis", "ollama", "llama3", "execute"],
+            metadata={
+                "model": self.openai_model,
+                "runtime_type": "OpenAIChatRuntime",
+                "framework": "adala",
+                "input_length": len(input_text),
+                "message_count": len(messages),
+                "timestamp": timestamp
+            }
+        )
+        
         try:
-            # Use LangSmith traceable decorator
-            @traceable(
-                name=run_name,
-                project_name=self.project_name,
-                tags=["adala", "sentiment-analysis", "ollama", "llama3", "execute"],
-                metadata={
-                    "model": self.openai_model,
-                    "runtime_type": "OpenAIChatRuntime",
-                    "framework": "adala",
-                    "input_length": len(input_text),
-                    "message_count": len(messages),
-                    "timestamp": timestamp
-                }
-            )
-            def traced_execute():
-                # Call the parent class method directly
-                return OpenAIChatRuntime.execute(self, messages)
-            
-            # Execute with tracing
             start_time = time.time()
-            completion_text = traced_execute()
+            choice = self._send(messages, options)
             execution_time = time.time() - start_time
-            
-            # Log the execution
-            logger.info(f"✅ LangSmith traced execution completed: {run_name} (took {execution_time:.2f}s)")
-            
-            return completion_text
-            
         except Exception as e:
             logger.error(f"❌ Error in traced execution: {e}")
-            # Fallback to non-traced execution
-            return OpenAIChatRuntime.execute(self, messages)
+            self._end_run(run, error=repr(e))
+            raise
+        
+        self._end_run(run, outputs={"output": choice.message.content})
+        logger.info(f"✅ LangSmith traced execution completed: {run_name} (took {execution_time:.2f}s)")
+        
+        return choice
     
     def record_to_record(
         self,
@@ -157,60 +568,1263 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
         """
         Execute OpenAI request with LangSmith tracing for record-to-record operations.
         """
-        if not self.tracing_enabled:
-            return super().record_to_record(
-                record, input_template, instructions_template, output_template,
-                extra_fields, field_schema, instructions_first
-            )
+        messages, output_field_name = self._build_messages(
+            record, input_template, instructions_template, output_template,
+            extra_fields, instructions_first
+        )
+        return self._record_from_messages(
+            record, messages, output_field_name, input_template, instructions_template,
+            output_template, extra_fields, field_schema, instructions_first
+        )
+    
+    def _record_from_messages(
+        self,
+        record: Dict[str, str],
+        messages: List[Dict[str, Any]],
+        output_field_name: str,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+        instructions_first: bool,
+    ) -> Dict[str, str]:
+        """
+        Label one record from its already rendered messages.
+        """
+        cache = self.response_cache
+        key = None
+        if cache is not None or self.coalesce_requests:
+            key = self._cache_key(messages, output_field_name, field_schema)
+        if cache is not None:
+            cached = cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                return dict(cached)
+        near_key = self._near_duplicate_key(
+            record, output_field_name, input_template, instructions_template, output_template, extra_fields, field_schema
+        )
+        if near_key is not None:
+            similar = self.near_duplicate_cache.get(*near_key, skill=output_field_name)
+            if similar is not None:
+                return dict(similar)
+        
+        def _compute():
+            if not self.tracing_enabled:
+                options = self._label_options(output_field_name, field_schema)
+                result = self._parse_choice(self._execute_traced(messages, options), output_field_name, field_schema)
+            else:
+                result = self._record_to_record_traced(
+                    record, messages, output_field_name, input_template, instructions_template,
+                    output_template, extra_fields, field_schema, instructions_first
+                )
+            # A missing or invalid label is not replayed for later identical records
+            if self._is_valid_result(result, output_field_name, field_schema):
+                if cache is not None:
+                    cache.set(key, result)
+                if near_key is not None:
+                    self.near_duplicate_cache.put(*near_key, result, skill=output_field_name)
+            return result
+        
+        if not self.coalesce_requests:
+            return _compute()
+        # Identical prompts already in flight (e.g. from another batch) are awaited, not re-sent
+        result, shared = self.single_flight.do(key, _compute)
+        return dict(result) if shared else result
+    
+    @staticmethod
+    def _is_valid_result(result: Dict[str, Any], output_field_name: str, field_schema: Optional[Dict]) -> bool:
+        """
+        Tell whether a parsed result has an output worth caching: present, and one of the labels if there are any.
+        """
+        value = result.get(output_field_name)
+        if value is None:
+            return False
+        labels = label_enum(field_schema, output_field_name)
+        return not labels or value in labels
+    
+    def _near_duplicate_key(
+        self,
+        record: Dict[str, str],
+        output_field_name: str,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+    ):
+        """
+        (scope, MinHash signature) of a record for the near-duplicate cache, or None when it does not apply.
         
+        Only the record fields used by the input template are compared; the
+        scope covers everything else that shapes the answer, so different
+        skills and prompts never share labels.
+        """
+        near = self.near_duplicate_cache
+        if near is None or not label_enum(field_schema, output_field_name):
+            return None
+        fields = compile_template(input_template).bind(extra_fields or {}).fields
+        text = "\n".join(str(record[name]) for name in fields if name in record)
+        scope = stable_hash([
+            self.openai_model, self.label_decoding, instructions_template, output_template, extra_fields, field_schema
+        ])
+        return scope, near.signature(text)
+    
+    def _record_to_record_traced(
+        self,
+        record: Dict[str, str],
+        messages: List[Dict[str, Any]],
+        output_field_name: str,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+        instructions_first: bool,
+    ) -> Dict[str, str]:
         # Create run name for tracing
         timestamp = int(time.time())
-        record_hash = hash(str(record)) % 10000
+        record_hash = stable_hash(dict(record))[:8]
         run_name = f"adala-record-{record_hash}-{timestamp}"
         
+        run = self._start_run(
+            name=run_name,
+            run_type="chain",
+            inputs={"record": dict(record)},
+            tags=["adala", "record-to-record", "sentiment-analysis"],
+            metadata={
+                "model": self.openai_model,
+                "runtime_type": "OpenAIChatRuntime",
+                "framework": "adala",
+                "input_template": input_template,
+                "instructions_template": instructions_template,
+                "output_template": output_template,
+                "record_keys": list(record.keys()),
+                "extra_fields": extra_fields,
+                "field_schema": field_schema,
+                "instructions_first": instructions_first,
+                "timestamp": timestamp
+            },
+            skill=output_field_name,
+        )
+        
+        options = self._label_options(output_field_name, field_schema)
+        # Nested execute() calls are parented to this run
+        token = _current_run.set(run)
         try:
-            @traceable(
-                name=run_name,
-                project_name=self.project_name,
-                tags=["adala", "record-to-record", "sentiment-analysis"],
-                metadata={
-                    "model": self.openai_model,
-                    "runtime_type": "OpenAIChatRuntime",
-                    "framework": "adala",
-                    "input_template": input_template,
-                    "instructions_template": instructions_template,
-                    "output_template": output_template,
-                    "record_keys": list(record.keys()),
-                    "extra_fields": extra_fields,
-                    "field_schema": field_schema,
-                    "instructions_first": instructions_first,
-                    "timestamp": timestamp
-                }
-            )
-            def traced_record_to_record():
-                # Call the parent class method directly
-                return OpenAIChatRuntime.record_to_record(
-                    self, record, input_template, instructions_template, output_template,
-                    extra_fields, field_schema, instructions_first
-                )
-            
-            # Execute with tracing
             start_time = time.time()
-            result = traced_record_to_record()
+            result = self._parse_choice(self._execute_traced(messages, options), output_field_name, field_schema)
             execution_time = time.time() - start_time
-            
-            # Log the execution
-            logger.info(f"✅ LangSmith traced record-to-record completed: {run_name} (took {execution_time:.2f}s)")
-            
-            return result
-            
+            self._mark_label_mismatch(run, record, result, output_field_name)
         except Exception as e:
             logger.error(f"❌ Error in traced record-to-record execution: {e}")
-            # Fallback to non-traced execution
-            return OpenAIChatRuntime.record_to_record(
-                self, record, input_template, instructions_template, output_template,
+            self._end_run(run, error=repr(e))
+            raise
+        finally:
+            _current_run.reset(token)
+        
+        self._end_run(run, outputs=result)
+        logger.info(f"✅ LangSmith traced record-to-record completed: {run_name} (took {execution_time:.2f}s)")
+        
+        return result
+    
+    async def aexecute(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        Execute OpenAI request asynchronously with LangSmith tracing.
+        """
+        cache = self.response_cache
+        if cache is not None:
+            key = self._cache_key(messages)
+            cached = cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                return cached
+        
+        completion_text = (await self._aexecute_traced(messages)).message.content
+        
+        if cache is not None and completion_text:
+            cache.set(key, completion_text)
+        return completion_text
+    
+    async def _aexecute_traced(self, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]] = None) -> Any:
+        client = self._get_async_client()
+        
+        async def _create() -> Any:
+            return await self._asend(client, messages, options)
+        
+        if not self.tracing_enabled:
+            return await _create()
+        
+        timestamp = int(time.time())
+        run_name = f"adala-{self.openai_model}-{timestamp}"
+        run = self._start_run(
+            name=run_name,
+            run_type="llm",
+            inputs={"messages": messages},
+            tags=["adala", "sentiment-analysis", "ollama", "llama3", "aexecute"],
+            metadata={
+                "model": self.openai_model,
+                "runtime_type": "OpenAIChatRuntime",
+                "framework": "adala",
+                "input_length": len(self._extract_input_text(messages)),
+                "message_count": len(messages),
+                "timestamp": timestamp
+            }
+        )
+        try:
+            choice = await _create()
+        except Exception as e:
+            self._end_run(run, error=repr(e))
+            raise
+        self._end_run(run, outputs={"output": choice.message.content})
+        return choice
+    
+    async def arecord_to_record(
+        self,
+        record: Dict[str, str],
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = False,
+    ) -> Dict[str, str]:
+        """
+        Asynchronous counterpart of record_to_record.
+        """
+        messages, output_field_name = self._build_messages(
+            record, input_template, instructions_template, output_template,
+            extra_fields, instructions_first
+        )
+        return await self._arecord_from_messages(
+            record, messages, output_field_name, input_template, instructions_template,
+            output_template, extra_fields, field_schema, instructions_first
+        )
+    
+    async def _arecord_from_messages(
+        self,
+        record: Dict[str, str],
+        messages: List[Dict[str, Any]],
+        output_field_name: str,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+        instructions_first: bool,
+    ) -> Dict[str, str]:
+        cache = self.response_cache
+        key = None
+        if cache is not None or self.coalesce_requests:
+            key = self._cache_key(messages, output_field_name, field_schema)
+        if cache is not None:
+            cached = cache.get(key, _MISSING)
+            if cached is not _MISSING:
+                return dict(cached)
+        near_key = self._near_duplicate_key(
+            record, output_field_name, input_template, instructions_template, output_template, extra_fields, field_schema
+        )
+        if near_key is not None:
+            similar = self.near_duplicate_cache.get(*near_key, skill=output_field_name)
+            if similar is not None:
+                return dict(similar)
+        
+        async def _compute():
+            if not self.tracing_enabled:
+                options = self._label_options(output_field_name, field_schema)
+                choice = await self._aexecute_traced(messages, options)
+                result = self._parse_choice(choice, output_field_name, field_schema)
+            else:
+                result = await self._arecord_to_record_traced(
+                    record, messages, output_field_name, input_template, instructions_template,
+                    output_template, extra_fields, field_schema, instructions_first
+                )
+            # A missing or invalid label is not replayed for later identical records
+            if self._is_valid_result(result, output_field_name, field_schema):
+                if cache is not None:
+                    cache.set(key, result)
+                if near_key is not None:
+                    self.near_duplicate_cache.put(*near_key, result, skill=output_field_name)
+            return result
+        
+        if not self.coalesce_requests:
+            return await _compute()
+        result, shared = await self.single_flight.ado(key, _compute)
+        return dict(result) if shared else result
+    
+    async def _arecord_to_record_traced(
+        self,
+        record: Dict[str, str],
+        messages: List[Dict[str, Any]],
+        output_field_name: str,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+        instructions_first: bool,
+    ) -> Dict[str, str]:
+        timestamp = int(time.time())
+        record_hash = stable_hash(dict(record))[:8]
+        run_name = f"adala-record-{record_hash}-{timestamp}"
+        run = self._start_run(
+            name=run_name,
+            run_type="chain",
+            inputs={"record": dict(record)},
+            tags=["adala", "record-to-record", "sentiment-analysis", "async"],
+            metadata={
+                "model": self.openai_model,
+                "runtime_type": "OpenAIChatRuntime",
+                "framework": "adala",
+                "input_template": input_template,
+                "instructions_template": instructions_template,
+                "output_template": output_template,
+                "record_keys": list(record.keys()),
+                "extra_fields": extra_fields,
+                "field_schema": field_schema,
+                "instructions_first": instructions_first,
+                "timestamp": timestamp
+            },
+            skill=output_field_name,
+        )
+        token = _current_run.set(run)
+        try:
+            options = self._label_options(output_field_name, field_schema)
+            choice = await self._aexecute_traced(messages, options)
+            result = self._parse_choice(choice, output_field_name, field_schema)
+            self._mark_label_mismatch(run, record, result, output_field_name)
+        except Exception as e:
+            self._end_run(run, error=repr(e))
+            raise
+        finally:
+            _current_run.reset(token)
+        self._end_run(run, outputs=result)
+        return result
+    
+    def batch_to_batch(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = True,
+    ) -> InternalDataFrame:
+        """
+        Process a batch, sending one request per distinct prompt when `coalesce_requests` is on.
+        
+        `batch` may also be an ArrowBatch; it is then returned with the output
+        columns appended, sharing the input columns instead of copying them.
+        """
+        output = self._batch_outputs(
+            batch, input_template, output_template, instructions_template,
+            extra_fields, field_schema, instructions_first
+        )
+        from arrow_batches import ArrowBatch
+        
+        if isinstance(batch, ArrowBatch):
+            return batch.append_columns(output)
+        return output
+    
+    def _batch_outputs(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+        instructions_first: bool,
+    ) -> InternalDataFrame:
+        """
+        Label a batch and return only the output columns, in the batch's representation.
+        """
+        if not self.coalesce_requests or len(batch) < 2:
+            return self._process_batch(
+                batch, input_template, output_template, instructions_template,
+                extra_fields, field_schema, instructions_first
+            )
+        
+        unique_positions, slots, rendered = self._dedupe_batch(
+            batch, input_template, output_template, instructions_template,
+            extra_fields, field_schema, instructions_first
+        )
+        run, shared_before = self._start_dedup_run(batch, unique_positions)
+        unique_output = self._process_batch(
+            batch.iloc[unique_positions], input_template, output_template, instructions_template,
+            extra_fields, field_schema, instructions_first,
+            rendered=[rendered[position] for position in unique_positions],
+        )
+        self._end_dedup_run(run, len(batch), len(unique_positions), shared_before)
+        return self._fan_out(unique_output, slots, batch.index)
+    
+    async def abatch_to_batch(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = True,
+    ) -> InternalDataFrame:
+        """
+        Asynchronous counterpart of batch_to_batch.
+        """
+        output = await self._abatch_outputs(
+            batch, input_template, output_template, instructions_template,
+            extra_fields, field_schema, instructions_first
+        )
+        from arrow_batches import ArrowBatch
+        
+        if isinstance(batch, ArrowBatch):
+            return batch.append_columns(output)
+        return output
+    
+    async def _abatch_outputs(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+        instructions_first: bool,
+    ) -> InternalDataFrame:
+        """
+        Label a batch and return only the output columns, in the batch's representation.
+        """
+        if not self.coalesce_requests or len(batch) < 2:
+            return await self._aprocess_batch(
+                batch, input_template, output_template, instructions_template,
+                extra_fields, field_schema, instructions_first
+            )
+        
+        unique_positions, slots, rendered = self._dedupe_batch(
+            batch, input_template, output_template, instructions_template,
+            extra_fields, field_schema, instructions_first
+        )
+        run, shared_before = self._start_dedup_run(batch, unique_positions)
+        unique_output = await self._aprocess_batch(
+            batch.iloc[unique_positions], input_template, output_template, instructions_template,
+            extra_fields, field_schema, instructions_first,
+            rendered=[rendered[position] for position in unique_positions],
+        )
+        self._end_dedup_run(run, len(batch), len(unique_positions), shared_before)
+        return self._fan_out(unique_output, slots, batch.index)
+    
+    def _dedupe_batch(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+        instructions_first: bool,
+    ):
+        """
+        Group rows by their rendered prompt.
+        
+        Returns (unique_positions, slots) as in group_duplicates, plus the rendered
+        messages of every row so they are not rendered a second time for sending.
+        """
+        rendered = self._build_batch_messages(
+            batch, input_template, instructions_template, output_template, extra_fields, instructions_first
+        )
+        unique_positions, slots = group_duplicates([
+            self._cache_key(messages, output_field_name, field_schema) for messages, output_field_name in rendered
+        ])
+        return unique_positions, slots, rendered
+    
+    def _fan_out(self, unique_output: InternalDataFrame, slots: List[int], index) -> InternalDataFrame:
+        """
+        Copy each unique row's output to every duplicate row.
+        """
+        output = unique_output.iloc[slots]
+        output.index = index
+        return output
+    
+    def _start_dedup_run(self, batch: InternalDataFrame, unique_positions: List[int]):
+        shared_before = self.single_flight.stats()["shared"]
+        if not self.tracing_enabled:
+            return None, shared_before
+        run = self._start_run(
+            name=f"adala-batch-{int(time.time())}",
+            run_type="chain",
+            inputs={"rows": len(batch)},
+            tags=["adala", "batch", "dedup"],
+            metadata={
+                "model": self.openai_model,
+                "runtime_type": "OpenAIChatRuntime",
+                "framework": "adala",
+            }
+        )
+        return run, shared_before
+    
+    def _end_dedup_run(self, run: Optional[Dict[str, Any]], rows: int, unique: int, shared_before: int) -> None:
+        """
+        Update deduplication counters and attach them to the batch's trace metadata.
+        """
+        inflight_shared = self.single_flight.stats()["shared"] - shared_before
+        stats = self._dedup_stats
+        stats["rows"] += rows
+        stats["unique_prompts"] += unique
+        stats["duplicates"] += rows - unique
+        
+        if run is not None:
+            run["extra"]["metadata"].update({
+                "dedup_rows": rows,
+                "dedup_unique_prompts": unique,
+                "dedup_duplicates": rows - unique,
+                "dedup_ratio": (rows - unique) / rows if rows else 0.0,
+                "dedup_inflight_shared": inflight_shared,
+            })
+            self._end_run(run, outputs={"requests": unique})
+    
+    @property
+    def _dedup_stats(self) -> Dict[str, int]:
+        return self._lazy('_dedup_counters', lambda: {"rows": 0, "unique_prompts": 0, "duplicates": 0})
+    
+    def _process_batch(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = True,
+        rendered: Optional[List[Any]] = None,
+    ) -> InternalDataFrame:
+        """
+        Process a batch, packing `pack_size` records into each request for label-enum skills.
+        
+        `rendered` holds the batch's messages when the caller already built them.
+        """
+        from arrow_batches import ArrowBatch, batch_records, outputs_like
+        
+        plan = self._packing_plan(batch, output_template, instructions_template, extra_fields, field_schema)
+        if plan is None and not self.adaptive_concurrency and getattr(self, "concurrency", 1) not in (None, 1):
+            # pandarallel workers render their own rows, and only work on pandas frames
+            frame = batch.to_pandas() if isinstance(batch, ArrowBatch) else batch
+            output = super().batch_to_batch(
+                frame, input_template, output_template, instructions_template,
+                extra_fields, field_schema, instructions_first
+            )
+            return ArrowBatch.from_pandas(output) if isinstance(batch, ArrowBatch) else output
+        
+        def _process(record):
+            return self.record_to_record(
+                record, input_template, instructions_template, output_template,
                 extra_fields, field_schema, instructions_first
             )
+        
+        if plan is None:
+            def _process_rendered(item):
+                record, (messages, output_field_name) = item
+                return self._record_from_messages(
+                    record, messages, output_field_name, input_template, instructions_template,
+                    output_template, extra_fields, field_schema, instructions_first
+                )
+            
+            if rendered is None:
+                rendered = self._build_batch_messages(
+                    batch, input_template, instructions_template, output_template, extra_fields, instructions_first
+                )
+            records = batch_records(batch)
+            outputs = self._map_records(_process_rendered, list(zip(records, rendered)))
+            return outputs_like(batch, outputs)
+        
+        def _process_chunk(chunk):
+            messages = self._packed_messages(chunk, input_template, extra_fields, plan)
+            try:
+                completion_text = self.execute(messages)
+            except Exception as e:
+                logger.warning(f"Packed request failed, retrying {len(chunk)} records individually: {e}")
+                completion_text = None
+            results = self._unpack(completion_text, len(chunk), plan)
+            return [
+                _process(record) if result is None else result
+                for record, result in zip(batch_records(chunk), results)
+            ]
+        
+        chunks = [batch.iloc[start:start + self.pack_size] for start in range(0, len(batch), self.pack_size)]
+        outputs = [output for chunk_output in self._map_records(_process_chunk, chunks) for output in chunk_output]
+        return outputs_like(batch, outputs)
+    
+    def _map_records(self, fn, items: List[Any]) -> List[Any]:
+        """
+        Apply `fn` to every item, on a thread pool gated by the adaptive limiter when it is enabled.
+        """
+        if not self.adaptive_concurrency or len(items) < 2:
+            return [fn(item) for item in items]
+        with ThreadPoolExecutor(max_workers=min(self.max_concurrent_requests, len(items))) as executor:
+            return list(executor.map(fn, items))
+    
+    def _send(self, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Issue the chat completion request under the call policy (retries, hedging, deadline, breaker).
+        Returns the first choice; `options` are extra request parameters.
+        """
+        params = self._completion_params(messages, options)
+        return self.call_policy.call(lambda timeout: self._send_attempt(params, timeout))
+    
+    def _send_attempt(self, params: Dict[str, Any], timeout: Optional[float]) -> Any:
+        """
+        Send one attempt, holding a slot of the adaptive limiter if enabled, to an endpoint of the pool if any.
+        
+        The request runs under the circuit breaker of the endpoint it is sent to.
+        """
+        from runtime_metrics import RequestTiming, current_request
+        
+        pool = self.endpoint_pool
+        metrics = self.metrics
+        limiter = self.concurrency_limiter
+        queued_at = time.perf_counter()
+        with limiter.slot() if limiter is not None else nullcontext():
+            metrics.observe("queue_wait", time.perf_counter() - queued_at)
+            timing = RequestTiming()
+            token = current_request.set(timing)
+            start = time.perf_counter()
+            try:
+                # Endpoints with an open circuit are skipped while others are available
+                tracked = pool.track(self._affinity_key(params), self._circuit_open) if pool is not None else nullcontext()
+                with tracked as endpoint:
+                    client = self._client if endpoint is None else get_openai_client(
+                        base_url=endpoint.url, api_key=self.openai_api_key, settings=self.pool_settings
+                    )
+                    with self._circuit_breaker(self.base_url if endpoint is None else endpoint.url).guard():
+                        completion = client.chat.completions.create(**params, **self._timeout_param(timeout))
+            except Exception:
+                metrics.incr("errors")
+                raise
+            finally:
+                current_request.reset(token)
+            metrics.record_request(timing, time.perf_counter() - start, getattr(completion, "usage", None))
+        return completion.choices[0]
+    
+    async def _asend(self, client, messages: List[Dict[str, Any]], options: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        Asynchronous counterpart of `_send`.
+        """
+        params = self._completion_params(messages, options)
+        return await self.call_policy.acall(lambda timeout: self._asend_attempt(client, params, timeout))
+    
+    async def _asend_attempt(self, client, params: Dict[str, Any], timeout: Optional[float]) -> Any:
+        from runtime_metrics import RequestTiming, current_request
+        
+        pool = self.endpoint_pool
+        metrics = self.metrics
+        limiter = self.concurrency_limiter
+        queued_at = time.perf_counter()
+        async with limiter.aslot() if limiter is not None else nullcontext():
+            metrics.observe("queue_wait", time.perf_counter() - queued_at)
+            timing = RequestTiming()
+            token = current_request.set(timing)
+            start = time.perf_counter()
+            try:
+                # Endpoints with an open circuit are skipped while others are available
+                tracked = pool.track(self._affinity_key(params), self._circuit_open) if pool is not None else nullcontext()
+                with tracked as endpoint:
+                    if endpoint is not None:
+                        client = get_async_openai_client(
+                            base_url=endpoint.url, api_key=self.openai_api_key, settings=self.pool_settings
+                        )
+                    with self._circuit_breaker(self.base_url if endpoint is None else endpoint.url).guard():
+                        completion = await client.chat.completions.create(**params, **self._timeout_param(timeout))
+            except Exception:
+                metrics.incr("errors")
+                raise
+            finally:
+                current_request.reset(token)
+            metrics.record_request(timing, time.perf_counter() - start, getattr(completion, "usage", None))
+        return completion.choices[0]
+    
+    @staticmethod
+    def _affinity_key(params: Dict[str, Any]) -> Optional[str]:
+        # The system message is the record-independent prompt prefix (see _prompt_layout)
+        messages = params["messages"]
+        if messages and messages[0].get("role") == "system":
+            return messages[0]["content"]
+        return None
+    
+    @staticmethod
+    def _timeout_param(timeout: Optional[float]) -> Dict[str, Any]:
+        # The remaining deadline overrides the client-wide http_timeout for this attempt only
+        return {} if timeout is None else {"timeout": timeout}
+    
+    def _completion_params(
+        self,
+        messages: List[Dict[str, Any]],
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        params = {
+            "model": self.openai_model,
+            "messages": messages,
+            "max_tokens": self.max_tokens,
+        }
+        for name in ("temperature", "seed"):
+            value = getattr(self, name, None)
+            if value is not None:
+                params[name] = value
+        if options:
+            params.update(options)
+        return params
+    
+    async def _aprocess_batch(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = True,
+        rendered: Optional[List[Any]] = None,
+    ) -> InternalDataFrame:
+        """
+        Label a batch on the event loop, keeping at most `max_concurrent_requests` requests in flight.
+        
+        `rendered` holds the batch's messages when the caller already built them.
+        """
+        from arrow_batches import batch_records, outputs_like
+        
+        semaphore = self._get_async_semaphore()
+        
+        async def _process(record):
+            queued_at = time.perf_counter()
+            async with semaphore:
+                self.metrics.observe("batch_queue_wait", time.perf_counter() - queued_at)
+                return await self.arecord_to_record(
+                    record, input_template, instructions_template, output_template,
+                    extra_fields, field_schema, instructions_first
+                )
+        
+        plan = self._packing_plan(batch, output_template, instructions_template, extra_fields, field_schema)
+        if plan is None:
+            async def _process_rendered(record, messages, output_field_name):
+                queued_at = time.perf_counter()
+                async with semaphore:
+                    self.metrics.observe("batch_queue_wait", time.perf_counter() - queued_at)
+                    return await self._arecord_from_messages(
+                        record, messages, output_field_name, input_template, instructions_template,
+                        output_template, extra_fields, field_schema, instructions_first
+                    )
+            
+            if rendered is None:
+                rendered = self._build_batch_messages(
+                    batch, input_template, instructions_template, output_template, extra_fields, instructions_first
+                )
+            records = batch_records(batch)
+            outputs = await asyncio.gather(*(
+                _process_rendered(record, messages, output_field_name)
+                for record, (messages, output_field_name) in zip(records, rendered)
+            ))
+            return outputs_like(batch, outputs)
+        
+        async def _process_chunk(chunk):
+            messages = self._packed_messages(chunk, input_template, extra_fields, plan)
+            try:
+                async with semaphore:
+                    completion_text = await self.aexecute(messages)
+            except Exception as e:
+                logger.warning(f"Packed request failed, retrying {len(chunk)} records individually: {e}")
+                completion_text = None
+            results = self._unpack(completion_text, len(chunk), plan)
+            return await asyncio.gather(*(
+                _process(record) if result is None else _resolved(result)
+                for record, result in zip(batch_records(chunk), results)
+            ))
+        
+        chunks = [batch.iloc[start:start + self.pack_size] for start in range(0, len(batch), self.pack_size)]
+        chunk_outputs = await asyncio.gather(*(_process_chunk(chunk) for chunk in chunks))
+        outputs = [output for chunk_output in chunk_outputs for output in chunk_output]
+        return outputs_like(batch, outputs)
+    
+    def _packing_plan(
+        self,
+        batch: InternalDataFrame,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        field_schema: Optional[Dict],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Decide whether a batch can be packed; returns the shared prompt parts or None.
+        
+        Packing needs a single output field with a label enum, and instructions
+        that do not reference per-record fields (they are sent once per pack).
+        Logprobs decoding scores one label per completion, so it is never packed.
+        """
+        if self.pack_size <= 1 or len(batch) < 2 or self.label_decoding == "logprobs":
+            return None
+        extra_fields = extra_fields or {}
+        output_fields = compile_template(output_template).bind(extra_fields).fields
+        if len(output_fields) != 1:
+            return None
+        output_field_name = output_fields[0]
+        labels = label_enum(field_schema, output_field_name)
+        if not labels:
+            return None
+        # Few-shot examples are chosen per record, so records cannot share one prompt
+        if self.few_shot_k and output_field_name in self._few_shot_indexes:
+            return None
+        instructions = compile_template(instructions_template)
+        if set(instructions.fields) & set(batch.columns):
+            return None
+        return {
+            "output_field_name": output_field_name,
+            "labels": labels,
+            "instructions": instructions.render(extra_fields),
+        }
+    
+    def _packed_messages(
+        self,
+        chunk: InternalDataFrame,
+        input_template: str,
+        extra_fields: Optional[Dict[str, str]],
+        plan: Dict[str, Any],
+    ) -> List[Dict[str, Any]]:
+        inputs = compile_template(input_template).render_columns(chunk, extra_fields or {})
+        return build_packed_messages(plan["instructions"], inputs, plan["output_field_name"], plan["labels"])
+    
+    def _unpack(self, completion_text: Optional[str], size: int, plan: Dict[str, Any]) -> List[Optional[Dict[str, str]]]:
+        """
+        Split a packed answer into per-record outputs; None marks slots to retry individually.
+        """
+        answers = parse_packed_response(completion_text, size, plan["labels"])
+        misses = sum(answer is None for answer in answers)
+        
+        stats = self._packing_stats
+        stats["packed_requests"] += 1
+        stats["packed_records"] += size - misses
+        stats["fallback_records"] += misses
+        
+        return [None if answer is None else {plan["output_field_name"]: answer} for answer in answers]
+    
+    @property
+    def _packing_stats(self) -> Dict[str, int]:
+        return self._lazy(
+            '_packing_counters', lambda: {"packed_requests": 0, "packed_records": 0, "fallback_records": 0}
+        )
+    
+    def as_async(self) -> "LangSmithAsyncRuntime":
+        """
+        Wrap this runtime so it can be passed to `Agent.arun` / `Skill.aapply`.
+        """
+        if AsyncRuntime is None:
+            raise NotImplementedError("as_async() needs an adala version with AsyncRuntime")
+        return LangSmithAsyncRuntime(runtime=self)
+    
+    def _get_async_client(self):
+        """
+        Get the shared AsyncOpenAI client for the running event loop.
+        """
+        return get_async_openai_client(
+            base_url=self.base_url,
+            api_key=self.openai_api_key,
+            settings=self.pool_settings,
+        )
+    
+    def _get_async_semaphore(self) -> asyncio.Semaphore:
+        """
+        Get the request-limiting semaphore for the running event loop, shared across batches.
+        """
+        loop = asyncio.get_running_loop()
+        if getattr(self, '_async_semaphore', None) is None or getattr(self, '_semaphore_loop', None) is not loop:
+            self._async_semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+            self._semaphore_loop = loop
+        return self._async_semaphore
+    
+    def _build_messages(
+        self,
+        record: Dict[str, str],
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        instructions_first: bool = False,
+    ):
+        """
+        Render chat messages for a record, returning them with the output field name.
+        """
+        start = time.perf_counter()
+        extra_fields = extra_fields or {}
+        layout = self._prompt_layout(
+            input_template, instructions_template, output_template, extra_fields, tuple(record.keys()), instructions_first
+        )
+        input_string = layout["input"].render(record)
+        instructions = layout["instructions"].render(record)
+        examples = self._select_examples(layout, [record])
+        messages = self._assemble_messages(layout, input_string, instructions, examples[0] if examples else None)
+        self.metrics.observe("prompt_render", time.perf_counter() - start)
+        return messages, layout["output_field_name"]
+    
+    def _build_batch_messages(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        instructions_first: bool = False,
+    ) -> List[Any]:
+        """
+        Vectorized `_build_messages` over a whole batch: templates are rendered column-wise.
+        """
+        from arrow_batches import batch_records
+        
+        start = time.perf_counter()
+        layout = self._prompt_layout(
+            input_template, instructions_template, output_template, extra_fields or {},
+            tuple(batch.columns), instructions_first
+        )
+        inputs = layout["input"].render_columns(batch)
+        instructions = layout["instructions"].render_columns(batch)
+        output_field_name = layout["output_field_name"]
+        examples = self._select_examples(layout, batch_records(batch)) or [None] * len(inputs)
+        rendered = [
+            (self._assemble_messages(layout, input_string, instructions_string, row_examples), output_field_name)
+            for input_string, instructions_string, row_examples in zip(inputs, instructions, examples)
+        ]
+        self.metrics.observe("prompt_render_batch", time.perf_counter() - start)
+        return rendered
+    
+    def _assemble_messages(
+        self,
+        layout: Dict[str, Any],
+        input_string: str,
+        instructions: str,
+        examples: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        # Few-shot examples go after the system message, which stays the shared prefix
+        turns = []
+        for example in examples or ():
+            turns.append({"role": "user", "content": layout["input"].render(example)})
+            turns.append({"role": "assistant", "content": str(example[layout["output_field_name"]])})
+        prefix = layout["prefix"]
+        if prefix is not None:
+            self._note_prefix(prefix)
+            instructions = instructions.strip()
+            return [
+                {"role": "system", "content": prefix},
+                *turns,
+                {"role": "user", "content": f"{input_string}\n\n{instructions}" if instructions else input_string},
+            ]
+        if layout["instructions_first"]:
+            return [
+                {"role": "system", "content": instructions},
+                *turns,
+                {"role": "user", "content": input_string},
+            ]
+        return [*turns, {"role": "user", "content": f"{input_string}\n\n{instructions}"}]
+    
+    @property
+    def _few_shot_indexes(self) -> Dict[str, "ExampleIndex"]:
+        return self._lazy('_example_indexes', dict)
+    
+    def add_few_shot_examples(
+        self,
+        examples: InternalDataFrame,
+        output_field: str,
+        text_fields: List[str],
+        label_column: Optional[str] = None,
+    ) -> int:
+        """
+        Index labeled rows as few-shot candidates for the skill producing `output_field`.
+        
+        Rows are matched to records by their `text_fields`; `label_column` holds
+        the ground truth (defaults to `output_field`). Call again as more ground
+        truth arrives: the index grows in place. Returns the number of rows added.
+        """
+        from arrow_batches import batch_records
+        from few_shot import ExampleIndex
+        
+        index = self._few_shot_indexes.get(output_field)
+        if index is None:
+            index = self._few_shot_indexes[output_field] = ExampleIndex(output_field, text_fields)
+        label_column = label_column or output_field
+        records = [
+            dict({name: record[name] for name in text_fields}, **{output_field: record[label_column]})
+            for record in batch_records(examples)
+        ]
+        return index.add(records)
+    
+    def _select_examples(self, layout: Dict[str, Any], records: List[Any]) -> Optional[List[List[Dict[str, Any]]]]:
+        """
+        Pick the `few_shot_k` nearest labeled examples for every record; None when few-shot is off.
+        """
+        index = self._few_shot_indexes.get(layout["output_field_name"]) if self.few_shot_k else None
+        if index is None or not len(index):
+            return None
+        start = time.perf_counter()
+        examples = index.nearest(records, self.few_shot_k)
+        self.metrics.observe("few_shot_select", time.perf_counter() - start)
+        return examples
+    
+    def _prompt_layout(
+        self,
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Dict[str, str],
+        columns: tuple,
+        instructions_first: bool,
+    ) -> Dict[str, Any]:
+        """
+        Compile a skill's templates once per set of record columns and extra fields.
+        
+        With `instructions_first`, instructions that reference no record field are
+        sent as a canonical system message (normalized newlines, no surrounding
+        whitespace): servers such as Ollama and vLLM only reuse their KV cache for
+        a byte-identical leading prefix. Instructions that do reference record
+        fields are kept intact, unless `split_instructions` is set: then the text
+        before the first record field becomes the prefix and the remainder follows
+        the record's input in the user message.
+        """
+        try:
+            key = (input_template, instructions_template, output_template,
+                   tuple(sorted(extra_fields.items())), columns, instructions_first)
+            hash(key)
+        except TypeError:
+            key = None
+        layouts = self._prompt_layouts
+        if key is not None and key in layouts:
+            return layouts[key]
+        
+        instructions = compile_template(instructions_template)
+        layout = {
+            "output_field_name": self.output_field_name(output_template, extra_fields),
+            "input": compile_template(input_template).bind(extra_fields),
+            "instructions": instructions.bind(extra_fields),
+            "instructions_first": instructions_first,
+            "prefix": None,
+        }
+        if instructions_first:
+            head, tail = instructions.split(columns)
+            prefix = head.render(extra_fields).replace("\r\n", "\n").strip()
+            # Without a record-independent part there is nothing to share; keep the instructions together
+            if prefix and (tail.is_static or self.split_instructions):
+                layout["prefix"] = prefix
+                layout["instructions"] = tail.bind(extra_fields)
+        
+        if key is not None:
+            if len(layouts) >= 256:
+                layouts.clear()
+            layouts[key] = layout
+        return layout
+    
+    @property
+    def _prompt_layouts(self) -> Dict[Any, Dict[str, Any]]:
+        return self._lazy('_layout_cache', dict)
+    
+    def _note_prefix(self, prefix: str) -> None:
+        """
+        Count whether this prompt prefix was sent recently, a client-side view of KV-cache reuse.
+        """
+        recent = self._recent_prefixes
+        key = hash(prefix)
+        with self._prefix_lock:
+            reused = key in recent
+            if reused:
+                recent.move_to_end(key)
+            else:
+                recent[key] = None
+                while len(recent) > 64:
+                    recent.popitem(last=False)
+        self.metrics.incr("prefix_reuse" if reused else "prefix_new")
+    
+    @property
+    def _recent_prefixes(self) -> "OrderedDict[int, None]":
+        def _create() -> "OrderedDict[int, None]":
+            self._prefix_lock = threading.Lock()
+            return OrderedDict()
+        
+        return self._lazy('_prefix_lru', _create)
+    
+    def _prefix_cache_stats(self) -> Dict[str, Any]:
+        metrics = self.metrics
+        reuse, new = metrics.counter("prefix_reuse"), metrics.counter("prefix_new")
+        prompt_tokens = metrics.counter("prompt_tokens_total")
+        cached_tokens = metrics.counter("cached_prompt_tokens_total")
+        return {
+            "prefix_reuse_rate": reuse / (reuse + new) if reuse + new else None,
+            "prompt_tokens": prompt_tokens,
+            "cached_prompt_tokens": cached_tokens,
+            # Only servers that report usage.prompt_tokens_details.cached_tokens fill this in
+            "server_hit_rate": cached_tokens / prompt_tokens if cached_tokens and prompt_tokens else None,
+        }
+    
+    def _parse_completion(
+        self,
+        completion_text: str,
+        output_field_name: str,
+        field_schema: Optional[Dict] = None,
+    ) -> Dict[str, str]:
+        """
+        Map a completion onto the output field, snapping it to the label enum when one is defined.
+        """
+        start = time.perf_counter()
+        labels = label_enum(field_schema, output_field_name)
+        if labels:
+            completion_text = match_label(completion_text, labels)
+            if completion_text is None:
+                self.metrics.incr("invalid_labels")
+        self.metrics.observe("parse", time.perf_counter() - start)
+        return {output_field_name: completion_text}
+    
+    def _label_options(self, output_field_name: str, field_schema: Optional[Dict]) -> Optional[Dict[str, Any]]:
+        """
+        Extra request parameters for the label decoding mode, capping max_tokens to the longest label.
+        
+        Array schemas (what `ClassificationSkill(labels=...)` builds) take their labels from
+        `items.enum`; the record still gets a single label, as with the text decoding mode.
+        """
+        labels = label_enum(field_schema, output_field_name)
+        if self.label_decoding == "text" or not labels:
+            return None
+        budget = label_token_budget(labels)
+        if self.label_decoding == "logprobs":
+            return {
+                "max_tokens": min(self.max_tokens, budget),
+                "logprobs": True,
+                "top_logprobs": self.label_top_logprobs,
+            }
+        # Room for the {"<field>": "..."} wrapper around the label
+        wrapper = len(output_field_name.encode("utf-8")) + 8
+        return {
+            "max_tokens": min(self.max_tokens, budget + wrapper),
+            "response_format": label_response_format(output_field_name, labels),
+        }
+    
+    def _parse_choice(self, choice: Any, output_field_name: str, field_schema: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Parse a completion choice; in logprobs mode the label is picked from the token
+        distribution and returned with `<field>_score` and `<field>_probabilities`.
+        """
+        completion_text = choice.message.content
+        if self.label_decoding == "text":
+            return self._parse_completion(completion_text, output_field_name, field_schema)
+        
+        labels = label_enum(field_schema, output_field_name)
+        if labels and self.label_decoding == "json_schema":
+            try:
+                value = json.loads(completion_text)[output_field_name]
+            except (TypeError, ValueError, KeyError):
+                value = None
+            if isinstance(value, str):
+                completion_text = value
+        
+        content = getattr(getattr(choice, "logprobs", None), "content", None)
+        if labels and content:
+            probabilities = label_probabilities(
+                [(candidate.token, candidate.logprob) for candidate in content[0].top_logprobs or []], labels
+            )
+            if probabilities:
+                label = max(probabilities, key=probabilities.get)
+                return {
+                    output_field_name: label,
+                    f"{output_field_name}_score": probabilities[label],
+                    f"{output_field_name}_probabilities": probabilities,
+                }
+        return self._parse_completion(completion_text, output_field_name, field_schema)
+    
+    def _start_run(
+        self,
+        name: str,
+        run_type: str,
+        inputs: Dict[str, Any],
+        tags: List[str],
+        metadata: Dict[str, Any],
+        skill: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Build a LangSmith run payload, parented to the run open in the current context.
+        
+        Root runs start a new trace and take its head sampling decision.
+        """
+        start_time = datetime.now(timezone.utc)
+        run_id = str(uuid.uuid4())
+        dotted_order = f"{start_time.strftime('%Y%m%dT%H%M%S%fZ')}{run_id}"
+        
+        parent = _current_run.get()
+        run = {
+            "id": run_id,
+            "name": name,
+            "run_type": run_type,
+            "inputs": inputs,
+            "start_time": start_time,
+            "tags": tags,
+            "extra": {"metadata": metadata},
+            "session_name": self.project_name,
+        }
+        if parent is not None:
+            run["parent_run_id"] = parent["id"]
+            run["trace_id"] = parent["trace_id"]
+            run["dotted_order"] = f"{parent['dotted_order']}.{dotted_order}"
+        else:
+            run["trace_id"] = run_id
+            run["dotted_order"] = dotted_order
+            self.trace_sampler.start_trace(run_id, skill)
+        return run
+    
+    def _end_run(
+        self,
+        run: Dict[str, Any],
+        outputs: Optional[Dict[str, Any]] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        """
+        Complete a run and hand it to the background exporter.
+        """
+        run["end_time"] = datetime.now(timezone.utc)
+        if outputs is not None:
+            run["outputs"] = outputs
+        if error is not None:
+            run["error"] = error
+        
+        exporter = self.trace_exporter
+        if exporter is not None:
+            # Unsampled runs are dropped here, before the exporter serializes anything
+            for finished in self.trace_sampler.finish(run):
+                exporter.submit(finished)
+    
+    def _mark_label_mismatch(
+        self,
+        run: Dict[str, Any],
+        record: Dict[str, Any],
+        result: Dict[str, Any],
+        output_field_name: str,
+    ) -> None:
+        """
+        Flag runs whose prediction disagrees with a ground truth present in the record,
+        as happens for the training batches of `agent.learn`.
+        """
+        expected = record.get(output_field_name)
+        if expected is None or expected != expected:
+            return
+        if str(result.get(output_field_name)) != str(expected):
+            run["extra"]["metadata"]["label_mismatch"] = True
+    
+    def flush_traces(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until all traced runs enqueued so far have been exported.
+        """
+        exporter = getattr(self, '_trace_exporter', None)
+        if exporter is None:
+            return True
+        return exporter.flush(timeout)
+    
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """
+        Stop the endpoint pool's health checks and flush traced runs; call when done with the runtime.
+        
+        Returns whether every trace was exported within `timeout`.
+        """
+        pool = getattr(self, '_endpoint_pool', None)
+        if pool is not None:
+            pool.close(timeout)
+        return self.flush_traces(timeout)
     
     def _extract_input_text(self, messages: List[Dict[str, Any]]) -> str:
         """
@@ -254,5 +1868,57 @@ class LangSmithOpenAIChatRuntime(OpenAIChatRuntime):
             "langsmith_available": LANGSMITH_AVAILABLE,
             "project_name": self.project_name,
             "model": self.openai_model,
-            "api_key_configured": bool(os.getenv("LANGSMITH_API_KEY"))
-        } 
\ No newline at end of file
+            "api_key_configured": bool(os.getenv("LANGSMITH_API_KEY")),
+            "export": self._trace_exporter.stats() if getattr(self, '_trace_exporter', None) else None,
+            "cache": self.response_cache.stats() if self.cache_enabled else None,
+            "packing": dict(self._packing_stats) if self.pack_size > 1 else None,
+            "concurrency": self.concurrency_limiter.stats() if self.adaptive_concurrency else None,
+            "dedup": dict(self._dedup_stats, inflight=self.single_flight.stats()) if self.coalesce_requests else None,
+            "sampling": self.trace_sampler.stats() if self.tracing_enabled else None,
+            "prefix_cache": self._prefix_cache_stats(),
+            "semantic_cache": self.near_duplicate_cache.stats() if self.semantic_cache else None,
+            "few_shot": {field: len(index) for field, index in self._few_shot_indexes.items()} if self.few_shot_k else None,
+            "policy": dict(self.call_policy.stats(), breaker=self._breaker_stats()),
+            "endpoints": self.endpoint_pool.stats() if self.endpoint_pool is not None else None,
+            "metrics": self.metrics.snapshot(),
+        }
+    
+    def get_metrics_prometheus(self) -> str:
+        """
+        Get the runtime metrics in the Prometheus text exposition format.
+        """
+        return self.metrics.to_prometheus()
+    
+    def dump_metrics(self, path: str) -> None:
+        """
+        Write the runtime metrics to a Prometheus text file.
+        """
+        self.metrics.dump(path)
+    
+    def serve_metrics(self, port: int = 9464, host: str = "127.0.0.1"):
+        """
+        Expose the runtime metrics at `http://host:port/metrics` for Prometheus scraping.
+        """
+        from runtime_metrics import serve_metrics
+        
+        return serve_metrics([self.metrics], port=port, host=host)
+
+
+async def _resolved(value):
+    return value
+
+
+if AsyncRuntime is not None:
+    class LangSmithAsyncRuntime(AsyncRuntime):
+        """
+        AsyncRuntime adapter over LangSmithOpenAIChatRuntime's native asyncio path.
+        """
+        
+        runtime: LangSmithOpenAIChatRuntime
+        
+        async def record_to_record(self, record: Dict[str, str], *args, **kwargs) -> Dict[str, str]:
+            return await self.runtime.arecord_to_record(record, *args, **kwargs)
+        
+        async def batch_to_batch(self, batch: InternalDataFrame, *args, **kwargs) -> InternalDataFrame:
+            return await self.runtime.abatch_to_batch(batch, *args, **kwargs)
+
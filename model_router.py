@@ -0,0 +1,215 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+from adala.runtimes.base import Runtime
+from adala.utils.internal_data import InternalDataFrame
+from adala.utils.parse import parse_template, partial_str_format
+from pydantic import Field, model_validator
+
+from arrow_batches import ArrowBatch, batch_records, outputs_like
+from label_utils import label_enum
+from langsmith_runtime import LangSmithOpenAIChatRuntime
+
+_stats_init_lock = threading.Lock()
+
+
+class RoutingRuntime(Runtime):
+    """
+    Cascade over several LangSmithOpenAIChatRuntime models, cheapest first.
+
+    `costs` gives the cost of labeling one record with each model (any unit,
+    e.g. dollars or GPU-seconds); the cascade runs in increasing cost order.
+    Every record goes to the cheapest model; it is escalated to the next one
+    only when its output fails validation (empty, or outside the skill's
+    label enum) or when the model reports a confidence below
+    `min_confidence` in the ``<field>_score`` column. Rows the last model
+    still gets wrong are returned as the last model answered them.
+
+    `get_routing_stats` reports per-model load, latency, escalation rate and
+    cost, and the saving against sending every record to the most expensive model.
+    """
+
+    models: List[LangSmithOpenAIChatRuntime] = Field(min_length=1)
+    costs: List[float] = Field(min_length=1)
+    min_confidence: Optional[float] = Field(default=None, ge=0.0, le=1.0)
+
+    @model_validator(mode="after")
+    def _order_by_cost(self) -> "RoutingRuntime":
+        if len(self.costs) != len(self.models):
+            raise ValueError(f"Got {len(self.costs)} costs for {len(self.models)} models")
+        if any(cost < 0 for cost in self.costs):
+            raise ValueError("Model costs must not be negative")
+        # sorted() is stable, so equally priced models keep their given order
+        tiers = sorted(zip(self.costs, range(len(self.models))))
+        self.models = [self.models[i] for _, i in tiers]
+        self.costs = [cost for cost, _ in tiers]
+        return self
+
+    def init_runtime(self) -> "Runtime":
+        for model in self.models:
+            model.init_runtime()
+        return self
+
+    def record_to_record(
+        self,
+        record: Dict[str, str],
+        input_template: str,
+        instructions_template: str,
+        output_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = False,
+    ) -> Dict[str, str]:
+        """
+        Label one record, escalating through the models until its output validates.
+        """
+        fields = self._output_fields(output_template, extra_fields)
+        result = None
+        for tier, model in enumerate(self.models):
+            with self._track(tier, 1):
+                result = model.record_to_record(
+                    record,
+                    input_template=input_template,
+                    instructions_template=instructions_template,
+                    output_template=output_template,
+                    extra_fields=extra_fields,
+                    field_schema=field_schema,
+                    instructions_first=instructions_first,
+                )
+            if tier == len(self.models) - 1 or not self._needs_escalation(result, fields, field_schema):
+                break
+            self._count(tier, "escalated", 1)
+        return result
+
+    def batch_to_batch(
+        self,
+        batch: InternalDataFrame,
+        input_template: str,
+        output_template: str,
+        instructions_template: str,
+        extra_fields: Optional[Dict[str, str]] = None,
+        field_schema: Optional[Dict] = None,
+        instructions_first: bool = True,
+    ) -> InternalDataFrame:
+        """
+        Label a batch with the cheapest model, then re-send only the failing rows to the next.
+
+        Each model keeps its own batching (concurrency, packing, caching) for the rows it gets.
+        `batch` may be a pandas frame or an ArrowBatch; rows are selected by position
+        through the same batch abstraction the runtime uses.
+        """
+        fields = self._output_fields(output_template, extra_fields)
+        results: List[Dict[str, Any]] = [{} for _ in range(len(batch))]
+        # Positions in `batch` of the rows still to label
+        positions = list(range(len(batch)))
+        pending = batch
+        for tier, model in enumerate(self.models):
+            with self._track(tier, len(pending)):
+                # By keyword: runtimes disagree on the order of the template arguments
+                tier_output = model.batch_to_batch(
+                    pending,
+                    input_template=input_template,
+                    instructions_template=instructions_template,
+                    output_template=output_template,
+                    extra_fields=extra_fields,
+                    field_schema=field_schema,
+                    instructions_first=instructions_first,
+                )
+            # ArrowBatch outputs come back appended to the input columns
+            columns = [
+                name for name in tier_output.columns
+                if name in fields or not isinstance(tier_output, ArrowBatch) or name not in pending.columns
+            ]
+            failing = []
+            for offset, (position, row) in enumerate(zip(positions, batch_records(tier_output))):
+                results[position] = {name: row[name] for name in columns}
+                if tier < len(self.models) - 1 and self._needs_escalation(results[position], fields, field_schema):
+                    failing.append(offset)
+            if not failing:
+                break
+            self._count(tier, "escalated", len(failing))
+            positions = [positions[offset] for offset in failing]
+            pending = pending.iloc[failing]
+        output = outputs_like(batch, results)
+        if isinstance(batch, ArrowBatch):
+            return batch.append_columns(output)
+        return output
+
+    def _output_fields(self, output_template: str, extra_fields: Optional[Dict[str, str]]) -> List[str]:
+        fields = parse_template(partial_str_format(output_template, **(extra_fields or {})), include_texts=False)
+        return [field["text"] for field in fields]
+
+    def _needs_escalation(self, result: Any, fields: List[str], field_schema: Optional[Dict]) -> bool:
+        for name in fields:
+            value = result.get(name)
+            if value is None or value != value or (isinstance(value, str) and not value.strip()):
+                return True
+            labels = label_enum(field_schema, name)
+            if labels and value not in labels:
+                return True
+            if self.min_confidence is not None:
+                score = result.get(f"{name}_score")
+                if score is not None and score == score and score < self.min_confidence:
+                    return True
+        return False
+
+    @property
+    def _stats(self) -> List[Dict[str, float]]:
+        if getattr(self, '_tier_stats', None) is None:
+            with _stats_init_lock:
+                if getattr(self, '_tier_stats', None) is None:
+                    self._stats_lock = threading.Lock()
+                    self._tier_stats = [
+                        {"records": 0, "escalated": 0, "in_flight": 0, "busy_seconds": 0.0}
+                        for _ in self.models
+                    ]
+        return self._tier_stats
+
+    def _count(self, tier: int, name: str, value: float) -> None:
+        stats = self._stats
+        with self._stats_lock:
+            stats[tier][name] += value
+
+    @contextmanager
+    def _track(self, tier: int, records: int):
+        start = time.perf_counter()
+        self._count(tier, "records", records)
+        self._count(tier, "in_flight", records)
+        try:
+            yield
+        finally:
+            self._count(tier, "in_flight", -records)
+            self._count(tier, "busy_seconds", time.perf_counter() - start)
+
+    def get_routing_stats(self) -> Dict[str, Any]:
+        """
+        Get per-model load, latency, escalation rate and cost, plus the cascade's totals.
+
+        ``saved_cost`` compares the cascade with labeling every record on the
+        most expensive model alone.
+        """
+        stats = self._stats
+        with self._stats_lock:
+            snapshot = [dict(tier_stats) for tier_stats in stats]
+        tiers = []
+        for model, cost, tier_stats in zip(self.models, self.costs, snapshot):
+            records = tier_stats["records"]
+            tiers.append(dict(
+                tier_stats,
+                model=model.openai_model,
+                cost_per_record=cost,
+                cost=records * cost,
+                escalation_rate=tier_stats["escalated"] / records if records else 0.0,
+                seconds_per_record=tier_stats["busy_seconds"] / records if records else None,
+                latency=model.metrics.snapshot()["histograms"].get("llm_total"),
+            ))
+        total_cost = sum(tier["cost"] for tier in tiers)
+        records = snapshot[0]["records"]
+        return {
+            "records": records,
+            "cost": total_cost,
+            "saved_cost": records * self.costs[-1] - total_cost,
+            "tiers": tiers,
+        }
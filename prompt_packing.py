@@ -0,0 +1,64 @@
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+
+_JSON_OBJECT = re.compile(r"\{.*\}", re.DOTALL)
+
+
+def build_packed_messages(
+    instructions: str,
+    inputs: List[str],
+    output_field_name: str,
+    labels: List[str],
+) -> List[Dict[str, Any]]:
+    """
+    Build one chat request that labels several inputs, each in a numbered slot.
+
+    The instructions are sent once for the whole pack and the model is asked
+    for a JSON object mapping every slot number to exactly one label. The
+    system message does not depend on the pack size, so it stays a stable
+    prefix the server can reuse from its KV cache.
+    """
+    label_list = ", ".join(json.dumps(label, ensure_ascii=False) for label in labels)
+    system = (
+        f"{instructions}\n\n"
+        f"You will receive numbered inputs. Label each one independently.\n"
+        f"Respond with only a JSON object that maps every input number to its {output_field_name}, "
+        f"which must be exactly one of: {label_list}.\n"
+        f'Example: {{"1": {json.dumps(labels[0], ensure_ascii=False)}}}'
+    )
+    user = "\n\n".join(f"[{i}]\n{text}" for i, text in enumerate(inputs, start=1))
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+
+def parse_packed_response(completion_text: Optional[str], size: int, labels: List[str]) -> List[Optional[str]]:
+    """
+    Split a packed JSON answer back into per-slot labels.
+
+    Slots that are missing or do not match a label come back as None so the
+    caller can re-issue them as single-record requests.
+    """
+    results: List[Optional[str]] = [None] * size
+    if not completion_text:
+        return results
+    match = _JSON_OBJECT.search(completion_text)
+    if not match:
+        return results
+    try:
+        answer = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return results
+    if not isinstance(answer, dict):
+        return results
+
+    allowed = {label.lower(): label for label in labels}
+    for i in range(size):
+        value = answer.get(str(i + 1))
+        if isinstance(value, str):
+            # Only accept exact (case-insensitive) labels; anything fuzzier is retried alone
+            results[i] = allowed.get(value.strip().lower())
+    return results
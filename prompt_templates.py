@@ -0,0 +1,157 @@
+import re
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+# Same placeholders as adala's partial_str_format: `{name}`, but not `{{name}}` or JSON-like braces.
+# Group 2 holds attribute/index access, a conversion or a format spec (`{a.b}`, `{a[0]}`, `{x!r}`, `{x:.10}`)
+_PLACEHOLDER = re.compile(r"(?<!\{)\{(\w+)((?:\.\w+|\[[^\]{}]*\])*(?:![rsa])?(?::[^{}]*)?)\}(?!\})")
+
+
+class CompiledTemplate:
+    """
+    A prompt template parsed once into static text segments and field slots.
+
+    ``literals`` always has one more element than ``fields``; rendering
+    interleaves them, with ``{{``/``}}`` unescaped as str.format does. Fields
+    without a value are kept as ``{name}``, like partial_str_format, so
+    templates can be bound in stages.
+
+    Templates using format specs, conversions or attribute/index access are
+    not split into segments; they render through adala's partial_str_format.
+    """
+
+    __slots__ = ("source", "literals", "texts", "fields", "_bound")
+
+    def __init__(self, source: str):
+        self.source = source or ""
+        literals, fields = [], []
+        last = 0
+        formatted = False
+        for match in _PLACEHOLDER.finditer(self.source):
+            literals.append(self.source[last:match.start()])
+            fields.append(match.group(1))
+            formatted = formatted or bool(match.group(2))
+            last = match.end()
+        literals.append(self.source[last:])
+        self.literals: Tuple[str, ...] = tuple(literals)
+        self.texts: Tuple[str, ...] = tuple(_unescape(literal) for literal in literals)
+        self.fields: Tuple[str, ...] = tuple(fields)
+        # Values bound so far, for templates rendered by partial_str_format; None otherwise
+        self._bound: Optional[Dict[str, Any]] = {} if formatted else None
+
+    @property
+    def is_static(self) -> bool:
+        return not self.fields
+
+    def render(self, *mappings: Mapping[str, Any]) -> str:
+        """
+        Render with values looked up in `mappings`, first match wins.
+        """
+        if self._bound is not None:
+            return self._format(mappings)
+        if not self.fields:
+            return self.texts[0]
+        parts = [self.texts[0]]
+        for field, text in zip(self.fields, self.texts[1:]):
+            parts.append(_lookup(field, mappings))
+            parts.append(text)
+        return "".join(parts)
+
+    def bind(self, values: Optional[Mapping[str, Any]]) -> "CompiledTemplate":
+        """
+        Fill the fields present in `values` and return the remaining template.
+        """
+        if not values or not any(field in values for field in self.fields):
+            return self
+        if self._bound is not None:
+            bound = CompiledTemplate(self.source)
+            bound._bound = dict(self._bound, **{field: values[field] for field in self.fields if field in values})
+            bound.fields = tuple(field for field in self.fields if field not in bound._bound)
+            return bound
+        # Values are escaped so braces in them stay text in the bound template
+        parts = [self.literals[0]]
+        for field, literal in zip(self.fields, self.literals[1:]):
+            parts.append(_escape(str(values[field])) if field in values else "{" + field + "}")
+            parts.append(literal)
+        return compile_template("".join(parts))
+
+    def split(self, names: Iterable[str]) -> Tuple["CompiledTemplate", "CompiledTemplate"]:
+        """
+        Split before the first field in `names`: (part without those fields, rest).
+        """
+        names = set(names)
+        if self._bound is not None:
+            # Cannot be cut between placeholders: all of it goes where its first such field would
+            return (_EMPTY, self) if names & set(self.fields) else (self, _EMPTY)
+        for i, field in enumerate(self.fields):
+            if field in names:
+                head = "".join(_join(self.literals[:i + 1], self.fields[:i]))
+                tail = self.source[len(head):]
+                return compile_template(head), compile_template(tail)
+        return self, _EMPTY
+
+    def render_columns(self, frame: Any, *mappings: Mapping[str, Any]) -> List[str]:
+        """
+        Render one string per row, concatenating whole columns instead of formatting row by row.
+
+        `frame` is a pandas DataFrame or an ArrowBatch.
+        """
+        from arrow_batches import batch_records, string_column
+
+        if self._bound is not None:
+            return [self._format((record, *mappings)) for record in batch_records(frame)]
+        rendered = np.full(len(frame), self.texts[0], dtype=object)
+        for field, text in zip(self.fields, self.texts[1:]):
+            if field in frame.columns:
+                rendered = rendered + string_column(frame, field)
+            else:
+                rendered = rendered + _lookup(field, mappings)
+            if text:
+                rendered = rendered + text
+        return rendered.tolist()
+
+    def _format(self, mappings: Iterable[Optional[Mapping[str, Any]]]) -> str:
+        from adala.utils.parse import partial_str_format
+
+        values: Dict[str, Any] = {}
+        for mapping in reversed(tuple(mappings)):
+            if mapping is not None:
+                values.update((field, mapping[field]) for field in self.fields if field in mapping)
+        values.update(self._bound)
+        return partial_str_format(self.source, **values)
+
+
+def _lookup(field: str, mappings: Iterable[Mapping[str, Any]]) -> str:
+    for mapping in mappings:
+        if mapping is not None and field in mapping:
+            return str(mapping[field])
+    return "{" + field + "}"
+
+
+def _unescape(literal: str) -> str:
+    return literal.replace("{{", "{").replace("}}", "}")
+
+
+def _escape(value: str) -> str:
+    return value.replace("{", "{{").replace("}", "}}")
+
+
+def _join(literals: Iterable[str], fields: Iterable[str]) -> Iterable[str]:
+    literals = list(literals)
+    yield literals[0]
+    for field, literal in zip(fields, literals[1:]):
+        yield "{" + field + "}"
+        yield literal
+
+
+@lru_cache(maxsize=1024)
+def compile_template(source: str) -> CompiledTemplate:
+    """
+    Get the compiled form of a template; skills reuse the same strings, so this parses each once.
+    """
+    return CompiledTemplate(source)
+
+
+_EMPTY = CompiledTemplate("")
@@ -17,11 +17,6 @@ load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "ollama")
 os.environ["OPENAI_BASE_URL"] = os.getenv("OPENAI_BASE_URL", "http://localhost:11434/v1")
 
-# Configure OpenAI client for Ollama
-import openai
-openai.api_base = os.getenv("OPENAI_BASE_URL", "http://localhost:11434/v1")
-openai.api_key = os.getenv("OPENAI_API_KEY", "ollama")
-
 # Configure LangSmith (optional - will be disabled if not configured)
 langsmith_api_key = os.getenv("LANGSMITH_API_KEY")
 if langsmith_api_key:
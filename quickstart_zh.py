@@ -15,11 +15,6 @@ load_dotenv()
 os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY", "ollama")
 os.environ["OPENAI_BASE_URL"] = os.getenv("OPENAI_BASE_URL", "http://localhost:11434/v1")
 
-# Configure OpenAI client for Ollama
-import openai
-openai.api_base = os.getenv("OPENAI_BASE_URL", "http://localhost:11434/v1")
-openai.api_key = os.getenv("OPENAI_API_KEY", "ollama")
-
 # Train dataset
 train_df = pd.DataFrame([
     ["It was the negative first impressions, and then it started working.", "Positive"],
@@ -0,0 +1,133 @@
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Sequence, Tuple
+
+
+class _Call:
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _AsyncCall:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[Any]"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the work; callers arriving while it is in
+    flight wait for and share its result (or exception). Blocking callers and
+    event-loop callers are tracked separately since they cannot wait on each other.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], _AsyncCall] = {}
+        self._stats = {"executed": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run `fn` unless a call for `key` is already in flight. Returns (result, shared).
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["shared"] += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self._stats["executed"] += 1
+                leader = True
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result, False
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Asynchronous counterpart of `do`, scoped to the running event loop.
+
+        The work runs in its own task that every caller, the first one included,
+        awaits through `asyncio.shield`: cancelling any caller only stops its own
+        wait, and the task itself is cancelled once no caller is left waiting.
+        """
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            call = self._async_calls.get(loop_key)
+            if call is not None:
+                self._stats["shared"] += 1
+                leader = False
+            else:
+                call = self._async_calls[loop_key] = _AsyncCall(loop.create_task(fn()))
+                call.task.add_done_callback(lambda task: self._release(loop_key, call))
+                self._stats["executed"] += 1
+                leader = True
+            call.waiters += 1
+
+        try:
+            return await asyncio.shield(call.task), not leader
+        except asyncio.CancelledError:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0
+            if abandoned:
+                call.task.cancel()
+            raise
+
+    def _release(self, loop_key: Tuple[int, Hashable], call: "_AsyncCall") -> None:
+        with self._lock:
+            if self._async_calls.get(loop_key) is call:
+                del self._async_calls[loop_key]
+        if not call.task.cancelled():
+            # Mark retrieved so a failure nobody else waited on is not logged as unhandled
+            call.task.exception()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of executed and shared calls.
+        """
+        with self._lock:
+            return dict(self._stats)
+
+
+def group_duplicates(keys: Sequence[Hashable]) -> Tuple[List[int], List[int]]:
+    """
+    Find the first position of every distinct key.
+
+    Returns (unique_positions, slots) where ``slots[i]`` is the index into
+    ``unique_positions`` holding the result for ``keys[i]``.
+    """
+    first_slot: Dict[Hashable, int] = {}
+    unique_positions: List[int] = []
+    slots: List[int] = []
+    for position, key in enumerate(keys):
+        slot = first_slot.get(key)
+        if slot is None:
+            slot = first_slot[key] = len(unique_positions)
+            unique_positions.append(position)
+        slots.append(slot)
+    return unique_positions, slots
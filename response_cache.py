@@ -0,0 +1,169 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+def stable_hash(payload: Any) -> str:
+    """
+    Content hash of a JSON-serializable payload that is stable across processes and runs.
+    """
+    canonical = json.dumps(payload, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Content-addressed LLM response cache: an in-memory LRU in front of a SQLite table.
+
+    Entries older than ``ttl`` seconds are treated as misses and removed. Once the
+    table grows past ``max_entries`` the oldest entries are evicted. The SQLite
+    connection is reopened after a fork so pandarallel workers can share the file.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        ttl: Optional[float] = None,
+        max_entries: int = 100000,
+        memory_entries: int = 4096,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.memory_entries = memory_entries
+
+        self._memory: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        self._writes_since_evict = 0
+        self._stats = {"hits": 0, "memory_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a cached value, returning `default` on a miss.
+        """
+        with self._lock:
+            entry = self._memory.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, created = entry
+                if not self._expired(created):
+                    self._memory.move_to_end(key)
+                    self._stats["hits"] += 1
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            row = None
+            conn = self._connection()
+            if conn is not None:
+                row = conn.execute("SELECT value, created FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self._stats["misses"] += 1
+                return default
+
+            value, created = json.loads(row[0]), row[1]
+            if self._expired(created):
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self._stats["misses"] += 1
+                self._stats["evictions"] += 1
+                return default
+
+            self._remember(key, value, created)
+            self._stats["hits"] += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store a JSON-serializable value under `key`.
+        """
+        created = time.time()
+        with self._lock:
+            self._remember(key, value, created)
+            self._stats["writes"] += 1
+            conn = self._connection()
+            if conn is None:
+                return
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created) VALUES (?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), created),
+            )
+            conn.commit()
+            self._writes_since_evict += 1
+            # Size-based eviction is amortized over a fraction of the table size
+            if self._writes_since_evict >= max(1, self.max_entries // 10):
+                self._evict(conn)
+
+    def clear(self) -> None:
+        """
+        Drop every cached entry, in memory and on disk.
+        """
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                conn.execute("DELETE FROM responses")
+                conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get hit/miss counters and the hit rate.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_size"] = len(self._memory)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.time() - created > self.ttl
+
+    def _remember(self, key: str, value: Any, created: float) -> None:
+        self._memory[key] = (value, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        self._writes_since_evict = 0
+        if self.ttl is not None:
+            cursor = conn.execute("DELETE FROM responses WHERE created < ?", (time.time() - self.ttl,))
+            self._stats["evictions"] += cursor.rowcount
+        (count,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY created LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evictions"] += overflow
+        conn.commit()
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        if not self.path:
+            return None
+        if self._conn is None or self._conn_pid != os.getpid():
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS responses_created ON responses (created)")
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
@@ -0,0 +1,267 @@
+import bisect
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+# Seconds; tuned for local inference where calls range from milliseconds to a minute
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+TOKEN_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram with interpolated quantiles, Prometheus style.
+    """
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return self.buckets[-1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class RequestTiming:
+    """
+    Per-request scratchpad filled in by the HTTP client hooks.
+    """
+
+    __slots__ = ("attempts", "sent_at", "ttfb")
+
+    def __init__(self):
+        self.attempts = 0
+        self.sent_at: Optional[float] = None
+        self.ttfb: Optional[float] = None
+
+
+# Timing of the chat request currently being sent in this thread / task
+current_request: ContextVar[Optional[RequestTiming]] = ContextVar("current_request", default=None)
+
+
+def on_request(request) -> None:
+    """httpx request hook: count attempts (SDK-level retries included) and stamp the send time."""
+    timing = current_request.get()
+    if timing is not None:
+        timing.attempts += 1
+        timing.sent_at = time.perf_counter()
+
+
+def on_response(response) -> None:
+    """httpx response hook: fires once headers arrive, before the body is read."""
+    timing = current_request.get()
+    if timing is not None and timing.sent_at is not None:
+        timing.ttfb = time.perf_counter() - timing.sent_at
+
+
+async def aon_request(request) -> None:
+    on_request(request)
+
+
+async def aon_response(response) -> None:
+    on_response(response)
+
+
+class RuntimeMetrics:
+    """
+    Thread-safe hot-path metrics for one runtime: stage latency histograms,
+    token histograms and counters.
+
+    Stages: ``prompt_render``, ``queue_wait``, ``ttfb``, ``llm_total`` and
+    ``parse``. Tokens: ``prompt_tokens``, ``completion_tokens``.
+    """
+
+    def __init__(self, labels: Optional[Dict[str, str]] = None):
+        self.labels = labels or {}
+        self._lock = threading.Lock()
+        self._histograms: Dict[str, Histogram] = {}
+        self._counters: Dict[str, float] = {}
+
+    def observe(self, name: str, value: float) -> None:
+        buckets = TOKEN_BUCKETS if name.endswith("_tokens") else LATENCY_BUCKETS
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    def incr(self, name: str, value: float = 1) -> None:
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    @contextmanager
+    def timer(self, stage: str):
+        """
+        Time a block and record it under `stage`.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def record_request(self, timing: RequestTiming, elapsed: float, usage: Any = None) -> None:
+        """
+        Record one finished chat request: total time, TTFB, SDK-level retries and token usage.
+
+        Retries made by the runtime's call policy are counted by the policy itself.
+        """
+        self.observe("llm_total", elapsed)
+        if timing.ttfb is not None:
+            self.observe("ttfb", timing.ttfb)
+        self.incr("requests")
+        if timing.attempts > 1:
+            self.incr("retries", timing.attempts - 1)
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", None)
+            completion_tokens = getattr(usage, "completion_tokens", None)
+            if prompt_tokens is not None:
+                self.observe("prompt_tokens", prompt_tokens)
+                self.incr("prompt_tokens_total", prompt_tokens)
+            # Servers with prefix caching (OpenAI, vLLM) report the reused part of the prompt
+            cached_tokens = getattr(getattr(usage, "prompt_tokens_details", None), "cached_tokens", None)
+            if cached_tokens is not None:
+                self.incr("cached_prompt_tokens_total", cached_tokens)
+            if completion_tokens is not None:
+                self.observe("completion_tokens", completion_tokens)
+                self.incr("completion_tokens_total", completion_tokens)
+
+    def counter(self, name: str) -> float:
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get counters and per-stage summaries (count, sum, mean, p50/p95/p99).
+        """
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "histograms": {name: h.snapshot() for name, h in self._histograms.items()},
+            }
+
+    def to_prometheus(self, prefix: str = "adala_runtime") -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        """
+        return render_prometheus([self], prefix)
+
+    def _families(self, prefix: str) -> Dict[str, Tuple[str, List[str]]]:
+        """
+        Group sample lines by metric family: name -> (type, lines).
+        """
+        base_labels = ",".join(f'{k}="{_escape(v)}"' for k, v in sorted(self.labels.items()))
+        families: Dict[str, Tuple[str, List[str]]] = {}
+        with self._lock:
+            for name, value in self._counters.items():
+                metric = f"{prefix}_{name}"
+                families[metric] = ("counter", [f"{metric}{_braces(base_labels)} {_number(value)}"])
+            for name, histogram in self._histograms.items():
+                unit = "" if name.endswith("_tokens") else "_seconds"
+                metric = f"{prefix}_{name}{unit}"
+                lines = []
+                cumulative = 0
+                for bound, bucket_count in zip(list(histogram.buckets) + [math.inf], histogram.counts):
+                    cumulative += bucket_count
+                    le = "+Inf" if bound == math.inf else _number(bound)
+                    labels = ",".join(filter(None, [base_labels, f'le="{le}"']))
+                    lines.append(f"{metric}_bucket{{{labels}}} {cumulative}")
+                lines.append(f"{metric}_sum{_braces(base_labels)} {_number(histogram.sum)}")
+                lines.append(f"{metric}_count{_braces(base_labels)} {histogram.count}")
+                families[metric] = ("histogram", lines)
+        return families
+
+    def dump(self, path: str, prefix: str = "adala_runtime") -> None:
+        """
+        Write the Prometheus text format to a file (e.g. for node_exporter's textfile collector).
+        """
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.to_prometheus(prefix))
+        # Atomic replace so scrapers never read a half-written file
+        os.replace(tmp_path, path)
+
+
+def render_prometheus(sources: Sequence[RuntimeMetrics], prefix: str = "adala_runtime") -> str:
+    """
+    Render several runtimes' metrics as one exposition, keeping each metric family contiguous.
+    """
+    merged: Dict[str, Tuple[str, List[str]]] = {}
+    for source in sources:
+        for metric, (metric_type, lines) in source._families(prefix).items():
+            merged.setdefault(metric, (metric_type, []))[1].extend(lines)
+    output: List[str] = []
+    for metric in sorted(merged):
+        metric_type, lines = merged[metric]
+        output.append(f"# TYPE {metric} {metric_type}")
+        output.extend(lines)
+    return "\n".join(output) + "\n"
+
+
+def serve_metrics(sources: Sequence[RuntimeMetrics], port: int = 9464, host: str = "127.0.0.1"):
+    """
+    Serve `GET /metrics` for the given metrics objects from a daemon thread.
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = render_prometheus(sources).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="runtime-metrics", daemon=True).start()
+    return server
+
+
+def _braces(labels: str) -> str:
+    return f"{{{labels}}}" if labels else ""
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
@@ -0,0 +1,145 @@
+import re
+import threading
+import unicodedata
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+_WHITESPACE = re.compile(r"\s+")
+_MERSENNE_PRIME = (1 << 31) - 1
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form for near-duplicate matching: NFKC, lower case, collapsed whitespace.
+    """
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFKC", text).lower()).strip()
+
+
+class NearDuplicateCache:
+    """
+    Approximate response cache keyed by MinHash signatures of normalized input text.
+
+    A text is shingled into overlapping character n-grams; its signature is
+    the minimum of ``num_perm`` random hash permutations over those shingles,
+    and the fraction of equal positions between two signatures estimates the
+    Jaccard similarity of their shingle sets. Signatures are split into
+    ``bands`` LSH buckets, so a lookup only compares against entries sharing at
+    least one bucket; the closest candidate at or above ``threshold`` is a hit.
+
+    Entries are scoped (e.g. per skill and prompt) so different tasks never
+    share answers, and the least recently used entries are evicted beyond
+    ``max_entries``. Hit rates are tracked per skill name.
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.9,
+        max_entries: int = 50000,
+        num_perm: int = 64,
+        bands: int = 16,
+        shingle_size: int = 5,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        self._a = rng.randint(1, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+        self._b = rng.randint(0, _MERSENNE_PRIME, size=num_perm).astype(np.uint64)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[int, Tuple[str, np.ndarray, Any]]" = OrderedDict()
+        self._buckets: Dict[Tuple[str, int, bytes], Set[int]] = {}
+        self._next_id = 0
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._evictions = 0
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash signature of a text's normalized character shingles.
+        """
+        text = normalize_text(text)
+        size = self.shingle_size
+        shingles = {text[i:i + size] for i in range(max(1, len(text) - size + 1))}
+        hashes = np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) & _MERSENNE_PRIME for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles),
+        )
+        # a, b and the hashes are below 2**31, so the products fit in 64 bits
+        permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) % _MERSENNE_PRIME
+        return permuted.min(axis=1).astype(np.uint32)
+
+    def _band_keys(self, scope: str, signature: np.ndarray) -> List[Tuple[str, int, bytes]]:
+        rows = self.num_perm // self.bands
+        return [(scope, band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def _skill_stats(self, skill: str) -> Dict[str, int]:
+        stats = self._stats.get(skill)
+        if stats is None:
+            stats = self._stats[skill] = {"lookups": 0, "hits": 0, "stores": 0}
+        return stats
+
+    def get(self, scope: str, signature: np.ndarray, skill: str = "default") -> Optional[Any]:
+        """
+        Get the value stored for the most similar text in `scope`, if it is at least `threshold` similar.
+        """
+        with self._lock:
+            stats = self._skill_stats(skill)
+            stats["lookups"] += 1
+            candidates: Set[int] = set()
+            for key in self._band_keys(scope, signature):
+                candidates |= self._buckets.get(key, set())
+            best, best_similarity = None, self.threshold
+            for entry_id in candidates:
+                _, other, _ = self._entries[entry_id]
+                similarity = float(np.mean(other == signature))
+                if similarity >= best_similarity:
+                    best, best_similarity = entry_id, similarity
+            if best is None:
+                return None
+            self._entries.move_to_end(best)
+            stats["hits"] += 1
+            return self._entries[best][2]
+
+    def put(self, scope: str, signature: np.ndarray, value: Any, skill: str = "default") -> None:
+        """
+        Store a value for a text's signature, evicting the least recently used entries when full.
+        """
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+            self._entries[entry_id] = (scope, signature, value)
+            for key in self._band_keys(scope, signature):
+                self._buckets.setdefault(key, set()).add(entry_id)
+            self._skill_stats(skill)["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._evict()
+
+    def _evict(self) -> None:
+        entry_id, (scope, signature, _) = self._entries.popitem(last=False)
+        for key in self._band_keys(scope, signature):
+            bucket = self._buckets.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del self._buckets[key]
+        self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-skill lookups, hits and hit rate, plus the cache size and evictions.
+        """
+        with self._lock:
+            skills = {name: dict(stats) for name, stats in self._stats.items()}
+            size, evictions = len(self._entries), self._evictions
+        for stats in skills.values():
+            stats["hit_rate"] = stats["hits"] / stats["lookups"] if stats["lookups"] else 0.0
+        return {"entries": size, "evictions": evictions, "threshold": self.threshold, "skills": skills}
@@ -0,0 +1,257 @@
+import json
+import logging
+import os
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+from pydantic import Field
+
+from adala.environments import Environment, StaticEnvironment
+from adala.environments.base import EnvironmentFeedback
+from adala.skills import SkillSet
+from adala.utils.internal_data import InternalDataFrame
+
+from arrow_batches import ArrowBatch
+
+logger = logging.getLogger(__name__)
+
+
+def iter_chunks(
+    path: str,
+    chunk_size: int = 1000,
+    columns: Optional[List[str]] = None,
+    arrow: bool = False,
+) -> Iterator[InternalDataFrame]:
+    """
+    Read a JSONL, Parquet or CSV file in fixed-size chunks.
+
+    Chunks carry a global row index (0, 1, 2, ... across the whole file) so
+    predictions can be matched back to their source rows. With `arrow`,
+    chunks are ArrowBatch objects; Parquet record batches are then used as
+    read, without a pandas conversion.
+    """
+    offset = 0
+    for chunk in _read_chunks(path, chunk_size, columns, arrow):
+        index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        if isinstance(chunk, pd.DataFrame):
+            if arrow:
+                chunk = ArrowBatch.from_pandas(chunk, index)
+            else:
+                chunk.index = index
+        else:
+            chunk = ArrowBatch(chunk, index)
+        yield chunk
+
+
+def _read_chunks(path: str, chunk_size: int, columns: Optional[List[str]], arrow: bool = False) -> Iterator[Any]:
+    suffix = os.path.splitext(path)[1].lower()
+    if suffix in (".jsonl", ".ndjson"):
+        with pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False) as reader:
+            for chunk in reader:
+                yield chunk[columns] if columns else chunk
+    elif suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        for record_batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            if arrow:
+                import pyarrow as pa
+
+                yield pa.Table.from_batches([record_batch])
+            else:
+                yield record_batch.to_pandas()
+    elif suffix == ".csv":
+        yield from pd.read_csv(path, chunksize=chunk_size, usecols=columns)
+    else:
+        raise ValueError(f"Unsupported input format: {path} (expected .jsonl, .ndjson, .parquet or .csv)")
+
+
+class PredictionWriter:
+    """
+    Append predictions to a JSONL or Parquet file chunk by chunk.
+    """
+
+    def __init__(self, path: str, append: bool = False):
+        self.path = path
+        self._format = "parquet" if path.lower().endswith(".parquet") else "jsonl"
+        self._parquet_writer = None
+        self._file = None
+        self.rows_written = 0
+        if self._format == "jsonl":
+            self._file = open(path, "a" if append else "w", encoding="utf-8")
+        elif append and os.path.exists(path):
+            raise ValueError("Appending to an existing Parquet file is not supported")
+
+    def write(self, predictions: Any) -> None:
+        """
+        Append one chunk of predictions; the source row index is kept in a `row_id` column.
+
+        `predictions` is a pandas frame or an ArrowBatch.
+        """
+        if isinstance(predictions, ArrowBatch):
+            import pyarrow as pa
+
+            # Arrow batches go straight to the writer, without a pandas round trip
+            table = predictions.table.add_column(0, "row_id", pa.array(list(predictions.index)))
+            records = table.to_pylist() if self._format == "jsonl" else None
+        else:
+            frame = predictions.reset_index(names="row_id")
+            records = frame.to_dict(orient="records") if self._format == "jsonl" else None
+            table = None if self._format == "jsonl" else self._frame_to_table(frame)
+        if self._format == "jsonl":
+            for record in records:
+                self._file.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+            self._file.flush()
+        else:
+            import pyarrow.parquet as pq
+
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.path, table.schema)
+            self._parquet_writer.write_table(table.cast(self._parquet_writer.schema))
+        self.rows_written += len(predictions)
+
+    @staticmethod
+    def _frame_to_table(frame: pd.DataFrame):
+        import pyarrow as pa
+
+        return pa.Table.from_pandas(frame, preserve_index=False)
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self._parquet_writer = None
+
+    def __enter__(self) -> "PredictionWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class StreamingEnvironment(Environment):
+    """
+    Environment that serves data from a file in chunks, holding only the current chunk in memory.
+
+    `agent.learn(batch_size=...)` takes the next `batch_size` rows of the
+    stream at every iteration; feedback compares the predictions with the
+    ground truth columns read from the file, as StaticEnvironment does with
+    its frame. A whole stream is labeled with `run_streaming`; a bare
+    `agent.run()` would only see one batch, so it is rejected.
+    """
+
+    path: str
+    chunk_size: int = 1000
+    columns: Optional[List[str]] = None
+    ground_truth_columns: Dict[str, str] = Field(default_factory=dict)
+    matching_function: Union[str, Callable] = "fuzzy"
+    matching_threshold: float = 0.9
+
+    def initialize(self):
+        self._chunks = iter_chunks(self.path, self.chunk_size, self.columns)
+        self._pending = None
+        self._rows_served = 0
+
+    def finalize(self):
+        self._chunks = None
+        self._pending = None
+
+    def get_data_batch(self, batch_size: Optional[int] = None) -> InternalDataFrame:
+        """
+        Get the next `batch_size` rows of the stream, fewer at its end, or an empty frame once it is exhausted.
+        """
+        if batch_size is None:
+            raise ValueError(
+                "StreamingEnvironment serves its data in batches: label the whole stream with "
+                "run_streaming(agent, environment, output_path), or pass batch_size to agent.learn"
+            )
+        if getattr(self, '_chunks', None) is None:
+            self.initialize()
+        parts = [] if self._pending is None else [self._pending]
+        available = sum(len(part) for part in parts)
+        for chunk in self._chunks:
+            parts.append(chunk)
+            available += len(chunk)
+            if available >= batch_size:
+                break
+        if not parts:
+            return InternalDataFrame()
+        frame = parts[0] if len(parts) == 1 else InternalDataFrame(pd.concat(parts))
+        batch, rest = frame.iloc[:batch_size], frame.iloc[batch_size:]
+        self._pending = rest if len(rest) else None
+        self._rows_served += len(batch)
+        return batch
+
+    def get_feedback(
+        self,
+        skills: SkillSet,
+        predictions: InternalDataFrame,
+        num_feedbacks: Optional[int] = None,
+    ) -> EnvironmentFeedback:
+        """
+        Compare predictions with the ground truth columns they were read with (see `ground_truth_columns`).
+        """
+        if isinstance(predictions, ArrowBatch):
+            predictions = predictions.to_pandas()
+        # The current batch is the only ground truth in memory, and it travels with the predictions
+        return StaticEnvironment(
+            df=predictions,
+            ground_truth_columns=self.ground_truth_columns,
+            matching_function=self.matching_function,
+            matching_threshold=self.matching_threshold,
+        ).get_feedback(skills, predictions, num_feedbacks)
+
+    def save(self) -> Dict[str, Any]:
+        """
+        Remember (and return) the stream position, i.e. the number of rows served so far.
+        """
+        self._saved_state = {"path": self.path, "rows_served": getattr(self, '_rows_served', 0)}
+        return dict(self._saved_state)
+
+    def restore(self, state: Optional[Dict[str, Any]] = None):
+        """
+        Reopen the stream at a position returned by `save` (the last saved one by default).
+        """
+        state = state or getattr(self, '_saved_state', None) or {"rows_served": 0}
+        self.initialize()
+        skip = state["rows_served"]
+        while skip > 0:
+            skipped = len(self.get_data_batch(batch_size=min(skip, self.chunk_size)))
+            if not skipped:
+                break
+            skip -= skipped
+
+    def __iter__(self) -> Iterator[InternalDataFrame]:
+        return iter_chunks(self.path, self.chunk_size, self.columns)
+
+
+def run_streaming(
+    agent: Any,
+    source: Any,
+    output_path: str,
+    chunk_size: int = 1000,
+    runtime: Optional[str] = None,
+    append: bool = False,
+) -> Dict[str, Any]:
+    """
+    Label a file that does not fit in memory, writing predictions as each chunk completes.
+
+    `source` is a path or a StreamingEnvironment. Memory use is bounded by
+    `chunk_size` regardless of the dataset size.
+    """
+    if isinstance(source, StreamingEnvironment):
+        chunks = iter(source)
+    else:
+        chunks = iter_chunks(source, chunk_size)
+
+    total = 0
+    with PredictionWriter(output_path, append=append) as writer:
+        for chunk in chunks:
+            predictions = agent.run(chunk, runtime=runtime)
+            writer.write(predictions)
+            total += len(chunk)
+            logger.info(f"Labeled {total} rows -> {output_path}")
+    return {"rows": total, "output_path": output_path}
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+from arrow_batches import ArrowBatch, batch_records, outputs_like, string_column
+
+FRAME = pd.DataFrame({"text": ["good", None, "bad"], "score": [1, 2.5, 3]}, index=[10, 11, 12])
+
+
+@pytest.fixture(params=["pandas", "arrow"])
+def batch(request):
+    if request.param == "pandas":
+        return FRAME.copy()
+    pytest.importorskip("pyarrow")
+    return ArrowBatch.from_pandas(FRAME)
+
+
+def test_batch_records_read_rows_by_position(batch):
+    records = batch_records(batch)
+    assert [record["text"] for record in records[::2]] == ["good", "bad"]
+    assert pd.isna(records[1]["text"])
+    assert [record["score"] for record in records] == [1.0, 2.5, 3.0]
+    assert list(records[0]) == ["text", "score"]
+    with pytest.raises(KeyError):
+        records[0]["missing"]
+
+
+def test_string_column_renders_like_str_of_each_record_value(batch):
+    for name in ("text", "score"):
+        assert list(string_column(batch, name)) == [str(record[name]) for record in batch_records(batch)]
+    assert list(string_column(batch, "score")) == ["1.0", "2.5", "3.0"]
+
+
+def test_positional_selection_keeps_the_index(batch):
+    assert list(batch.iloc[[2, 0]].index) == [12, 10]
+    assert list(batch.iloc[1:].index) == [11, 12]
+    assert [record["text"] for record in batch_records(batch.iloc[[2, 0]])] == ["bad", "good"]
+
+
+def test_outputs_like_matches_the_batch_representation(batch):
+    output = outputs_like(batch, [{"label": "a"}, {}, {"label": "c"}])
+    assert isinstance(output, ArrowBatch) == isinstance(batch, ArrowBatch)
+    assert list(output.index) == [10, 11, 12]
+    labels = [record.get("label") for record in batch_records(output)]
+    assert labels[::2] == ["a", "c"] and pd.isna(labels[1])
+
+
+def test_append_columns_shares_the_input_columns():
+    pytest.importorskip("pyarrow")
+    batch = ArrowBatch.from_pandas(FRAME)
+    labeled = batch.append_columns(ArrowBatch.from_records([{"label": "x"}] * 3, batch.index))
+    assert labeled.columns == ["text", "score", "label"]
+    assert labeled.table.column("text").chunks[0].buffers() == batch.table.column("text").chunks[0].buffers()
+    frame = labeled.to_pandas()
+    assert list(frame.index) == [10, 11, 12]
+    assert list(frame["label"]) == ["x", "x", "x"]
+    with pytest.raises(ValueError):
+        batch.append_columns(ArrowBatch.from_records([{"label": "x"}]))
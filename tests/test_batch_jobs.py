@@ -0,0 +1,83 @@
+import json
+
+import pandas as pd
+
+from batch_jobs import compile_job, failed_ids, load_results, merge_results, run_job
+
+
+class FakeSkill:
+    input_template = "Text: {text}"
+    instructions = "Classify."
+    output_template = "{sentiment}"
+    instructions_first = True
+    field_schema = {"sentiment": {"type": "string", "enum": ["positive", "negative"]}}
+
+
+class FakeRuntime:
+    """
+    Stands in for the runtime's public request API; fails each request listed in `fail_once` one time.
+    """
+
+    def __init__(self, fail_once=()):
+        self.fail_once = set(fail_once)
+        self.sent = []
+
+    def init_runtime(self):
+        return self
+
+    def build_requests(self, batch, input_template, instructions_template, output_template,
+                       extra_fields=None, field_schema=None, instructions_first=True):
+        return [
+            {"model": "fake", "messages": [{"role": "user", "content": input_template.format(text=text)}]}
+            for text in batch["text"]
+        ]
+
+    def send_request(self, request):
+        content = request["messages"][0]["content"]
+        self.sent.append(content)
+        if content in self.fail_once:
+            self.fail_once.discard(content)
+            raise ConnectionError("server went away")
+        label = "negative" if "bad" in content else "positive"
+        return {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": label}}
+
+    def output_field_name(self, output_template, extra_fields=None):
+        return "sentiment"
+
+    def parse_response(self, choice, output_field_name, field_schema=None):
+        return {output_field_name: choice["message"]["content"]}
+
+
+def test_compile_run_retry_and_merge(tmp_path):
+    data = pd.DataFrame({"id": ["a", "b", "c"], "text": ["good", "bad", "fine"]})
+    job, results = str(tmp_path / "job.jsonl"), str(tmp_path / "results.jsonl")
+    runtime = FakeRuntime(fail_once={"Text: bad"})
+
+    assert compile_job(FakeSkill(), data, runtime, job, id_column="id") == 3
+    requests = [json.loads(line) for line in open(job)]
+    assert [request["custom_id"] for request in requests] == ["a", "b", "c"]
+    assert requests[0]["url"] == "/v1/chat/completions"
+
+    stats = run_job(runtime, job, results, max_workers=2)
+    assert (stats["succeeded"], stats["failed"]) == (2, 1)
+    assert failed_ids(results) == ["b"]
+
+    # Only the failed request is sent again
+    runtime.sent.clear()
+    stats = run_job(runtime, job, results, max_workers=2, ids=failed_ids(results))
+    assert runtime.sent == ["Text: bad"]
+    assert (stats["succeeded"], stats["skipped"]) == (1, 2)
+    assert failed_ids(results) == []
+
+    merged = merge_results(data, results, FakeSkill(), runtime, id_column="id")
+    assert list(merged["sentiment"]) == ["positive", "negative", "positive"]
+
+
+def test_failed_retry_does_not_shadow_an_earlier_success(tmp_path):
+    path = tmp_path / "results.jsonl"
+    lines = [
+        {"custom_id": "a", "response": {"status_code": 200}, "error": None},
+        {"custom_id": "a", "response": None, "error": {"type": "ConnectionError", "message": "x"}},
+    ]
+    path.write_text("".join(json.dumps(line) + "\n" for line in lines) + "not json\n")
+    assert load_results(str(path))["a"]["error"] is None
@@ -0,0 +1,262 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import call_policy
+from call_policy import CallPolicy, CircuitBreaker, CircuitOpenError, DeadlineExceeded, PolicyExecutor, is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(call_policy.time, "monotonic", clock)
+    return clock
+
+
+def fail(breaker, error):
+    with pytest.raises(type(error)):
+        with breaker.guard():
+            raise error
+
+
+def test_is_retryable():
+    assert is_retryable(StatusError(503))
+    assert is_retryable(StatusError(408))
+    assert is_retryable(ConnectionResetError())
+    assert is_retryable(TimeoutError())
+    assert not is_retryable(StatusError(400))
+    assert not is_retryable(CircuitOpenError())
+    assert not is_retryable(DeadlineExceeded())
+    assert not is_retryable(ValueError())
+
+
+def test_breaker_opens_after_consecutive_failures_and_fails_fast(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+    for _ in range(3):
+        assert breaker.state == "closed"
+        fail(breaker, StatusError(503))
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pass
+    assert breaker.stats()["opened"] == 1
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2)
+    fail(breaker, StatusError(503))
+    with breaker.guard():
+        pass
+    fail(breaker, StatusError(503))
+    assert breaker.state == "closed"
+
+
+def test_half_open_admits_one_probe_and_closes_on_success(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    fail(breaker, StatusError(503))
+    clock.now += 30.0
+    assert breaker.state == "half_open"
+    with breaker.guard():
+        # A concurrent call is rejected while the probe is out
+        with pytest.raises(CircuitOpenError):
+            with breaker.guard():
+                pass
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_reopens_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    fail(breaker, StatusError(503))
+    clock.now += 30.0
+    fail(breaker, ConnectionError())
+    assert breaker.state == "open"
+    assert breaker.stats()["opened"] == 2
+    clock.now += 30.0
+    assert breaker.state == "half_open"
+
+
+def test_non_retryable_probe_error_does_not_wedge_the_circuit(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    fail(breaker, StatusError(503))
+    clock.now += 30.0
+    # The endpoint answered, so the circuit closes
+    fail(breaker, StatusError(400))
+    assert breaker.state == "closed"
+    with breaker.guard():
+        pass
+
+
+def test_cancelled_probe_lets_the_next_call_probe(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30.0)
+    fail(breaker, StatusError(503))
+    clock.now += 30.0
+    fail(breaker, asyncio.CancelledError())
+    assert breaker.state == "half_open"
+    with breaker.guard():
+        pass
+    assert breaker.state == "closed"
+
+
+def test_retries_retryable_errors_and_reports_events(monkeypatch):
+    monkeypatch.setattr(call_policy.time, "sleep", lambda seconds: None)
+    events = []
+    executor = PolicyExecutor(CallPolicy(max_attempts=3), CircuitBreaker(), on_event=events.append)
+    outcomes = [StatusError(503), StatusError(429), "ok"]
+
+    def attempt(timeout):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert executor.call(attempt) == "ok"
+    assert events == ["retries", "retries"]
+    assert executor.stats()["calls"] == 1
+    assert executor.stats()["retries"] == 2
+
+
+def test_non_retryable_errors_are_raised_immediately():
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        raise StatusError(400)
+
+    executor = PolicyExecutor(CallPolicy(max_attempts=3), CircuitBreaker())
+    with pytest.raises(StatusError):
+        executor.call(attempt)
+    assert calls == [None]
+
+
+def test_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr(call_policy.time, "sleep", lambda seconds: None)
+    calls = []
+
+    def attempt(timeout):
+        calls.append(timeout)
+        raise StatusError(502)
+
+    executor = PolicyExecutor(CallPolicy(max_attempts=2), CircuitBreaker(failure_threshold=10))
+    with pytest.raises(StatusError):
+        executor.call(attempt)
+    assert len(calls) == 2
+
+
+def test_deadline_bounds_attempt_timeouts_and_the_whole_call():
+    timeouts = []
+
+    def attempt(timeout):
+        timeouts.append(timeout)
+        time.sleep(0.03)
+        raise StatusError(503)
+
+    executor = PolicyExecutor(
+        CallPolicy(max_attempts=10, base_delay=0.0, deadline=0.05), CircuitBreaker(failure_threshold=100)
+    )
+    with pytest.raises((StatusError, DeadlineExceeded)):
+        executor.call(attempt)
+    assert 0 < timeouts[0] <= 0.05
+    assert len(timeouts) < 10
+    assert executor.stats()["deadline_exceeded"] == 1
+
+
+def test_open_circuit_fails_without_calling_the_attempt():
+    breaker = CircuitBreaker(failure_threshold=1)
+    fail(breaker, StatusError(503))
+    executor = PolicyExecutor(CallPolicy(), breaker)
+    with pytest.raises(CircuitOpenError):
+        executor.call(lambda timeout: pytest.fail("attempt must not run"))
+
+
+def test_hedge_wins_when_the_primary_is_slow():
+    release = threading.Event()
+    calls = []
+
+    def attempt(timeout):
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            release.wait(2)
+            return "primary"
+        return "hedge"
+
+    executor = PolicyExecutor(CallPolicy(hedge=True, hedge_after=0.02), CircuitBreaker(), hedge_workers=4)
+    try:
+        assert executor.call(attempt) == "hedge"
+    finally:
+        release.set()
+    stats = executor.stats()
+    assert stats["hedges"] == 1
+    assert stats["hedge_wins"] == 1
+
+
+def test_fast_primary_is_not_hedged():
+    executor = PolicyExecutor(CallPolicy(hedge=True, hedge_after=1.0), CircuitBreaker(), hedge_workers=2)
+    assert executor.call(lambda timeout: "primary") == "primary"
+    assert executor.stats()["hedges"] == 0
+
+
+def test_hedge_delay_waits_for_enough_latency_samples():
+    executor = PolicyExecutor(CallPolicy(hedge=True, hedge_min_samples=3), CircuitBreaker())
+    assert executor.hedge_delay() is None
+    for _ in range(3):
+        executor.call(lambda timeout: None)
+    assert executor.hedge_delay() is not None
+
+
+def test_async_hedge_cancels_the_losing_attempt():
+    cancelled = []
+
+    async def attempt(timeout):
+        if not cancelled:
+            cancelled.append(False)
+            try:
+                await asyncio.sleep(2)
+            except asyncio.CancelledError:
+                cancelled[0] = True
+                raise
+            return "primary"
+        return "hedge"
+
+    breaker = CircuitBreaker()
+    executor = PolicyExecutor(CallPolicy(hedge=True, hedge_after=0.02), breaker)
+
+    async def main():
+        result = await executor.acall(attempt)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(main()) == "hedge"
+    assert cancelled == [True]
+    assert executor.stats()["hedge_wins"] == 1
+    assert breaker.state == "closed"
+
+
+def test_async_retries_until_success():
+    outcomes = [ConnectionError(), "ok"]
+
+    async def attempt(timeout):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    executor = PolicyExecutor(CallPolicy(base_delay=0.0), CircuitBreaker())
+    assert asyncio.run(executor.acall(attempt)) == "ok"
+    assert executor.stats()["retries"] == 1
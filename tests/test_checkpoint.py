@@ -0,0 +1,103 @@
+import json
+
+import pandas as pd
+
+from adala.environments import StaticEnvironment
+
+from checkpoint import CheckpointLog, learn_with_checkpoint, run_with_checkpoint
+
+
+class _Skill:
+    def __init__(self, instructions):
+        self.instructions = instructions
+
+
+class _SkillSet:
+    def __init__(self, skill):
+        self.skills = {"classify": skill}
+
+    def get_skill_outputs(self):
+        return {"label": "classify"}
+
+
+class _Agent:
+    """
+    Stand-in for adala's Agent: labels with the current instructions, asks the
+    environment for feedback and then rewrites the instructions, like learn() does.
+    """
+
+    def __init__(self, df, answers):
+        self.environment = StaticEnvironment(df=df, ground_truth_columns={"label": "truth"}, matching_function="exact")
+        self.skills = _SkillSet(_Skill("v0"))
+        # Predicted labels per instructions version
+        self.answers = answers
+        self.learn_calls = 0
+        self.runs = 0
+
+    def learn(self, learning_iterations, accuracy_threshold, **kwargs):
+        self.learn_calls += 1
+        skill = self.skills.skills["classify"]
+        predictions = self.environment.df.assign(label=self.answers[skill.instructions])
+        self.environment.get_feedback(self.skills, predictions)
+        skill.instructions = f"v{int(skill.instructions[1:]) + 1}"
+
+    def run(self, chunk, runtime=None):
+        self.runs += 1
+        return chunk.assign(label=chunk["text"].str.upper())
+
+
+def _frame():
+    return pd.DataFrame({"text": ["a", "b", "c", "d"], "truth": ["x", "y", "x", "y"]})
+
+
+def test_learning_stops_once_the_threshold_is_reached(tmp_path):
+    path = str(tmp_path / "learn.jsonl")
+    agent = _Agent(_frame(), {"v0": ["x", "x", "x", "x"], "v1": ["x", "y", "x", "y"], "v2": ["y"] * 4})
+    learn_with_checkpoint(agent, path, learning_iterations=5, accuracy_threshold=0.9)
+
+    assert agent.learn_calls == 2
+    # The instructions that reached the threshold are kept, not the ones rewritten after measuring them
+    assert agent.skills.skills["classify"].instructions == "v1"
+    snapshot = CheckpointLog(path).latest_skills()
+    assert snapshot["converged"] and snapshot["iteration"] == 2
+    assert snapshot["accuracy"] == {"label": 1.0}
+
+
+def test_converged_checkpoint_is_not_resumed(tmp_path):
+    path = str(tmp_path / "learn.jsonl")
+    answers = {"v0": ["x", "y", "x", "y"]}
+    learn_with_checkpoint(_Agent(_frame(), answers), path, learning_iterations=3)
+    agent = _Agent(_frame(), answers)
+    learn_with_checkpoint(agent, path, learning_iterations=3)
+    assert agent.learn_calls == 0
+    assert agent.skills.skills["classify"].instructions == "v0"
+
+
+def test_learning_runs_every_iteration_below_the_threshold(tmp_path):
+    path = str(tmp_path / "learn.jsonl")
+    agent = _Agent(_frame(), {f"v{i}": ["x"] * 4 for i in range(3)})
+    learn_with_checkpoint(agent, path, learning_iterations=3, accuracy_threshold=0.9)
+    assert agent.learn_calls == 3
+    entries = [entry for entry in CheckpointLog(path).entries() if entry["type"] == "skills"]
+    assert [entry["accuracy"] for entry in entries] == [{"label": 0.5}] * 3
+    assert not any(entry["converged"] for entry in entries)
+    # The environment is left as it was
+    assert "get_feedback" not in agent.environment.__dict__
+
+
+def test_run_resumes_from_logged_rows(tmp_path):
+    path = str(tmp_path / "run.jsonl")
+    df = _frame()
+    CheckpointLog(path).record_rows([0, 1], [{"label": "A"}, {"label": "B"}])
+    agent = _Agent(df, {})
+    result = run_with_checkpoint(agent, df, path, chunk_size=1)
+    assert agent.runs == 2
+    assert list(result["label"]) == ["A", "B", "C", "D"]
+    with open(path, encoding="utf-8") as f:
+        assert [json.loads(line)["id"] for line in f] == [0, 1, 2, 3]
+
+
+def test_truncated_trailing_line_is_ignored(tmp_path):
+    path = tmp_path / "run.jsonl"
+    path.write_text('{"type": "row", "id": 0, "output": {"label": "A"}}\n{"type": "row", "id"', encoding="utf-8")
+    assert CheckpointLog(str(path)).completed_rows() == {0: {"label": "A"}}
@@ -0,0 +1,45 @@
+import asyncio
+import os
+
+from client_pool import PoolSettings, close_clients, get_async_openai_client, get_openai_client
+
+
+def teardown_function():
+    close_clients()
+
+
+def test_runtimes_on_one_server_share_a_client():
+    client = get_openai_client("http://a/v1", "key", PoolSettings())
+    assert get_openai_client("http://a/v1", "key", PoolSettings()) is client
+    assert get_openai_client(base_url="http://a/v1", api_key="key") is client
+
+
+def test_different_server_key_or_settings_get_their_own_client():
+    client = get_openai_client("http://a/v1", "key")
+    assert get_openai_client("http://b/v1", "key") is not client
+    assert get_openai_client("http://a/v1", "other") is not client
+    tuned = get_openai_client("http://a/v1", "key", PoolSettings(max_connections=8, max_retries=0))
+    assert tuned is not client
+    assert tuned.max_retries == 0
+
+
+def test_clients_are_not_shared_across_a_fork(monkeypatch):
+    client = get_openai_client("http://a/v1", "key")
+    monkeypatch.setattr(os, "getpid", lambda: -1)
+    assert get_openai_client("http://a/v1", "key") is not client
+
+
+def test_close_clients_forgets_them():
+    client = get_openai_client("http://a/v1", "key")
+    close_clients()
+    assert get_openai_client("http://a/v1", "key") is not client
+
+
+def test_async_clients_are_shared_per_event_loop():
+    async def get_twice():
+        first = get_async_openai_client("http://a/v1", "key")
+        assert get_async_openai_client("http://a/v1", "key") is first
+        assert get_async_openai_client("http://a/v1", "key", PoolSettings(timeout=5.0)) is not first
+        return first
+
+    assert asyncio.run(get_twice()) is not asyncio.run(get_twice())
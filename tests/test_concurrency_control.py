@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+import concurrency_control
+from concurrency_control import AdaptiveConcurrencyLimiter, is_overload_error, percentile
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def _succeed(limiter, times=1):
+    for _ in range(times):
+        with limiter.slot():
+            pass
+
+
+def test_is_overload_error():
+    assert is_overload_error(StatusError(429))
+    assert is_overload_error(StatusError(503))
+    assert is_overload_error(TimeoutError())
+    assert not is_overload_error(StatusError(400))
+    assert not is_overload_error(ValueError())
+
+
+def test_percentile_is_nearest_rank():
+    assert percentile([5, 1, 3, 2, 4], 50) == 3
+    assert percentile(range(1, 101), 95) == 95
+    assert percentile([7], 95) == 7
+
+
+def test_window_grows_by_one_per_full_window_of_successes(monkeypatch):
+    # Every call takes exactly 10ms, so scheduler jitter cannot read as a latency spike
+    ticks = iter(range(10**6))
+    monkeypatch.setattr(concurrency_control.time, "monotonic", lambda: next(ticks) * 0.01)
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=1, max_limit=3)
+    _succeed(limiter)
+    assert limiter.limit == 2
+    _succeed(limiter)
+    assert limiter.limit == 3
+    _succeed(limiter, 10)
+    assert limiter.limit == 3
+    assert limiter.stats()["increases"] == 1
+
+
+def test_overload_halves_the_window_but_not_below_min():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=8, min_limit=3, max_limit=8)
+    with pytest.raises(StatusError):
+        with limiter.slot():
+            raise StatusError(429)
+    assert limiter.limit == 4
+    time.sleep(0.01)
+    with pytest.raises(StatusError):
+        with limiter.slot():
+            raise StatusError(503)
+    assert limiter.limit == 3
+    stats = limiter.stats()
+    assert stats["overloads"] == 2 and stats["in_flight"] == 0
+
+
+def test_bad_requests_do_not_shrink_the_window():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=4, max_limit=8)
+    with pytest.raises(StatusError):
+        with limiter.slot():
+            raise StatusError(400)
+    assert limiter.limit == 4
+
+
+def test_latency_regression_shrinks_the_window():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=8, latency_tolerance=2.0, sample_size=1)
+    _succeed(limiter)
+    assert limiter.limit == 2
+    for _ in range(2):
+        with limiter.slot():
+            time.sleep(0.05)
+    assert limiter.limit == 1
+    assert limiter.stats()["decreases"] == 1
+
+
+def test_slot_blocks_threads_beyond_the_limit():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=2, min_limit=2, max_limit=2)
+    release = threading.Event()
+    peak = []
+    active = [0]
+    lock = threading.Lock()
+
+    def worker():
+        with limiter.slot():
+            with lock:
+                active[0] += 1
+                peak.append(active[0])
+            release.wait(1)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=worker) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    assert limiter.stats()["in_flight"] == 2
+    release.set()
+    for thread in threads:
+        thread.join(2)
+    assert max(peak) == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_async_slots_respect_the_limit_and_cancellation():
+    limiter = AdaptiveConcurrencyLimiter(initial_limit=1, min_limit=1, max_limit=1)
+    order = []
+
+    async def task(name, hold):
+        async with limiter.aslot():
+            order.append(name)
+            await asyncio.sleep(hold)
+
+    async def main():
+        first = asyncio.ensure_future(task("first", 0.05))
+        await asyncio.sleep(0)
+        cancelled = asyncio.ensure_future(task("cancelled", 0))
+        second = asyncio.ensure_future(task("second", 0))
+        await asyncio.sleep(0.01)
+        assert limiter.stats()["waiting"] == 2
+        cancelled.cancel()
+        await asyncio.gather(first, second)
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+
+    asyncio.run(main())
+    assert order == ["first", "second"]
+    assert limiter.stats()["in_flight"] == 0
@@ -0,0 +1,136 @@
+import os
+import pickle
+import uuid
+
+import pandas as pd
+import pytest
+
+import distributed_run
+from distributed_run import RedisLeaseQueue, SQLiteLeaseQueue, collect_results, run_distributed, run_worker
+
+
+class FakeAgent:
+    def __init__(self, fail_on=None):
+        self.fail_on = fail_on
+
+    def run(self, input, runtime=None):
+        if self.fail_on is not None and self.fail_on in set(input["text"]):
+            raise RuntimeError("labeling failed")
+        return input.assign(label=input["text"].str.upper())
+
+
+def make_agent():
+    return FakeAgent()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    class Clock:
+        now = 1000.0
+
+        def __call__(self):
+            return self.now
+
+    clock = Clock()
+    monkeypatch.setattr(distributed_run.time, "time", clock)
+    return clock
+
+
+def redis_queue(monkeypatch):
+    """
+    A queue on the server at REDIS_URL, or else on an in-process fakeredis server running the real Lua scripts.
+    """
+    redis = pytest.importorskip("redis")
+    url = os.getenv("REDIS_URL")
+    if url:
+        try:
+            redis.Redis.from_url(url).ping()
+        except redis.RedisError:
+            pytest.skip(f"no Redis server at {url}")
+    else:
+        fakeredis = pytest.importorskip("fakeredis")
+        pytest.importorskip("lupa")
+        server = fakeredis.FakeServer()
+        # Every client for the URL, including unpickled copies, reaches the same fake server
+        monkeypatch.setattr(redis.Redis, "from_url", lambda url: fakeredis.FakeRedis(server=server))
+        url = "redis://fake"
+    return RedisLeaseQueue.from_url(url, name=f"test-{uuid.uuid4().hex}", max_attempts=2)
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        return SQLiteLeaseQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    return redis_queue(monkeypatch)
+
+
+def test_shards_are_planned_once(queue):
+    assert queue.add_shards(10, 4) == 3
+    assert queue.add_shards(10, 2) == 3
+    assert queue.progress() == {"pending": 3, "leased": 0, "done": 0, "failed": 0}
+
+
+def test_each_shard_is_leased_to_one_worker(queue):
+    queue.add_shards(10, 4)
+    leases = [queue.acquire("w1", 60), queue.acquire("w2", 60), queue.acquire("w1", 60)]
+    assert sorted((lease.start, lease.stop) for lease in leases) == [(0, 4), (4, 8), (8, 10)]
+    assert queue.acquire("w3", 60) is None
+    assert queue.progress()["leased"] == 3
+
+
+def test_expired_lease_is_reissued_and_first_completion_wins(queue, clock):
+    queue.add_shards(4, 4)
+    stale = queue.acquire("w1", 10)
+    assert queue.acquire("w2", 10) is None
+    clock.now += 11
+    fresh = queue.acquire("w2", 10)
+    assert fresh.shard_id == stale.shard_id
+    assert not queue.renew(stale, 10)
+    assert queue.renew(fresh, 10)
+    assert queue.complete(fresh, [{"label": "x"}] * 4, 1.0)
+    assert not queue.complete(stale, [{"label": "y"}] * 4, 1.0)
+    assert queue.results()[0]["worker_id"] == "w2"
+
+
+def test_failed_shard_is_retried_then_parked(queue):
+    queue.add_shards(2, 2)
+    queue.fail(queue.acquire("w1", 60), "boom")
+    assert queue.progress()["pending"] == 1
+    queue.fail(queue.acquire("w1", 60), "boom")
+    assert queue.acquire("w1", 60) is None
+    assert queue.progress() == {"pending": 0, "leased": 0, "done": 0, "failed": 1}
+
+
+def test_queues_survive_pickling(queue):
+    queue.add_shards(2, 1)
+    copy = pickle.loads(pickle.dumps(queue))
+    assert copy.acquire("w1", 60) is not None
+    assert queue.progress()["leased"] == 1
+
+
+def test_redis_queue_on_a_plain_client_refuses_to_pickle():
+    fakeredis = pytest.importorskip("fakeredis")
+    with pytest.raises(TypeError):
+        pickle.dumps(RedisLeaseQueue(fakeredis.FakeRedis()))
+
+
+def test_run_worker_labels_every_shard_and_reports_stats(queue):
+    data = pd.DataFrame({"text": ["a", "b", "c", "d", "e"]}, index=[10, 11, 12, 13, 14])
+    queue.add_shards(len(data), 2)
+    stats = run_worker(FakeAgent(fail_on="e"), data, queue, worker_id="w1")
+    assert (stats["shards"], stats["rows"], stats["failed"]) == (2, 4, 2)
+    assert queue.progress()["failed"] == 1
+    assert queue.worker_stats()["w1"]["rows"] == 4
+
+    merged = collect_results(data, queue)
+    assert list(merged.index) == [10, 11, 12, 13, 14]
+    assert list(merged["label"][:4]) == ["A", "B", "C", "D"]
+    assert pd.isna(merged["label"].iloc[4])
+
+
+def test_run_distributed_spawns_workers_that_build_their_own_agent(tmp_path):
+    data = pd.DataFrame({"text": list("abcdef")})
+    queue = SQLiteLeaseQueue(str(tmp_path / "queue.db"))
+    predictions = run_distributed(make_agent, data, queue, workers=2, shard_size=2)
+    assert list(predictions["label"]) == list("ABCDEF")
+    assert queue.progress()["done"] == 3
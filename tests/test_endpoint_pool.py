@@ -0,0 +1,58 @@
+import pytest
+
+from call_policy import CircuitBreaker
+from endpoint_pool import EndpointPool
+
+
+class StatusError(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+def test_skipped_endpoints_are_avoided():
+    pool = EndpointPool(["http://a/v1", "http://b/v1"], sticky=False)
+    for _ in range(5):
+        with pool.track(skip=lambda url: url == "http://a/v1") as endpoint:
+            assert endpoint.url == "http://b/v1"
+
+
+def test_skipped_endpoints_are_used_when_nothing_else_is_left():
+    pool = EndpointPool(["http://a/v1", "http://b/v1"], sticky=False)
+    with pool.track(skip=lambda url: True) as endpoint:
+        assert endpoint.url in ("http://a/v1", "http://b/v1")
+
+
+def test_retryable_failures_eject_an_endpoint():
+    pool = EndpointPool(["http://a/v1", "http://b/v1"], sticky=False, eject_after=2)
+    for error, healthy in ((StatusError(503), True), (StatusError(400), True), (StatusError(503), False)):
+        with pytest.raises(StatusError):
+            with pool.track(skip=lambda url: url != "http://a/v1") as endpoint:
+                raise error
+        assert endpoint.url == "http://a/v1"
+        assert pool.stats()[0]["healthy"] is healthy
+    assert [stats["outstanding"] for stats in pool.stats()] == [0, 0]
+    assert pool.acquire().url == "http://b/v1"
+
+
+def test_open_circuit_steers_requests_to_other_endpoints():
+    breakers = {url: CircuitBreaker(failure_threshold=1) for url in ("http://a/v1", "http://b/v1")}
+    pool = EndpointPool(list(breakers), sticky=False, eject_after=10)
+    with pytest.raises(StatusError):
+        with pool.track(skip=lambda url: url == "http://b/v1") as endpoint:
+            with breakers[endpoint.url].guard():
+                raise StatusError(503)
+    assert breakers["http://a/v1"].state == "open"
+    for _ in range(5):
+        with pool.track(skip=lambda url: breakers[url].state == "open") as endpoint:
+            assert endpoint.url == "http://b/v1"
+
+
+def test_close_stops_the_health_check_thread():
+    pool = EndpointPool(["http://a/v1", "http://b/v1"])
+    pool.start_health_checks(interval=60)
+    thread = pool._health_thread
+    pool.close(timeout=5)
+    assert not thread.is_alive()
+    with pool.track() as endpoint:
+        assert endpoint.url in ("http://a/v1", "http://b/v1")
@@ -0,0 +1,57 @@
+import numpy as np
+
+from few_shot import ExampleIndex
+
+EXAMPLES = [
+    {"text": "the food was great", "label": "positive"},
+    {"text": "the food was awful", "label": "negative"},
+    {"text": "great service and great food", "label": "positive"},
+    {"text": "slow service", "label": "negative"},
+]
+
+
+def make_index():
+    index = ExampleIndex("label", ["text"])
+    index.add(EXAMPLES)
+    return index
+
+
+def test_search_returns_the_k_most_similar_first():
+    index = make_index()
+    assert index.search(["great food"], 2) == [[2, 0]]
+    assert [example["label"] for example in index.nearest([{"text": "awful food"}], 1)[0]] == ["negative"]
+
+
+def test_k_larger_than_the_index_returns_everything():
+    assert sorted(make_index().search(["food"], 10)[0]) == [0, 1, 2, 3]
+
+
+def test_an_example_with_the_query_text_is_excluded():
+    index = make_index()
+    neighbours = index.search(["the food was great"], 2)[0]
+    assert 0 not in neighbours
+    assert len(neighbours) == 2
+
+
+def test_duplicates_of_the_query_do_not_shrink_the_result():
+    index = make_index()
+    # The same text under other labels is a distinct example each time
+    index.add([{"text": "the food was great", "label": label} for label in ("negative", "neutral", "mixed")])
+    assert len(index) == 7
+    neighbours = index.search(["the food was great"], 3)[0]
+    assert len(neighbours) == 3
+    assert all(index.examples[i]["text"] != "the food was great" for i in neighbours)
+
+
+def test_adding_an_indexed_example_again_is_a_no_op():
+    index = make_index()
+    assert index.add(EXAMPLES + [{"text": "slow service", "label": "negative"}]) == 0
+    assert index.add([{"text": "slow service", "label": "positive"}, {"text": "new", "label": None}]) == 1
+    assert len(index) == 5
+
+
+def test_custom_embedding():
+    vectors = {"a": [1.0, 0.0], "b": [0.0, 1.0], "ab": [1.0, 1.0], "q": [0.9, 0.1]}
+    index = ExampleIndex("label", ["text"], embed=lambda texts: np.array([vectors[text] for text in texts]))
+    index.add([{"text": text, "label": text} for text in ("a", "b", "ab")])
+    assert index.search(["q"], 2) == [[0, 2]]
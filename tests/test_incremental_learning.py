@@ -0,0 +1,111 @@
+import pandas as pd
+
+from incremental_learning import learn_incremental
+
+TRUTH = ["positive", "negative", "positive", "negative", "positive", "negative"]
+
+
+class FakeSkill:
+    """Gets row 0 wrong and is unsure about row 1 until its instructions are improved."""
+
+    def __init__(self, scores=True):
+        self.instructions = "v1"
+        self.scores = scores
+        self.applied = []
+
+    def label(self, frame):
+        self.applied.append(list(frame.index))
+        improved = self.instructions != "v1"
+        labels = ["negative" if index == 0 and not improved else TRUTH[index] for index in frame.index]
+        output = frame.assign(sentiment=labels)
+        if self.scores:
+            output["sentiment_score"] = [0.3 if index == 1 and not improved else 0.9 for index in frame.index]
+        return output
+
+    def improve(self, predictions, train_skill_output, feedback, runtime=None):
+        self.instructions = "v2"
+
+
+class FakeSkills:
+    def __init__(self, skill):
+        self.skills = {"classify": skill}
+
+    def __getitem__(self, name):
+        return self.skills[name]
+
+    def get_skill_outputs(self):
+        return {"sentiment": "classify"}
+
+    def apply(self, frame, runtime=None):
+        return self.skills["classify"].label(frame)
+
+
+class FakeFeedback:
+    def __init__(self, predictions):
+        truth = pd.Series(TRUTH, index=range(len(TRUTH))).reindex(predictions.index)
+        self.match = pd.DataFrame({"sentiment": predictions["sentiment"].eq(truth)})
+
+    def get_accuracy(self):
+        return self.match.mean()
+
+
+class FakeEnvironment:
+    ground_truth_columns = {"sentiment": "gold"}
+
+    def get_data_batch(self, batch_size=None):
+        return pd.DataFrame({"text": [f"text {i}" for i in range(len(TRUTH))], "gold": TRUTH})
+
+    def get_feedback(self, skills, predictions):
+        return FakeFeedback(predictions)
+
+
+class FewShotRuntime:
+    few_shot_k = 2
+
+    def __init__(self):
+        self.indexed = []
+
+    def add_few_shot_examples(self, examples, output_field, text_fields, label_column=None):
+        self.indexed.append((list(examples.index), output_field, text_fields, label_column))
+
+
+class FakeAgent:
+    def __init__(self, skill, runtime=None):
+        self.skills = FakeSkills(skill)
+        self.environment = FakeEnvironment()
+        self.runtime = runtime
+
+    def get_runtime(self, runtime=None):
+        return self.runtime
+
+    def get_teacher_runtime(self, runtime=None):
+        return "teacher"
+
+    def select_skill_to_train(self, feedback, accuracy_threshold):
+        return "classify", "sentiment", None
+
+
+def test_wrong_and_low_confidence_rows_are_requeried():
+    skill = FakeSkill()
+    history = learn_incremental(FakeAgent(skill), accuracy_threshold=1.0, audit_fraction=0.0)
+    assert skill.applied == [list(range(len(TRUTH))), [0, 1]]
+    assert [stats["requeried"] for stats in history] == [len(TRUTH), 2]
+    assert history[-1]["accuracy"] == {"sentiment": 1.0}
+
+
+def test_scores_are_ignored_without_a_threshold():
+    skill = FakeSkill()
+    learn_incremental(FakeAgent(skill), accuracy_threshold=1.0, audit_fraction=0.0, min_confidence=None)
+    assert skill.applied[1] == [0]
+
+
+def test_outputs_without_scores_requery_only_wrong_rows():
+    skill = FakeSkill(scores=False)
+    learn_incremental(FakeAgent(skill), accuracy_threshold=1.0, audit_fraction=0.0)
+    assert skill.applied[1] == [0]
+
+
+def test_ground_truth_is_indexed_for_few_shot_runtimes():
+    runtime = FewShotRuntime()
+    learn_incremental(FakeAgent(FakeSkill(), runtime), accuracy_threshold=1.0, audit_fraction=0.0)
+    assert runtime.indexed == [(list(range(len(TRUTH))), "sentiment", ["text"], "gold")]
@@ -0,0 +1,39 @@
+import math
+
+import pytest
+
+from label_utils import label_probabilities, label_response_format, label_token_budget
+
+LABELS = ["positive", "negative", "neutral"]
+
+
+def test_first_token_of_a_multi_token_label_counts_for_that_label():
+    probabilities = label_probabilities([("pos", math.log(0.6)), (" negative", math.log(0.2))], LABELS)
+    assert probabilities["positive"] == pytest.approx(0.75)
+    assert probabilities["negative"] == pytest.approx(0.25)
+
+
+def test_label_missing_from_top_logprobs_gets_zero():
+    probabilities = label_probabilities([("positive", math.log(0.5)), ("negative", math.log(0.5))], LABELS)
+    assert probabilities == {"positive": 0.5, "negative": 0.5, "neutral": 0.0}
+
+
+def test_shared_prefix_is_split_between_labels():
+    probabilities = label_probabilities([("ne", math.log(0.4)), ("Positive", math.log(0.4))], LABELS)
+    assert probabilities["negative"] == pytest.approx(0.25)
+    assert probabilities["neutral"] == pytest.approx(0.25)
+    assert probabilities["positive"] == pytest.approx(0.5)
+
+
+def test_no_candidate_starting_a_label_gives_an_empty_distribution():
+    assert label_probabilities([("The", -0.1), (" ", -2.0), ('"', -3.0)], LABELS) == {}
+
+
+def test_token_budget_covers_the_longest_label_in_bytes():
+    assert label_token_budget(["a", "négatif"]) == len("négatif".encode("utf-8")) + 1
+
+
+def test_response_format_only_admits_the_labels():
+    schema = label_response_format("sentiment", LABELS)["json_schema"]["schema"]
+    assert schema["properties"]["sentiment"]["enum"] == LABELS
+    assert schema["required"] == ["sentiment"]
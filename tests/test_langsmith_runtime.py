@@ -0,0 +1,237 @@
+import asyncio
+import math
+
+import pandas as pd
+import pytest
+from openai.types.chat import ChatCompletion
+
+import langsmith_runtime
+from langsmith_runtime import LangSmithOpenAIChatRuntime
+
+SCHEMA = {"sentiment": {"type": "string", "enum": ["positive", "negative"]}}
+INPUT = "Text: {text}"
+INSTRUCTIONS = "Classify the sentiment."
+OUTPUT = "{sentiment}"
+
+
+def answer(messages):
+    return "positive" if "good" in messages[-1]["content"] else "negative"
+
+
+def completion(content, top_logprobs=None):
+    choice = {"index": 0, "finish_reason": "stop", "message": {"role": "assistant", "content": content}}
+    if top_logprobs is not None:
+        candidates = [{"token": token, "logprob": logprob} for token, logprob in top_logprobs]
+        choice["logprobs"] = {"content": [dict(candidates[0], top_logprobs=candidates)] if candidates else []}
+    return ChatCompletion.model_validate({
+        "id": "cmpl",
+        "object": "chat.completion",
+        "created": 0,
+        "model": "test-model",
+        "choices": [choice],
+        "usage": {"prompt_tokens": 10, "completion_tokens": 1, "total_tokens": 11},
+    })
+
+
+class FakeCompletions:
+    def __init__(self, client):
+        self.client = client
+
+    def create(self, **params):
+        self.client.requests.append(params)
+        content = self.client.respond(params["messages"])
+        # Logprobs requests get the answer as the likeliest first token
+        top_logprobs = [(content, math.log(0.9)), ("maybe", math.log(0.1))] if params.get("logprobs") else None
+        return completion(content, top_logprobs)
+
+
+class FakeClient:
+    """Stands in for openai.OpenAI: answers every chat completion with `respond(messages)`."""
+
+    def __init__(self, respond=answer):
+        self.respond = respond
+        self.requests = []
+        self.chat = type("Chat", (), {})()
+        self.chat.completions = FakeCompletions(self)
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, **params):
+        await asyncio.sleep(0)
+        return FakeCompletions.create(self, **params)
+
+
+class FakeAsyncClient(FakeClient):
+    def __init__(self, respond=answer):
+        super().__init__(respond)
+        self.chat.completions = FakeAsyncCompletions(self)
+
+
+@pytest.fixture
+def make_runtime(monkeypatch):
+    monkeypatch.delenv("LANGSMITH_API_KEY", raising=False)
+
+    def make(respond=answer, **settings):
+        client, async_client = FakeClient(respond), FakeAsyncClient(respond)
+        monkeypatch.setattr(langsmith_runtime, "get_openai_client", lambda **kwargs: client)
+        monkeypatch.setattr(langsmith_runtime, "get_async_openai_client", lambda **kwargs: async_client)
+        runtime = LangSmithOpenAIChatRuntime(model="test-model", api_key="test", **settings)
+        return runtime, client, async_client
+
+    return make
+
+
+@pytest.fixture
+def batch():
+    return pd.DataFrame({"text": ["good movie", "bad movie", "good movie"]}, index=[5, 6, 7])
+
+
+def test_execute_returns_the_completion_text(make_runtime):
+    runtime, client, _ = make_runtime()
+    assert runtime.execute([{"role": "user", "content": "good"}]) == "positive"
+    assert client.requests[0]["model"] == "test-model"
+
+
+def test_aexecute_returns_the_completion_text(make_runtime):
+    runtime, _, async_client = make_runtime()
+    assert asyncio.run(runtime.aexecute([{"role": "user", "content": "bad"}])) == "negative"
+    assert len(async_client.requests) == 1
+
+
+def test_record_to_record(make_runtime):
+    runtime, client, _ = make_runtime()
+    result = runtime.record_to_record({"text": "good movie"}, INPUT, INSTRUCTIONS, OUTPUT)
+    assert result["sentiment"] == "positive"
+    assert "good movie" in client.requests[0]["messages"][-1]["content"]
+
+
+def test_arecord_to_record(make_runtime):
+    runtime, _, _ = make_runtime()
+    result = asyncio.run(runtime.arecord_to_record({"text": "bad movie"}, INPUT, INSTRUCTIONS, OUTPUT))
+    assert result["sentiment"] == "negative"
+
+
+def test_batch_to_batch_keeps_the_index(make_runtime, batch):
+    runtime, client, _ = make_runtime()
+    output = runtime.batch_to_batch(batch, input_template=INPUT, output_template=OUTPUT, instructions_template=INSTRUCTIONS)
+    assert list(output.index) == [5, 6, 7]
+    assert list(output["sentiment"]) == ["positive", "negative", "positive"]
+    assert len(client.requests) == 3
+
+
+def test_abatch_to_batch_keeps_the_index(make_runtime, batch):
+    runtime, _, async_client = make_runtime()
+    output = asyncio.run(runtime.abatch_to_batch(
+        batch, input_template=INPUT, output_template=OUTPUT, instructions_template=INSTRUCTIONS
+    ))
+    assert list(output.index) == [5, 6, 7]
+    assert list(output["sentiment"]) == ["positive", "negative", "positive"]
+    assert len(async_client.requests) == 3
+
+
+def test_coalesced_batch_sends_one_request_per_distinct_prompt(make_runtime, batch):
+    runtime, client, _ = make_runtime(coalesce_requests=True)
+    output = runtime.batch_to_batch(batch, input_template=INPUT, output_template=OUTPUT, instructions_template=INSTRUCTIONS)
+    assert list(output["sentiment"]) == ["positive", "negative", "positive"]
+    assert len(client.requests) == 2
+
+
+def test_execute_and_records_do_not_share_cache_entries(make_runtime):
+    runtime, client, _ = make_runtime(cache_enabled=True)
+    record = {"text": "good movie"}
+    messages, _ = runtime._build_messages(record, INPUT, INSTRUCTIONS, OUTPUT, None, False)
+    assert runtime.execute(messages) == "positive"
+    assert runtime.record_to_record(record, INPUT, INSTRUCTIONS, OUTPUT) == {"sentiment": "positive"}
+    assert runtime.record_to_record(record, INPUT, INSTRUCTIONS, "{label}") == {"label": "positive"}
+    assert len(client.requests) == 3
+    assert runtime.execute(messages) == "positive"
+    assert len(client.requests) == 3
+
+
+def test_empty_completions_are_not_cached(make_runtime):
+    runtime, client, async_client = make_runtime(lambda messages: None, cache_enabled=True)
+    messages = [{"role": "user", "content": "good"}]
+    assert runtime.execute(messages) is None
+    assert runtime.execute(messages) is None
+    assert len(client.requests) == 2
+    assert asyncio.run(runtime.aexecute(messages)) is None
+    assert len(async_client.requests) == 1
+
+
+def test_json_schema_decoding_reads_the_label_from_the_json_answer(make_runtime):
+    runtime, _, _ = make_runtime(label_decoding="json_schema")
+    choice = completion('{"sentiment": "negative"}').choices[0]
+    assert runtime._parse_choice(choice, "sentiment", SCHEMA) == {"sentiment": "negative"}
+
+
+def test_json_schema_decoding_falls_back_to_matching_the_text(make_runtime):
+    runtime, _, _ = make_runtime(label_decoding="json_schema")
+    assert runtime._parse_choice(completion("Positive.").choices[0], "sentiment", SCHEMA) == {"sentiment": "positive"}
+    unknown = completion('{"sentiment": "mixed"}').choices[0]
+    assert runtime._parse_choice(unknown, "sentiment", SCHEMA) == {"sentiment": None}
+
+
+def test_logprobs_decoding_scores_the_label(make_runtime):
+    runtime, _, _ = make_runtime(label_decoding="logprobs")
+    choice = completion("neg", [("neg", math.log(0.6)), ("pos", math.log(0.2)), ("The", math.log(0.2))]).choices[0]
+    result = runtime._parse_choice(choice, "sentiment", SCHEMA)
+    assert result["sentiment"] == "negative"
+    assert result["sentiment_score"] == pytest.approx(0.75)
+    assert result["sentiment_probabilities"]["positive"] == pytest.approx(0.25)
+
+
+def test_logprobs_decoding_without_label_tokens_falls_back_to_the_text(make_runtime):
+    runtime, _, _ = make_runtime(label_decoding="logprobs")
+    choice = completion("positive", [("The", -0.1)]).choices[0]
+    assert runtime._parse_choice(choice, "sentiment", SCHEMA) == {"sentiment": "positive"}
+
+
+def test_logprobs_decoding_is_never_packed(make_runtime, batch):
+    runtime, client, _ = make_runtime(label_decoding="logprobs", pack_size=4)
+    output = runtime.batch_to_batch(
+        batch, input_template=INPUT, output_template=OUTPUT, instructions_template=INSTRUCTIONS, field_schema=SCHEMA
+    )
+    assert len(client.requests) == 3
+    assert all(request["logprobs"] for request in client.requests)
+    assert list(output["sentiment"]) == ["positive", "negative", "positive"]
+    assert list(output["sentiment_score"]) == [1.0, 1.0, 1.0]
+
+
+def test_runtimes_share_one_trace_exporter_per_endpoint(make_runtime, monkeypatch):
+    import trace_exporter
+
+    runs = []
+    client = type("Client", (), {"batch_ingest_runs": lambda self, create: runs.extend(create)})()
+    monkeypatch.setattr(trace_exporter, "_make_client", lambda api_url, api_key: client)
+    monkeypatch.setattr(langsmith_runtime, "LANGSMITH_AVAILABLE", True)
+    runtime, _, _ = make_runtime()
+    monkeypatch.setenv("LANGSMITH_API_KEY", "key")
+    monkeypatch.setenv("LANGSMITH_ENDPOINT", "https://tracing.test")
+    try:
+        runtime._setup_langsmith()
+        other = LangSmithOpenAIChatRuntime(model="other-model", api_key="test")
+        assert runtime.trace_exporter is other.trace_exporter
+        runtime.execute([{"role": "user", "content": "good"}])
+        assert runtime.flush_traces(5)
+        assert [run["outputs"] for run in runs] == [{"output": "positive"}]
+    finally:
+        trace_exporter.shutdown_exporters()
+
+
+def test_near_duplicate_records_reuse_a_label_within_one_skill(make_runtime):
+    runtime, client, _ = make_runtime(semantic_cache=True, semantic_cache_threshold=0.8)
+    review = "good phone, the battery lasts two full days and the screen is bright in sunlight"
+    first = runtime.record_to_record({"text": review}, INPUT, INSTRUCTIONS, OUTPUT, field_schema=SCHEMA)
+    again = runtime.record_to_record({"text": review.upper() + "!"}, INPUT, INSTRUCTIONS, OUTPUT, field_schema=SCHEMA)
+    assert first == again == {"sentiment": "positive"}
+    assert len(client.requests) == 1
+    runtime.record_to_record({"text": review}, INPUT, "Classify the tone.", OUTPUT, field_schema=SCHEMA)
+    assert len(client.requests) == 2
+
+
+def test_close_stops_endpoint_health_checks(make_runtime):
+    runtime, _, _ = make_runtime(base_urls=["http://a/v1", "http://b/v1"], endpoint_health_interval=60)
+    thread = runtime.endpoint_pool._health_thread
+    assert thread.is_alive()
+    assert runtime.close(timeout=5)
+    assert not thread.is_alive()
@@ -0,0 +1,92 @@
+from typing import Any, Dict, List
+
+import pandas as pd
+import pytest
+
+from langsmith_runtime import LangSmithOpenAIChatRuntime
+from model_router import RoutingRuntime
+
+SCHEMA = {"sentiment": {"type": "string", "enum": ["positive", "negative"]}}
+TEMPLATES = dict(input_template="Text: {text}", instructions_template="Classify.", output_template="{sentiment}")
+
+
+class FakeModel(LangSmithOpenAIChatRuntime):
+    """Answers from a fixed text -> label table and records the texts it was sent."""
+
+    answers: Dict[str, Any] = {}
+    scores: Dict[str, float] = {}
+    seen: List[str] = []
+
+    def _answer(self, text):
+        self.seen.append(text)
+        result = {"sentiment": self.answers.get(text)}
+        if text in self.scores:
+            result["sentiment_score"] = self.scores[text]
+        return result
+
+    # Keyword-only templates: the router must not rely on any runtime's argument order
+    def record_to_record(self, record, *, input_template, instructions_template, output_template, **kwargs):
+        assert (input_template, instructions_template, output_template) == tuple(TEMPLATES.values())
+        return self._answer(record["text"])
+
+    def batch_to_batch(self, batch, *, input_template, instructions_template, output_template, **kwargs):
+        assert (input_template, instructions_template, output_template) == tuple(TEMPLATES.values())
+        return pd.DataFrame([self._answer(text) for text in batch["text"]], index=batch.index)
+
+
+@pytest.fixture
+def make_model(monkeypatch):
+    monkeypatch.delenv("LANGSMITH_API_KEY", raising=False)
+
+    def make(name, answers, scores=None):
+        return FakeModel(model=name, api_key="test", answers=answers, scores=scores or {}, seen=[])
+
+    return make
+
+
+def test_models_are_ordered_by_cost(make_model):
+    cheap, expensive = make_model("small", {}), make_model("large", {})
+    router = RoutingRuntime(models=[expensive, cheap], costs=[10.0, 1.0])
+    assert [model.openai_model for model in router.models] == ["small", "large"]
+    assert router.costs == [1.0, 10.0]
+
+
+def test_only_invalid_rows_are_escalated(make_model):
+    cheap = make_model("small", {"a": "positive", "b": "unsure", "c": None})
+    expensive = make_model("large", {"b": "negative", "c": "positive"})
+    router = RoutingRuntime(models=[cheap, expensive], costs=[1.0, 10.0])
+    batch = pd.DataFrame({"text": ["a", "b", "c"]}, index=[7, 8, 9])
+
+    output = router.batch_to_batch(batch, field_schema=SCHEMA, **TEMPLATES)
+
+    assert list(output.index) == [7, 8, 9]
+    assert list(output["sentiment"]) == ["positive", "negative", "positive"]
+    assert expensive.seen == ["b", "c"]
+    stats = router.get_routing_stats()
+    assert stats["records"] == 3
+    assert stats["tiers"][0]["escalated"] == 2
+    assert stats["cost"] == 3 * 1.0 + 2 * 10.0
+    assert stats["saved_cost"] == 3 * 10.0 - stats["cost"]
+
+
+def test_low_confidence_rows_are_escalated(make_model):
+    cheap = make_model("small", {"a": "positive", "b": "positive"}, scores={"a": 0.95, "b": 0.55})
+    expensive = make_model("large", {"b": "negative"})
+    router = RoutingRuntime(models=[cheap, expensive], costs=[1.0, 10.0], min_confidence=0.8)
+    output = router.batch_to_batch(pd.DataFrame({"text": ["a", "b"]}), field_schema=SCHEMA, **TEMPLATES)
+    assert list(output["sentiment"]) == ["positive", "negative"]
+    assert expensive.seen == ["b"]
+
+
+def test_the_last_model_answer_is_kept_even_when_invalid(make_model):
+    cheap, expensive = make_model("small", {"a": None}), make_model("large", {"a": "mixed"})
+    router = RoutingRuntime(models=[cheap, expensive], costs=[1.0, 2.0])
+    assert router.record_to_record({"text": "a"}, field_schema=SCHEMA, **TEMPLATES) == {"sentiment": "mixed"}
+    assert router.get_routing_stats()["tiers"][1]["escalated"] == 0
+
+
+def test_valid_record_stays_on_the_cheapest_model(make_model):
+    cheap, expensive = make_model("small", {"a": "negative"}), make_model("large", {})
+    router = RoutingRuntime(models=[cheap, expensive], costs=[1.0, 2.0])
+    assert router.record_to_record({"text": "a"}, field_schema=SCHEMA, **TEMPLATES) == {"sentiment": "negative"}
+    assert expensive.seen == []
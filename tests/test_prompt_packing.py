@@ -0,0 +1,47 @@
+from label_utils import label_enum, match_label
+from prompt_packing import build_packed_messages, parse_packed_response
+
+LABELS = ["positive", "negative", "neutral"]
+
+
+def test_packed_messages_number_every_input():
+    messages = build_packed_messages("Classify sentiment.", ["good", "bad"], "sentiment", LABELS)
+    assert [message["role"] for message in messages] == ["system", "user"]
+    assert messages[0]["content"].startswith("Classify sentiment.")
+    assert '"positive", "negative", "neutral"' in messages[0]["content"]
+    assert messages[1]["content"] == "[1]\ngood\n\n[2]\nbad"
+
+
+def test_packed_system_message_does_not_depend_on_pack_size():
+    two = build_packed_messages("Classify.", ["a", "b"], "sentiment", LABELS)
+    three = build_packed_messages("Classify.", ["a", "b", "c"], "sentiment", LABELS)
+    assert two[0] == three[0]
+
+
+def test_parse_maps_slots_to_labels():
+    text = 'Sure! {"1": "Positive", "2": " negative ", "3": "neutral"}'
+    assert parse_packed_response(text, 3, LABELS) == ["positive", "negative", "neutral"]
+
+
+def test_parse_marks_missing_and_unknown_slots_for_retry():
+    text = '{"1": "positive", "3": "mostly negative", "2": 5}'
+    assert parse_packed_response(text, 4, LABELS) == ["positive", None, None, None]
+
+
+def test_parse_rejects_malformed_answers():
+    assert parse_packed_response(None, 2, LABELS) == [None, None]
+    assert parse_packed_response("positive, negative", 2, LABELS) == [None, None]
+    assert parse_packed_response('{"1": "positive",}', 2, LABELS) == [None, None]
+
+
+def test_label_enum_reads_array_and_scalar_schemas():
+    assert label_enum({"s": {"type": "array", "items": {"enum": LABELS}}}, "s") == LABELS
+    assert label_enum({"s": {"type": "string", "enum": LABELS}}, "s") == LABELS
+    assert label_enum({"s": {"type": "string"}}, "s") is None
+    assert label_enum(None, "s") is None
+
+
+def test_match_label_prefers_exact_matches():
+    assert match_label(" Negative.", LABELS) == "negative"
+    assert match_label("The answer is neutral", LABELS) == "neutral"
+    assert match_label("unsure", LABELS) is None
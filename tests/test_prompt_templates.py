@@ -0,0 +1,82 @@
+import pandas as pd
+from adala.utils.parse import partial_str_format
+
+from prompt_templates import compile_template
+
+
+def test_render_matches_partial_str_format():
+    source = "Text: {text}\nLabels: {labels}\nKeep {missing} and {{escaped}}"
+    values = {"text": "good movie", "labels": "positive, negative"}
+    assert compile_template(source).render(values) == partial_str_format(source, **values)
+
+
+def test_render_looks_up_mappings_in_order():
+    template = compile_template("{a}-{b}")
+    assert template.render({"a": 1}, {"a": 2, "b": 3}) == "1-3"
+
+
+def test_static_template_has_no_fields():
+    template = compile_template("Just text {{not a field}}")
+    assert template.is_static
+    assert template.render({"x": 1}) == "Just text {not a field}"
+
+
+def test_bind_fills_known_fields_and_keeps_the_rest():
+    template = compile_template("Use {labels} for {text}").bind({"labels": "a, b"})
+    assert template.fields == ("text",)
+    assert template.render({"text": "t"}) == "Use a, b for t"
+
+
+def test_compile_template_is_cached():
+    assert compile_template("Input: {text}") is compile_template("Input: {text}")
+
+
+def test_split_before_first_record_field():
+    head, tail = compile_template("Classify {labels}. Text: {text} ({lang})").split(["text", "lang"])
+    assert head.source == "Classify {labels}. Text: "
+    assert tail.source == "{text} ({lang})"
+
+
+def test_split_without_record_fields_keeps_everything_in_head():
+    template = compile_template("Classify into {labels}.")
+    head, tail = template.split(["text"])
+    assert head is template
+    assert tail.is_static and tail.source == ""
+
+
+def test_render_columns_matches_row_by_row_render():
+    frame = pd.DataFrame({"text": ["good", "bad", None], "score": [1, 2.5, 3]}, index=[10, 11, 12])
+    template = compile_template("{prefix}: {text} ({score}) {missing}")
+    rendered = template.render_columns(frame, {"prefix": "Input"})
+    expected = [template.render(row, {"prefix": "Input"}) for row in frame.to_dict("records")]
+    assert rendered == expected
+    assert rendered[0] == "Input: good (1.0) {missing}"
+
+
+def test_escaped_braces_survive_binding_in_stages():
+    template = compile_template('Answer as {{"label": ...}} for {text} in {lang}').bind({"lang": "{en}"})
+    assert template.fields == ("text",)
+    assert template.render({"text": "hi"}) == 'Answer as {"label": ...} for hi in {en}'
+
+
+def test_format_specs_and_attribute_access_match_partial_str_format():
+    record = type("Record", (), {"title": "Dune", "tags": ["scifi", "classic"]})()
+    source = "{text:.4} by {record.title} [{record.tags[0]}] {lang!r} {missing} {{escaped}}"
+    values = {"text": "good movie", "record": record, "lang": "en"}
+    template = compile_template(source)
+    assert template.fields == ("text", "record", "record", "lang", "missing")
+    assert template.render(values) == partial_str_format(source, **values)
+    bound = template.bind({"record": record})
+    assert bound.fields == ("text", "lang", "missing")
+    assert bound.render({"text": "good movie", "lang": "en"}) == partial_str_format(source, **values)
+    frame = pd.DataFrame({"text": ["good movie", "bad"]})
+    assert bound.render_columns(frame, {"lang": "en"}) == [
+        partial_str_format(source, text=text, record=record, lang="en") for text in frame["text"]
+    ]
+
+
+def test_formatted_templates_are_not_split_between_placeholders():
+    template = compile_template("Classify {labels}. Text: {text:.100}")
+    head, tail = template.split(["text"])
+    assert head.source == "" and tail is template
+    assert template.split(["other"])[0] is template
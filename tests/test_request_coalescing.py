@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from request_coalescing import SingleFlight, group_duplicates
+
+
+def test_group_duplicates_maps_rows_to_first_occurrence():
+    unique_positions, slots = group_duplicates(["a", "b", "a", "c", "b"])
+    assert unique_positions == [0, 1, 3]
+    assert slots == [0, 1, 0, 2, 1]
+
+
+def test_group_duplicates_of_empty_batch():
+    assert group_duplicates([]) == ([], [])
+
+
+def test_concurrent_callers_share_one_execution():
+    flight = SingleFlight()
+    started = threading.Event()
+    calls = []
+    results = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.05)
+        return "label"
+
+    def caller():
+        results.append(flight.do("key", work))
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(1)
+    followers = [threading.Thread(target=caller) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    for thread in [leader, *followers]:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert sorted(results, key=lambda r: r[1]) == [("label", False)] + [("label", True)] * 3
+    assert flight.stats() == {"executed": 1, "shared": 3}
+
+
+def test_errors_are_shared_and_keys_are_released():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        time.sleep(0.05)
+        raise ValueError("boom")
+
+    def caller():
+        try:
+            flight.do("key", fail)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=caller)
+    leader.start()
+    started.wait(1)
+    follower = threading.Thread(target=caller)
+    follower.start()
+    leader.join(2)
+    follower.join(2)
+    assert len(errors) == 2
+    # Once finished, the same key runs again
+    assert flight.do("key", lambda: 1) == (1, False)
+
+
+def test_async_callers_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"label": "positive"}
+
+    async def main():
+        return await asyncio.gather(*(flight.ado("key", work) for _ in range(4)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert [shared for _, shared in results] == [False, True, True, True]
+    assert all(result == {"label": "positive"} for result, _ in results)
+
+
+def test_cancelled_follower_does_not_cancel_the_leader():
+    flight = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == ("done", False)
+
+
+def test_cancelled_leader_does_not_cancel_the_followers():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.ado("key", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(flight.ado("key", work)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return await asyncio.gather(*followers)
+
+    assert asyncio.run(main()) == [("done", True), ("done", True)]
+    assert len(calls) == 1
+
+
+def test_work_is_cancelled_when_every_caller_gives_up():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def work():
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def main():
+        callers = [asyncio.ensure_future(flight.ado("key", work)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0)
+        # The key is free again
+        return await flight.ado("key", lambda: asyncio.sleep(0, "again"))
+
+    assert asyncio.run(main()) == ("again", False)
+    assert cancelled == [True]
@@ -0,0 +1,81 @@
+import time
+
+from response_cache import ResponseCache, stable_hash
+
+
+def test_stable_hash_ignores_key_order():
+    assert stable_hash({"a": 1, "b": [1, 2]}) == stable_hash({"b": [1, 2], "a": 1})
+    assert stable_hash({"a": 1}) != stable_hash({"a": 2})
+
+
+def test_memory_cache_hit_and_miss():
+    cache = ResponseCache()
+    assert cache.get("k", "missing") == "missing"
+    cache.set("k", {"label": "positive"})
+    assert cache.get("k") == {"label": "positive"}
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_memory_lru_keeps_recently_used_entries():
+    cache = ResponseCache(memory_entries=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_ttl_expires_entries(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = ResponseCache(ttl=10)
+    cache.set("k", "v")
+    now[0] += 5
+    assert cache.get("k") == "v"
+    now[0] += 10
+    assert cache.get("k") is None
+
+
+def test_sqlite_cache_persists_across_instances(tmp_path):
+    path = str(tmp_path / "cache" / "responses.sqlite")
+    ResponseCache(path=path).set("k", {"label": "negative"})
+    cache = ResponseCache(path=path)
+    assert cache.get("k") == {"label": "negative"}
+    assert cache.stats()["memory_hits"] == 0
+
+
+def test_sqlite_ttl_deletes_expired_rows(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    path = str(tmp_path / "responses.sqlite")
+    ResponseCache(path=path, ttl=10).set("k", "v")
+    now[0] += 11
+    cache = ResponseCache(path=path, ttl=10)
+    assert cache.get("k") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_sqlite_evicts_oldest_entries_beyond_max_entries(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(path=path, max_entries=10, memory_entries=1)
+    for i in range(12):
+        now[0] += 1
+        cache.set(f"k{i}", i)
+    reopened = ResponseCache(path=path)
+    assert reopened.get("k0") is None and reopened.get("k1") is None
+    assert reopened.get("k11") == 11
+    assert cache.stats()["evictions"] == 2
+
+
+def test_clear_drops_memory_and_disk(tmp_path):
+    path = str(tmp_path / "responses.sqlite")
+    cache = ResponseCache(path=path)
+    cache.set("k", "v")
+    cache.clear()
+    assert cache.get("k") is None
+    assert ResponseCache(path=path).get("k") is None
@@ -0,0 +1,85 @@
+import pytest
+
+from call_policy import CallPolicy, CircuitBreaker, PolicyExecutor
+from runtime_metrics import Histogram, RequestTiming, RuntimeMetrics, current_request, on_request, on_response
+
+
+class Overloaded(Exception):
+    status_code = 503
+
+
+def test_histogram_quantiles_interpolate_within_buckets():
+    histogram = Histogram((1.0, 2.0, 4.0))
+    for value in (0.5, 1.5, 1.5, 3.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4 and snapshot["sum"] == 6.5
+    assert histogram.quantile(0.5) == 1.5
+    assert 2.0 < histogram.quantile(0.95) <= 4.0
+    assert Histogram((1.0,)).quantile(0.5) is None
+
+
+def test_record_request_counts_tokens_and_sdk_retries():
+    class Usage:
+        prompt_tokens = 12
+        completion_tokens = 3
+        prompt_tokens_details = type("Details", (), {"cached_tokens": 8})()
+
+    metrics = RuntimeMetrics()
+    timing = RequestTiming()
+    timing.attempts = 2
+    timing.ttfb = 0.01
+    metrics.record_request(timing, 0.05, Usage())
+    counters = metrics.snapshot()["counters"]
+    assert counters["requests"] == 1 and counters["retries"] == 1
+    assert counters["prompt_tokens_total"] == 12 and counters["cached_prompt_tokens_total"] == 8
+    assert metrics.snapshot()["histograms"]["ttfb"]["count"] == 1
+
+
+def test_http_hooks_fill_the_current_request():
+    timing = RequestTiming()
+    token = current_request.set(timing)
+    try:
+        on_request(None)
+        on_response(None)
+    finally:
+        current_request.reset(token)
+    assert timing.attempts == 1 and timing.ttfb is not None
+
+
+def test_policy_retries_reach_the_metrics():
+    metrics = RuntimeMetrics()
+    executor = PolicyExecutor(
+        CallPolicy(max_attempts=3, base_delay=0.0), CircuitBreaker(failure_threshold=10), on_event=metrics.incr
+    )
+    outcomes = [Overloaded(), Overloaded(), "ok"]
+
+    def attempt(timeout):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    assert executor.call(attempt) == "ok"
+    assert metrics.counter("retries") == 2
+    assert "calls" not in metrics.snapshot()["counters"]
+
+
+def test_prometheus_exposition():
+    metrics = RuntimeMetrics(labels={"model": "llama3"})
+    metrics.incr("requests")
+    metrics.observe("llm_total", 0.2)
+    text = metrics.to_prometheus()
+    assert '# TYPE adala_runtime_requests counter' in text
+    assert 'adala_runtime_requests{model="llama3"} 1' in text
+    assert 'adala_runtime_llm_total_seconds_bucket{model="llama3",le="+Inf"} 1' in text
+    assert 'adala_runtime_llm_total_seconds_count{model="llama3"} 1' in text
+
+
+def test_dump_writes_atomically(tmp_path):
+    metrics = RuntimeMetrics()
+    metrics.incr("requests", 3)
+    path = tmp_path / "runtime.prom"
+    metrics.dump(str(path))
+    assert "adala_runtime_requests 3" in path.read_text()
+    assert not (tmp_path / "runtime.prom.tmp").exists()
@@ -0,0 +1,64 @@
+import pytest
+
+from semantic_cache import NearDuplicateCache, normalize_text
+
+TEXT = "The battery lasts two full days and the screen is bright even in direct sunlight."
+
+
+def test_normalize_text():
+    assert normalize_text("  Ｈello\tWORLD \n") == "hello world"
+
+
+def test_near_duplicate_above_the_threshold_is_a_hit():
+    cache = NearDuplicateCache(threshold=0.8)
+    cache.put("scope", cache.signature(TEXT), {"label": "positive"}, skill="sentiment")
+    variant = "the battery lasts two full days, and the screen is bright even in direct sunlight!"
+    assert cache.get("scope", cache.signature(variant), skill="sentiment") == {"label": "positive"}
+    assert cache.get("scope", cache.signature("  " + TEXT.upper()), skill="sentiment") == {"label": "positive"}
+
+
+def test_dissimilar_text_is_a_miss():
+    cache = NearDuplicateCache(threshold=0.8)
+    cache.put("scope", cache.signature(TEXT), "positive")
+    assert cache.get("scope", cache.signature("The battery died after an hour and the screen cracked.")) is None
+
+
+def test_a_stricter_threshold_turns_a_hit_into_a_miss():
+    variant = TEXT.replace("two full days", "three full days")
+    loose, strict = NearDuplicateCache(threshold=0.5), NearDuplicateCache(threshold=0.99)
+    for cache in (loose, strict):
+        cache.put("scope", cache.signature(TEXT), "positive")
+    assert loose.get("scope", loose.signature(variant)) == "positive"
+    assert strict.get("scope", strict.signature(variant)) is None
+
+
+def test_scopes_and_skills_are_isolated():
+    cache = NearDuplicateCache()
+    signature = cache.signature(TEXT)
+    cache.put("sentiment-prompt", signature, "positive", skill="sentiment")
+    assert cache.get("topic-prompt", signature, skill="topic") is None
+    assert cache.get("sentiment-prompt", signature, skill="sentiment") == "positive"
+    skills = cache.stats()["skills"]
+    assert skills["topic"] == {"lookups": 1, "hits": 0, "stores": 0, "hit_rate": 0.0}
+    assert skills["sentiment"] == {"lookups": 1, "hits": 1, "stores": 1, "hit_rate": 1.0}
+
+
+def test_least_recently_used_entries_are_evicted_beyond_max_entries():
+    cache = NearDuplicateCache(max_entries=2)
+    texts = ["alpha beta gamma delta epsilon", "zeta eta theta iota kappa", "lambda mu nu xi omicron"]
+    signatures = [cache.signature(text) for text in texts]
+    cache.put("scope", signatures[0], 0)
+    cache.put("scope", signatures[1], 1)
+    # Reading the first entry makes the second one the least recently used
+    assert cache.get("scope", signatures[0]) == 0
+    cache.put("scope", signatures[2], 2)
+    stats = cache.stats()
+    assert (stats["entries"], stats["evictions"]) == (2, 1)
+    assert cache.get("scope", signatures[1]) is None
+    assert [cache.get("scope", signatures[i]) for i in (0, 2)] == [0, 2]
+    assert all(cache._buckets.values()) and len(cache._buckets) <= 2 * cache.bands
+
+
+def test_num_perm_must_split_into_bands():
+    with pytest.raises(ValueError):
+        NearDuplicateCache(num_perm=10, bands=3)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from streaming import PredictionWriter, StreamingEnvironment, iter_chunks
+
+
+class _Skills:
+    def get_skill_outputs(self):
+        return ["label"]
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    path = tmp_path / "corpus.jsonl"
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(7):
+            f.write(json.dumps({"text": f"text {i}", "truth": "odd" if i % 2 else "even"}) + "\n")
+    return str(path)
+
+
+def test_chunks_carry_a_global_row_index(corpus):
+    chunks = list(iter_chunks(corpus, chunk_size=3))
+    assert [list(chunk.index) for chunk in chunks] == [[0, 1, 2], [3, 4, 5], [6]]
+
+
+def test_prediction_writer_keeps_row_ids(corpus, tmp_path):
+    output = str(tmp_path / "predictions.jsonl")
+    with PredictionWriter(output) as writer:
+        for chunk in iter_chunks(corpus, chunk_size=3):
+            writer.write(chunk)
+    with open(output, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [row["row_id"] for row in rows] == list(range(7))
+    assert writer.rows_written == 7
+
+
+def test_batches_span_chunks_until_the_stream_ends(corpus):
+    env = StreamingEnvironment(path=corpus, chunk_size=3)
+    assert list(env.get_data_batch(batch_size=4).index) == [0, 1, 2, 3]
+    assert list(env.get_data_batch(batch_size=4).index) == [4, 5, 6]
+    assert len(env.get_data_batch(batch_size=4)) == 0
+
+
+def test_run_without_input_is_rejected(corpus):
+    env = StreamingEnvironment(path=corpus)
+    with pytest.raises(ValueError, match="run_streaming"):
+        env.get_data_batch()
+
+
+def test_save_and_restore_the_stream_position(corpus):
+    env = StreamingEnvironment(path=corpus, chunk_size=3)
+    env.get_data_batch(batch_size=4)
+    assert env.save()["rows_served"] == 4
+    env.get_data_batch(batch_size=3)
+    env.restore()
+    assert list(env.get_data_batch(batch_size=2).index) == [4, 5]
+
+
+def test_feedback_uses_ground_truth_read_with_the_batch(corpus):
+    env = StreamingEnvironment(
+        path=corpus, chunk_size=3, ground_truth_columns={"label": "truth"}, matching_function="exact"
+    )
+    predictions = env.get_data_batch(batch_size=4).copy()
+    predictions["label"] = ["even", "even", "even", "odd"]
+    feedback = env.get_feedback(_Skills(), predictions)
+    assert list(feedback.match["label"]) == [True, False, True, True]
@@ -0,0 +1,97 @@
+import json
+import threading
+
+import pytest
+
+import trace_exporter
+from trace_exporter import BackgroundTraceExporter, get_trace_exporter, shutdown_exporters
+
+
+class FakeClient:
+    def __init__(self, block=False):
+        self.runs = []
+        self.sending = threading.Event()
+        self.release = threading.Event()
+        if not block:
+            self.release.set()
+
+    def batch_ingest_runs(self, create):
+        self.sending.set()
+        self.release.wait(5)
+        self.runs.extend(create)
+
+
+def run(i):
+    return {"id": str(i), "name": "llm", "run_type": "llm", "inputs": {}}
+
+
+def test_shutdown_flushes_the_queue():
+    client = FakeClient()
+    exporter = BackgroundTraceExporter(client, batch_size=100, flush_interval=60.0)
+    for i in range(3):
+        assert exporter.submit(run(i))
+    exporter.shutdown()
+    assert [r["id"] for r in client.runs] == ["0", "1", "2"]
+    assert exporter.stats()["exported"] == 3
+    # Runs submitted after shutdown are not lost silently
+    assert not exporter.submit(run(3))
+    assert exporter.stats()["dropped"] == 1
+
+
+def test_runs_are_dropped_when_the_queue_is_full():
+    client = FakeClient(block=True)
+    exporter = BackgroundTraceExporter(client, batch_size=1, flush_interval=60.0, max_queue_size=1)
+    try:
+        assert exporter.submit(run(0))
+        assert client.sending.wait(5)
+        assert exporter.submit(run(1))
+        assert not exporter.submit(run(2))
+        assert exporter.stats()["dropped"] == 1
+    finally:
+        client.release.set()
+        exporter.shutdown()
+    assert [r["id"] for r in client.runs] == ["0", "1"]
+
+
+def test_overflow_is_spilled_when_configured(tmp_path):
+    client = FakeClient(block=True)
+    spill = tmp_path / "spill.jsonl"
+    exporter = BackgroundTraceExporter(client, batch_size=1, flush_interval=60.0, max_queue_size=1, spill_path=str(spill))
+    try:
+        exporter.submit(run(0))
+        assert client.sending.wait(5)
+        exporter.submit(run(1))
+        assert not exporter.submit(run(2))
+    finally:
+        client.release.set()
+        exporter.shutdown()
+    assert [json.loads(line)["id"] for line in spill.read_text().splitlines()] == ["2"]
+    assert exporter.stats()["spilled"] == 1
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    made = []
+
+    def make_client(api_url, api_key):
+        made.append((api_url, api_key))
+        return FakeClient()
+
+    monkeypatch.setattr(trace_exporter, "_make_client", make_client)
+    yield made
+    shutdown_exporters()
+
+
+def test_one_exporter_per_endpoint(clients):
+    first = get_trace_exporter("https://a", "key")
+    assert get_trace_exporter("https://a", "key", batch_size=5) is first
+    assert get_trace_exporter("https://b", "key") is not first
+    assert clients == [("https://a", "key"), ("https://b", "key")]
+
+
+def test_shutdown_exporters_flushes_and_forgets_them(clients):
+    exporter = get_trace_exporter("https://a", "key", flush_interval=60.0)
+    exporter.submit(run(0))
+    shutdown_exporters()
+    assert exporter.client.runs == [run(0)]
+    assert get_trace_exporter("https://a", "key") is not exporter
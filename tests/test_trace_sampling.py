@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta, timezone
+
+from trace_sampling import TraceSampler
+
+START = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def make_run(trace_id, parent=None, seconds=0.1, **fields):
+    run = {
+        "id": f"{trace_id}-{parent or 'root'}-{len(fields)}",
+        "trace_id": trace_id,
+        "parent_run_id": parent,
+        "start_time": START,
+        "end_time": START + timedelta(seconds=seconds),
+        "extra": {"metadata": {}},
+    }
+    run.update(fields)
+    return run
+
+
+def sampled_fraction(sampler, traces=2000):
+    return sum(sampler.head_sampled(f"trace-{i}") for i in range(traces)) / traces
+
+
+def test_head_decision_is_deterministic_per_trace():
+    sampler = TraceSampler(sample_rate=0.3)
+    decisions = [sampler.head_sampled(f"trace-{i}") for i in range(200)]
+    assert decisions == [TraceSampler(sample_rate=0.3).head_sampled(f"trace-{i}") for i in range(200)]
+    assert 0.25 < sampled_fraction(sampler) < 0.35
+
+
+def test_skill_rates_override_the_default_rate():
+    sampler = TraceSampler(sample_rate=1.0, skill_rates={"sentiment": 0.0})
+    assert not sampler.head_sampled("trace", skill="sentiment")
+    assert sampler.head_sampled("trace", skill="topic")
+
+
+def test_rate_zero_drops_every_trace_without_tail_hits():
+    sampler = TraceSampler(sample_rate=0.0)
+    assert sampled_fraction(sampler) == 0.0
+    sampler.start_trace("t")
+    assert sampler.finish(make_run("t", parent="root")) == []
+    assert sampler.finish(make_run("t")) == []
+    stats = sampler.stats()
+    assert stats["dropped_runs"] == 2
+    assert stats["open_traces"] == 0 and stats["pending_runs"] == 0
+
+
+def test_errors_are_always_kept_with_the_rest_of_their_trace():
+    sampler = TraceSampler(sample_rate=0.0)
+    sampler.start_trace("t")
+    child = make_run("t", parent="root")
+    assert sampler.finish(child) == []
+    failed = make_run("t", parent="root", error="boom")
+    assert sampler.finish(failed) == [child, failed]
+    root = make_run("t")
+    assert sampler.finish(root) == [root]
+    assert sampler.stats()["tail_retained"] == 1
+
+
+def test_slow_and_mismatched_runs_are_kept():
+    sampler = TraceSampler(sample_rate=0.0, slow_threshold=1.0)
+    sampler.start_trace("slow")
+    assert len(sampler.finish(make_run("slow", seconds=2.0))) == 1
+    sampler.start_trace("mismatch")
+    mismatch = make_run("mismatch", extra={"metadata": {"label_mismatch": True}})
+    assert sampler.finish(mismatch) == [mismatch]
+
+
+def test_disabled_tail_rules_drop_errors_too():
+    sampler = TraceSampler(sample_rate=0.0, keep_errors=False, keep_label_mismatches=False)
+    sampler.start_trace("t")
+    assert sampler.finish(make_run("t", parent="root", error="boom")) == []
+    assert sampler.stats()["pending_runs"] == 0
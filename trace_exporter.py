@@ -0,0 +1,246 @@
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sentinels pushed through the queue to wake the worker thread
+_FLUSH = object()
+_STOP = object()
+
+
+class BackgroundTraceExporter:
+    """
+    Bounded, batching exporter for LangSmith runs.
+
+    Callers only pay for a non-blocking enqueue; a daemon worker thread drains
+    the queue and ships runs to the tracing backend in batches of up to
+    ``batch_size`` or every ``flush_interval`` seconds, whichever comes first.
+    When the queue is full (or a batch cannot be delivered) runs are spilled
+    to ``spill_path`` as JSON lines if configured, otherwise dropped.
+
+    Runtimes share one exporter per endpoint through `get_trace_exporter`;
+    an exporter built directly is stopped with `shutdown`.
+    """
+
+    def __init__(
+        self,
+        client: Any,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_queue_size: int = 10000,
+        spill_path: Optional[str] = None,
+    ):
+        self.client = client
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0.01, flush_interval)
+        self.spill_path = spill_path
+
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue_size)
+        self._spill_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"submitted": 0, "exported": 0, "dropped": 0, "spilled": 0, "failed_batches": 0}
+        self._closed = False
+
+        self._worker = threading.Thread(target=self._run, name="langsmith-trace-exporter", daemon=True)
+        self._worker.start()
+
+    def submit(self, run: Dict[str, Any]) -> bool:
+        """
+        Enqueue a run for export without blocking. Returns False if the run was spilled or dropped.
+        """
+        if self._closed:
+            self._overflow([run])
+            return False
+        try:
+            self._queue.put_nowait(run)
+        except queue.Full:
+            self._overflow([run])
+            return False
+        self._incr("submitted")
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until everything enqueued so far has been exported (or spilled/dropped).
+        Returns False if the timeout expired first.
+        """
+        if self._closed:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        try:
+            self._queue.put(_FLUSH, timeout=timeout)
+        except queue.Full:
+            return False
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """
+        Flush pending runs and stop the worker thread. Safe to call more than once.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            logger.warning("Trace export queue still full at shutdown; remaining runs may be lost")
+            return
+        self._worker.join(timeout)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get exporter counters and the current queue depth.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["queued"] = self._queue.qsize()
+        return stats
+
+    def _run(self) -> None:
+        stopping = False
+        while not stopping:
+            batch, stopping = self._collect_batch()
+            if batch:
+                self._send(batch)
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _collect_batch(self):
+        """
+        Gather runs until the batch is full, the flush interval elapses or a sentinel arrives.
+        """
+        batch: List[Dict[str, Any]] = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _FLUSH or item is _STOP:
+                self._queue.task_done()
+                if item is _STOP:
+                    # Drain whatever is left before exiting
+                    batch.extend(self._drain())
+                    return batch, True
+                break
+            batch.append(item)
+        return batch, False
+
+    def _drain(self) -> List[Dict[str, Any]]:
+        items = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return items
+            if item is _FLUSH or item is _STOP:
+                self._queue.task_done()
+                continue
+            items.append(item)
+
+    def _send(self, batch: List[Dict[str, Any]]) -> None:
+        try:
+            if hasattr(self.client, "batch_ingest_runs"):
+                self.client.batch_ingest_runs(create=batch)
+            else:
+                for run in batch:
+                    run = dict(run)
+                    self.client.create_run(
+                        name=run.pop("name"),
+                        inputs=run.pop("inputs"),
+                        run_type=run.pop("run_type"),
+                        project_name=run.pop("session_name", None),
+                        **run,
+                    )
+            self._incr("exported", len(batch))
+        except Exception as e:
+            logger.warning(f"Failed to export {len(batch)} LangSmith runs: {e}")
+            self._incr("failed_batches")
+            self._overflow(batch)
+
+    def _overflow(self, runs: List[Dict[str, Any]]) -> None:
+        if not self.spill_path:
+            self._incr("dropped", len(runs))
+            return
+        try:
+            with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as f:
+                for run in runs:
+                    f.write(json.dumps(run, default=str, ensure_ascii=False) + "\n")
+            self._incr("spilled", len(runs))
+        except OSError as e:
+            logger.warning(f"Failed to spill LangSmith runs to {self.spill_path}: {e}")
+            self._incr("dropped", len(runs))
+
+    def _incr(self, key: str, value: int = 1) -> None:
+        with self._stats_lock:
+            self._stats[key] += value
+
+
+_exporters_lock = threading.Lock()
+_exporters: Dict[Tuple, BackgroundTraceExporter] = {}
+
+
+def _make_client(api_url: str, api_key: Optional[str]) -> Any:
+    from langsmith import Client
+
+    return Client(api_url=api_url, api_key=api_key)
+
+
+def get_trace_exporter(
+    api_url: str,
+    api_key: Optional[str],
+    batch_size: int = 100,
+    flush_interval: float = 1.0,
+    max_queue_size: int = 10000,
+    spill_path: Optional[str] = None,
+) -> BackgroundTraceExporter:
+    """
+    Get the process-wide exporter for a LangSmith endpoint / API key, creating its client on first use.
+
+    Every runtime tracing to the same endpoint shares one client, queue and
+    worker thread; the export settings of the first caller apply. Exporters
+    are keyed by process id as well, since the worker thread does not survive a fork.
+    """
+    key = (os.getpid(), api_url, api_key)
+    with _exporters_lock:
+        exporter = _exporters.get(key)
+        if exporter is None:
+            exporter = BackgroundTraceExporter(
+                client=_make_client(api_url, api_key),
+                batch_size=batch_size,
+                flush_interval=flush_interval,
+                max_queue_size=max_queue_size,
+                spill_path=spill_path,
+            )
+            _exporters[key] = exporter
+            logger.debug(f"Created shared LangSmith trace exporter for {api_url}")
+        return exporter
+
+
+def shutdown_exporters(timeout: float = 5.0) -> None:
+    """
+    Flush and stop every shared exporter of this process; runs at interpreter exit.
+    """
+    with _exporters_lock:
+        exporters = list(_exporters.values())
+        _exporters.clear()
+    for exporter in exporters:
+        exporter.shutdown(timeout)
+
+
+atexit.register(shutdown_exporters)
@@ -0,0 +1,116 @@
+import threading
+import zlib
+from typing import Any, Dict, List, Optional
+
+
+class TraceSampler:
+    """
+    Head sampling plus tail-based retention for LangSmith traces.
+
+    The head decision is made once per trace, when its root run starts, from a
+    hash of the trace id (so it is stable across every run of the trace) and
+    ``sample_rate`` or the per-skill rate in ``skill_rates``. Runs of traces
+    that were not head-sampled are held back until the trace ends and are
+    kept only if one of them hit a tail rule: an error, a duration above
+    ``slow_threshold`` seconds, or ``label_mismatch`` set in its metadata.
+    Everything else is dropped before it reaches the exporter.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        skill_rates: Optional[Dict[str, float]] = None,
+        keep_errors: bool = True,
+        slow_threshold: Optional[float] = None,
+        keep_label_mismatches: bool = True,
+    ):
+        self.sample_rate = sample_rate
+        self.skill_rates = dict(skill_rates or {})
+        self.keep_errors = keep_errors
+        self.slow_threshold = slow_threshold
+        self.keep_label_mismatches = keep_label_mismatches
+
+        self._lock = threading.Lock()
+        # trace_id -> head decision, for traces whose root run is still open
+        self._sampled: Dict[str, bool] = {}
+        # trace_id -> runs held back until the trace ends or a tail rule fires
+        self._pending: Dict[str, List[Dict[str, Any]]] = {}
+        self._stats = {"traces": 0, "head_sampled": 0, "tail_retained": 0, "exported_runs": 0, "dropped_runs": 0}
+
+    @property
+    def tail_enabled(self) -> bool:
+        return self.keep_errors or self.slow_threshold is not None or self.keep_label_mismatches
+
+    def head_sampled(self, trace_id: str, skill: Optional[str] = None) -> bool:
+        rate = self.skill_rates.get(skill, self.sample_rate) if skill is not None else self.sample_rate
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        return (zlib.crc32(trace_id.encode("utf-8")) % 10000) < rate * 10000
+
+    def start_trace(self, trace_id: str, skill: Optional[str] = None) -> bool:
+        """
+        Make the head decision for a new trace. Returns True if it is sampled.
+        """
+        sampled = self.head_sampled(trace_id, skill)
+        with self._lock:
+            self._sampled[trace_id] = sampled
+            self._stats["traces"] += 1
+            if sampled:
+                self._stats["head_sampled"] += 1
+        return sampled
+
+    def is_sampled(self, trace_id: str) -> bool:
+        with self._lock:
+            return self._sampled.get(trace_id, True)
+
+    def retain(self, run: Dict[str, Any]) -> bool:
+        """
+        Check the tail rules against a finished run.
+        """
+        if self.keep_errors and run.get("error") is not None:
+            return True
+        if self.slow_threshold is not None:
+            duration = (run["end_time"] - run["start_time"]).total_seconds()
+            if duration > self.slow_threshold:
+                return True
+        if self.keep_label_mismatches and run.get("extra", {}).get("metadata", {}).get("label_mismatch"):
+            return True
+        return False
+
+    def finish(self, run: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Offer a finished run; returns the runs that should be exported now.
+
+        Child runs finish before their root, so when a tail rule fires the
+        runs held back for the trace are released along with it, and later
+        runs of that trace are exported directly.
+        """
+        trace_id = run["trace_id"]
+        is_root = run.get("parent_run_id") is None
+        with self._lock:
+            sampled = self._sampled.get(trace_id, True)
+            if sampled:
+                released = [run]
+            elif self.tail_enabled and self.retain(run):
+                released = self._pending.pop(trace_id, []) + [run]
+                # Keep the rest of this trace too, so the retained tree is complete
+                self._sampled[trace_id] = True
+                self._stats["tail_retained"] += 1
+            else:
+                released = []
+                if is_root:
+                    self._stats["dropped_runs"] += len(self._pending.pop(trace_id, [])) + 1
+                elif self.tail_enabled:
+                    self._pending.setdefault(trace_id, []).append(run)
+                else:
+                    self._stats["dropped_runs"] += 1
+            if is_root:
+                self._sampled.pop(trace_id, None)
+            self._stats["exported_runs"] += len(released)
+        return released
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return dict(self._stats, open_traces=len(self._sampled), pending_runs=sum(map(len, self._pending.values())))